@@ -74,8 +74,11 @@ CREATE TABLE IF NOT EXISTS sales_insights.product_catalog (
     uom TEXT NOT NULL DEFAULT 'EA'
 );
 
+-- Fact tables are range-partitioned by month (sales_orders_YYYYMM, ...).
+-- Partitions are created on demand with ensure_month_partitions() below;
+-- existing heap tables are converted by 05_partition_sales_tables.sql.
 CREATE TABLE IF NOT EXISTS sales_insights.sales_orders (
-    order_id TEXT PRIMARY KEY,
+    order_id TEXT NOT NULL,
     order_date DATE NOT NULL,
     customer_id TEXT NOT NULL REFERENCES sales_insights.customers(customer_id),
     product_category TEXT NOT NULL,
@@ -91,8 +94,9 @@ CREATE TABLE IF NOT EXISTS sales_insights.sales_orders (
     gross_profit NUMERIC(12,2) NOT NULL,
     discount_rate NUMERIC(5,2) NOT NULL DEFAULT 0,
     sales_channel TEXT NOT NULL DEFAULT 'Direct',
-    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (order_id, order_date)
+) PARTITION BY RANGE (order_date);
 
 ALTER TABLE sales_insights.sales_orders
     ADD COLUMN IF NOT EXISTS unit_price NUMERIC(12,2) DEFAULT 0;
@@ -106,7 +110,7 @@ ALTER TABLE sales_insights.sales_orders
     ADD COLUMN IF NOT EXISTS sales_channel TEXT DEFAULT 'Direct';
 
 CREATE TABLE IF NOT EXISTS sales_insights.sales_quotations (
-    quotation_id TEXT PRIMARY KEY,
+    quotation_id TEXT NOT NULL,
     quotation_date DATE NOT NULL,
     customer_id TEXT NOT NULL REFERENCES sales_insights.customers(customer_id),
     product_category TEXT NOT NULL,
@@ -117,14 +121,48 @@ CREATE TABLE IF NOT EXISTS sales_insights.sales_quotations (
     expected_close_date DATE NOT NULL,
     estimated_margin NUMERIC(12,2),
     probability NUMERIC(5,2) DEFAULT 0.5,
-    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (quotation_id, quotation_date)
+) PARTITION BY RANGE (quotation_date);
 
 ALTER TABLE sales_insights.sales_quotations
     ADD COLUMN IF NOT EXISTS estimated_margin NUMERIC(12,2);
 ALTER TABLE sales_insights.sales_quotations
     ADD COLUMN IF NOT EXISTS probability NUMERIC(5,2) DEFAULT 0.5;
 
+-- Create any missing monthly partitions of a partitioned table covering
+-- [from_date, to_date]; returns how many were created. Partitions live in
+-- the parent's schema, so this also works on the ETL shadow schema.
+CREATE OR REPLACE FUNCTION sales_insights.ensure_month_partitions(parent REGCLASS, from_date DATE, to_date DATE)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    parent_schema TEXT;
+    parent_name TEXT;
+    part_month DATE := date_trunc('month', from_date)::date;
+    part_name TEXT;
+    created INTEGER := 0;
+BEGIN
+    SELECT n.nspname, c.relname INTO parent_schema, parent_name
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.oid = parent;
+
+    WHILE part_month <= to_date LOOP
+        part_name := parent_name || '_' || to_char(part_month, 'YYYYMM');
+        IF to_regclass(format('%I.%I', parent_schema, part_name)) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I.%I PARTITION OF %I.%I FOR VALUES FROM (%L) TO (%L)',
+                           parent_schema, part_name, parent_schema, parent_name,
+                           part_month, (part_month + INTERVAL '1 month')::date);
+            created := created + 1;
+        END IF;
+        part_month := (part_month + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
 CREATE TABLE IF NOT EXISTS sales_insights.sales_targets (
     target_id SERIAL PRIMARY KEY,
     target_date DATE NOT NULL,
@@ -153,4 +191,63 @@ CREATE TABLE IF NOT EXISTS sales_insights.sales_forecasts (
     created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW()
 );
 
+-- Daily rollups read by the dashboard cards; rebuilt for the loaded date
+-- range by etl/rollups.py whenever the ETL or seed scripts load transactions
+CREATE TABLE IF NOT EXISTS sales_insights.daily_sales_rollup (
+    order_date DATE NOT NULL,
+    product_category TEXT NOT NULL,
+    sales_channel TEXT NOT NULL,
+    salesperson_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    customer_segment TEXT NOT NULL,
+    order_count INTEGER NOT NULL,
+    quantity BIGINT NOT NULL,
+    revenue_amount NUMERIC(14,2) NOT NULL,
+    gross_profit NUMERIC(14,2) NOT NULL,
+    quoted_order_count INTEGER NOT NULL,
+    quoted_revenue_amount NUMERIC(14,2) NOT NULL,
+    PRIMARY KEY (order_date, product_category, sales_channel, salesperson_id, region, customer_segment)
+);
+
+CREATE TABLE IF NOT EXISTS sales_insights.daily_quotation_rollup (
+    quotation_date DATE NOT NULL,
+    product_category TEXT NOT NULL,
+    status quotation_status_enum NOT NULL,
+    salesperson_id TEXT NOT NULL,
+    quote_count INTEGER NOT NULL,
+    quoted_amount NUMERIC(14,2) NOT NULL,
+    estimated_margin NUMERIC(14,2) NOT NULL,
+    PRIMARY KEY (quotation_date, product_category, status, salesperson_id)
+);
+
+-- Per-table high-water marks for incremental ETL runs (etl/kintex_to_rds.py --incremental)
+CREATE TABLE IF NOT EXISTS sales_insights.etl_state (
+    table_name TEXT PRIMARY KEY,
+    watermark TEXT,
+    row_hashes JSONB NOT NULL DEFAULT '{}'::jsonb,
+    updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW()
+);
+
+-- Months fully reseeded by etl/seed_extended_data.py, used by --resume
+CREATE TABLE IF NOT EXISTS sales_insights.seed_checkpoints (
+    table_name TEXT NOT NULL,
+    month DATE NOT NULL,
+    row_count INTEGER NOT NULL,
+    completed_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (table_name, month)
+);
+
+-- Secondary indexes. Bulk loads drop these first and rebuild them
+-- afterwards (etl/maintenance.py, which keeps the same list). BRIN fits the
+-- date columns because rows are loaded in date order.
+CREATE INDEX IF NOT EXISTS sales_orders_order_date_brin ON sales_insights.sales_orders USING brin (order_date);
+CREATE INDEX IF NOT EXISTS sales_orders_customer_id_idx ON sales_insights.sales_orders (customer_id);
+CREATE INDEX IF NOT EXISTS sales_orders_salesperson_id_idx ON sales_insights.sales_orders (salesperson_id);
+CREATE INDEX IF NOT EXISTS sales_orders_quotation_id_idx ON sales_insights.sales_orders (quotation_id) WHERE quotation_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS sales_quotations_quotation_date_brin ON sales_insights.sales_quotations USING brin (quotation_date);
+CREATE INDEX IF NOT EXISTS sales_quotations_customer_id_idx ON sales_insights.sales_quotations (customer_id);
+CREATE INDEX IF NOT EXISTS sales_quotations_salesperson_id_idx ON sales_insights.sales_quotations (salesperson_id);
+CREATE INDEX IF NOT EXISTS inventory_snapshots_product_id_idx ON sales_insights.inventory_snapshots (product_id);
+CREATE INDEX IF NOT EXISTS sales_targets_granularity_date_idx ON sales_insights.sales_targets (granularity, target_date);
+
 COMMENT ON SCHEMA sales_insights IS 'Mock data schema for Metabase sales insights dashboard';
@@ -10,6 +10,8 @@ SET search_path TO sales_insights, public;
 -- Clear existing data to allow reseeding
 TRUNCATE TABLE sales_orders CASCADE;
 TRUNCATE TABLE sales_quotations;
+TRUNCATE TABLE daily_sales_rollup;
+TRUNCATE TABLE daily_quotation_rollup;
 TRUNCATE TABLE inventory_snapshots;
 TRUNCATE TABLE sales_targets RESTART IDENTITY;
 TRUNCATE TABLE sales_forecasts RESTART IDENTITY;
@@ -62,6 +64,9 @@ INSERT INTO product_catalog (product_id, product_name, product_category, product
     ('PRD-ACC-003', 'AquaSeal Treatment Kit', 'Accessories', 'Accessories', 12.00, 28.00, CURRENT_DATE - INTERVAL '200 days', 'Launch', 180, 'KIT')
 ON CONFLICT (product_id) DO NOTHING;
 
+-- Monthly partitions for the seeded date range
+SELECT ensure_month_partitions('sales_orders', (CURRENT_DATE - INTERVAL '179 days')::date, CURRENT_DATE);
+
 -- Main sales fact table (six months of activity minimum)
 WITH day_series AS (
     SELECT generate_series(CURRENT_DATE - INTERVAL '179 days', CURRENT_DATE, INTERVAL '1 day')::date AS order_date
@@ -208,3 +213,26 @@ SELECT
     ROUND((28500 + random()*16000)::NUMERIC, 2) AS predicted_margin
 FROM horizons
 CROSS JOIN (SELECT DISTINCT product_category FROM product_catalog) pc;
+
+-- Daily rollup read by the dashboard cards (same definition as etl/rollups.py)
+INSERT INTO daily_sales_rollup (
+    order_date, product_category, sales_channel, salesperson_id, region, customer_segment,
+    order_count, quantity, revenue_amount, gross_profit, quoted_order_count, quoted_revenue_amount
+)
+SELECT
+    o.order_date,
+    o.product_category,
+    o.sales_channel,
+    o.salesperson_id,
+    c.region,
+    c.customer_segment,
+    COUNT(*),
+    SUM(o.quantity),
+    SUM(o.revenue_amount),
+    SUM(o.gross_profit),
+    COUNT(o.quotation_id),
+    COALESCE(SUM(o.revenue_amount) FILTER (WHERE o.quotation_id IS NOT NULL), 0)
+FROM sales_orders o
+JOIN customers c ON c.customer_id = o.customer_id
+GROUP BY o.order_date, o.product_category, o.sales_channel, o.salesperson_id,
+         c.region, c.customer_segment;
@@ -8,6 +8,10 @@
 SET search_path TO sales_insights, public;
 
 TRUNCATE TABLE sales_quotations;
+TRUNCATE TABLE daily_quotation_rollup;
+
+-- Monthly partitions for the seeded date range
+SELECT ensure_month_partitions('sales_quotations', (CURRENT_DATE - INTERVAL '179 days')::date, CURRENT_DATE);
 
 WITH day_series AS (
     SELECT generate_series(CURRENT_DATE - INTERVAL '179 days', CURRENT_DATE, INTERVAL '1 day')::date AS quotation_date
@@ -92,3 +96,19 @@ SELECT
     NOW()
 FROM quotations
 ORDER BY quotation_date;
+
+-- Daily rollup read by the dashboard cards (same definition as etl/rollups.py)
+INSERT INTO daily_quotation_rollup (
+    quotation_date, product_category, status, salesperson_id,
+    quote_count, quoted_amount, estimated_margin
+)
+SELECT
+    q.quotation_date,
+    q.product_category,
+    q.status,
+    q.salesperson_id,
+    COUNT(*),
+    SUM(q.quoted_amount),
+    COALESCE(SUM(q.estimated_margin), 0)
+FROM sales_quotations q
+GROUP BY q.quotation_date, q.product_category, q.status, q.salesperson_id;
@@ -0,0 +1,105 @@
+-- Convert existing heap sales_orders / sales_quotations into monthly range-partitioned tables
+-- Usage: PGPASSWORD=$(grep -E '^password' database.txt | cut -d'=' -f2 | xargs) psql \
+--   --host=$(grep -E '^host' database.txt | cut -d'=' -f2 | xargs) \
+--   --username=$(grep -E '^user' database.txt | cut -d'=' -f2 | xargs) \
+--   --dbname=$(grep -E '^database' database.txt | cut -d'=' -f2 | xargs) \
+--   --file=data/seeds/sales_dashboard/05_partition_sales_tables.sql
+--
+-- Run once, after 01_schema.sql has installed ensure_month_partitions().
+-- Databases created from the current 01_schema.sql are already partitioned
+-- and the script stops at the guard below without changing anything.
+
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'sales_insights.sales_orders'::regclass) = 'p' THEN
+        RAISE EXCEPTION 'sales_insights.sales_orders is already partitioned';
+    END IF;
+END;
+$$;
+
+-- Sales orders
+ALTER TABLE sales_insights.sales_orders RENAME TO sales_orders_heap;
+ALTER TABLE sales_insights.sales_orders_heap RENAME CONSTRAINT sales_orders_pkey TO sales_orders_heap_pkey;
+
+CREATE TABLE sales_insights.sales_orders (
+    order_id TEXT NOT NULL,
+    order_date DATE NOT NULL,
+    customer_id TEXT NOT NULL REFERENCES sales_insights.customers(customer_id),
+    product_category TEXT NOT NULL,
+    product_name TEXT NOT NULL,
+    quantity INTEGER NOT NULL CHECK (quantity > 0),
+    revenue_amount NUMERIC(12,2) NOT NULL CHECK (revenue_amount >= 0),
+    currency TEXT NOT NULL DEFAULT 'MYR',
+    delivery_status delivery_status_enum NOT NULL,
+    salesperson_id TEXT NOT NULL REFERENCES sales_insights.salespeople(salesperson_id),
+    quotation_id TEXT,
+    unit_price NUMERIC(12,2) NOT NULL,
+    unit_cost NUMERIC(12,2) NOT NULL,
+    gross_profit NUMERIC(12,2) NOT NULL,
+    discount_rate NUMERIC(5,2) NOT NULL DEFAULT 0,
+    sales_channel TEXT NOT NULL DEFAULT 'Direct',
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (order_id, order_date)
+) PARTITION BY RANGE (order_date);
+
+SELECT sales_insights.ensure_month_partitions('sales_insights.sales_orders', min(order_date), max(order_date))
+FROM sales_insights.sales_orders_heap
+HAVING count(*) > 0;
+
+INSERT INTO sales_insights.sales_orders (
+    order_id, order_date, customer_id, product_category, product_name, quantity,
+    revenue_amount, currency, delivery_status, salesperson_id, quotation_id,
+    unit_price, unit_cost, gross_profit, discount_rate, sales_channel, created_at
+)
+SELECT
+    order_id, order_date, customer_id, product_category, product_name, quantity,
+    revenue_amount, currency, delivery_status, salesperson_id, quotation_id,
+    COALESCE(unit_price, 0), COALESCE(unit_cost, 0), COALESCE(gross_profit, 0),
+    COALESCE(discount_rate, 0), COALESCE(sales_channel, 'Direct'), created_at
+FROM sales_insights.sales_orders_heap;
+
+DROP TABLE sales_insights.sales_orders_heap;
+
+-- Sales quotations
+ALTER TABLE sales_insights.sales_quotations RENAME TO sales_quotations_heap;
+ALTER TABLE sales_insights.sales_quotations_heap RENAME CONSTRAINT sales_quotations_pkey TO sales_quotations_heap_pkey;
+
+CREATE TABLE sales_insights.sales_quotations (
+    quotation_id TEXT NOT NULL,
+    quotation_date DATE NOT NULL,
+    customer_id TEXT NOT NULL REFERENCES sales_insights.customers(customer_id),
+    product_category TEXT NOT NULL,
+    quoted_amount NUMERIC(12,2) NOT NULL CHECK (quoted_amount >= 0),
+    currency TEXT NOT NULL DEFAULT 'MYR',
+    status quotation_status_enum NOT NULL,
+    salesperson_id TEXT NOT NULL REFERENCES sales_insights.salespeople(salesperson_id),
+    expected_close_date DATE NOT NULL,
+    estimated_margin NUMERIC(12,2),
+    probability NUMERIC(5,2) DEFAULT 0.5,
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (quotation_id, quotation_date)
+) PARTITION BY RANGE (quotation_date);
+
+SELECT sales_insights.ensure_month_partitions('sales_insights.sales_quotations', min(quotation_date), max(quotation_date))
+FROM sales_insights.sales_quotations_heap
+HAVING count(*) > 0;
+
+INSERT INTO sales_insights.sales_quotations (
+    quotation_id, quotation_date, customer_id, product_category, quoted_amount, currency,
+    status, salesperson_id, expected_close_date, estimated_margin, probability, created_at
+)
+SELECT
+    quotation_id, quotation_date, customer_id, product_category, quoted_amount, currency,
+    status, salesperson_id, expected_close_date, estimated_margin, probability, created_at
+FROM sales_insights.sales_quotations_heap;
+
+DROP TABLE sales_insights.sales_quotations_heap;
+
+COMMIT;
+
+ANALYZE sales_insights.sales_orders;
+ANALYZE sales_insights.sales_quotations;
@@ -0,0 +1,116 @@
+"""
+asyncio load backend on asyncpg, an alternative to pipeline.run.
+
+Usage:
+    totals = async_load.run(
+        {"sales_orders": partial(generate_sales_orders, master)},
+        columns={"sales_orders": SALES_ORDER_COLUMNS},
+        config=RDS_DB, schema="sales_insights",
+    )
+
+Same contract as pipeline.run: producers are zero-argument callables
+returning rows, batches go through a bounded queue, and the totals per name
+are returned. The loading side is different. Every table is written
+concurrently from a single event loop, through one asyncpg pool, using the
+binary COPY protocol (copy_records_to_table), so no thread is parked per
+in-flight COPY. Row generation is plain Python and still runs on worker
+threads.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import asyncpg
+except ImportError:  # asyncpg is only needed for --backend asyncpg
+    asyncpg = None
+
+import db_pool
+import etl_metrics
+import pipeline
+from etl_metrics import stage
+
+SCHEMA = "sales_insights"
+
+# Errors worth retrying: the server or network went away, not a bad statement
+TRANSIENT_ERRORS = (OSError, asyncio.TimeoutError) + (
+    (asyncpg.PostgresConnectionError, asyncpg.InterfaceError) if asyncpg else ())
+
+_DONE = object()
+
+
+async def copy_batch(pool, table, columns, rows, schema=SCHEMA, attempts=db_pool.WRITE_ATTEMPTS):
+    """COPY one batch in its own transaction, replaying it after a transient failure"""
+    for attempt in range(1, attempts + 1):
+        try:
+            async with pool.acquire() as conn:
+                await conn.copy_records_to_table(table, records=rows, columns=columns, schema_name=schema)
+            return len(rows)
+        except TRANSIENT_ERRORS as e:
+            if attempt == attempts:
+                raise
+            print(f"  Write failed ({str(e).strip()}), replaying batch ({attempt}/{attempts - 1})")
+            await asyncio.sleep(db_pool.backoff_delay(attempt))
+
+
+async def _run(producers, columns, config, schema, workers, loaders, max_pending, batch_size):
+    loop = asyncio.get_running_loop()
+    pending = asyncio.Queue(maxsize=max_pending)
+    totals = dict.fromkeys(producers, 0)
+
+    async def produce(name, make_rows):
+        batches = db_pool.chunked(make_rows(), batch_size)
+
+        def next_batch():
+            with stage(f"generate_{name}") as st:
+                batch = next(batches, None)
+                st.add_rows(len(batch or ()))
+            return batch
+
+        while (batch := await loop.run_in_executor(executor, next_batch)) is not None:
+            await pending.put((name, batch))
+
+    async def drain(pool):
+        while (item := await pending.get()) is not _DONE:
+            name, batch = item
+            started = time.perf_counter()
+            count = await copy_batch(pool, name, columns[name], batch, schema)
+            etl_metrics.record(f"load_{name}", time.perf_counter() - started, count)
+            totals[name] += count
+
+    async def finish(producing, draining):
+        await asyncio.gather(*producing)
+        for _ in draining:
+            await pending.put(_DONE)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="producer") as executor:
+        async with asyncpg.create_pool(min_size=1, max_size=loaders, **config) as pool:
+            producing = [asyncio.create_task(produce(name, make_rows))
+                         for name, make_rows in producers.items()]
+            draining = [asyncio.create_task(drain(pool)) for _ in range(loaders)]
+            finishing = asyncio.create_task(finish(producing, draining))
+            tasks = [*producing, *draining, finishing]
+            try:
+                # Raises the first error from any task, even while others
+                # are still blocked on the queue
+                await asyncio.gather(finishing, *draining)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+    return totals
+
+
+def run(producers, columns, config, schema=SCHEMA, workers=pipeline.PRODUCERS,
+        loaders=pipeline.LOADERS, max_pending=pipeline.MAX_PENDING, batch_size=pipeline.BATCH_SIZE):
+    """Load ``producers`` into ``schema`` with asyncpg and return rows loaded per name.
+
+    ``columns`` maps each name (also the table name) to its COPY column list.
+    ``loaders`` is the number of concurrent COPYs and pooled connections.
+    Stages are named as in pipeline.run.
+    """
+    if asyncpg is None:
+        raise RuntimeError("--backend asyncpg needs the asyncpg package (pip install asyncpg)")
+    return asyncio.run(_run(producers, columns, config, schema, workers, loaders, max_pending, batch_size))
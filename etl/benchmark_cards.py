@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Benchmark the SQL of every dashboard card directly against Postgres.
+
+Usage:
+    python benchmark_cards.py --dsn "host=localhost dbname=epb user=postgres"
+    python benchmark_cards.py --runs 20 --output bench/sf100.json
+    python benchmark_cards.py --baseline bench/sf10.json --output bench/sf100.json   # show regressions
+
+Cards come from create_metabase_dashboard.DEMO_CARDS and from the card
+files in metabase/dashboards/sales-insights/. Each query first runs once
+under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) to capture its plan nodes
+and shared buffers hit/read. It is then timed ``--runs`` times as a plain
+query, so the latency percentiles carry no instrumentation overhead.
+Results go to a JSON file, one entry per card with p50/p95/max and the
+plan shape. Comparing two files (--baseline) flags cards whose p95 grew
+or whose plan changed, e.g. between scale factors or schema changes.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import time
+from datetime import datetime
+
+import psycopg2
+
+import db_pool
+from seed_extended_data import DB_CONFIG
+
+try:
+    import create_metabase_dashboard as metabase
+except ImportError:  # requests is only needed to read the demo dashboard's cards
+    metabase = None
+
+DEFINITIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "..", "metabase", "dashboards", "sales-insights")
+
+RUNS = 10
+STATEMENT_TIMEOUT_S = 60
+
+# p95 growth reported as a regression when comparing against a baseline
+REGRESSION_RATIO = 1.2
+
+
+def card_queries(definitions_dir=DEFINITIONS_DIR):
+    """[(source, card name, SQL)] of the demo dashboard and the declarative card files"""
+    queries = []
+    if metabase is not None:
+        queries += [("create_metabase_dashboard", card["name"], card["query"]) for card in metabase.DEMO_CARDS]
+    else:
+        print("Skipping create_metabase_dashboard cards: needs the requests package (pip install requests)")
+    for path in sorted(glob.glob(os.path.join(definitions_dir, "*.json"))):
+        with open(path) as f:
+            definition = json.load(f)
+        for card in definition.get("cards", []):
+            native = card.get("dataset_query", {}).get("native", {})
+            if native.get("query"):
+                queries.append((os.path.basename(path), card["name"], native["query"]))
+    return queries
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def plan_nodes(node, depth=0):
+    """Flatten an EXPLAIN JSON plan tree into one dict per node, in depth-first order"""
+    nodes = [{
+        "depth": depth,
+        "node": node["Node Type"],
+        "relation": node.get("Relation Name"),
+        "index": node.get("Index Name"),
+        "actual_rows": node.get("Actual Rows"),
+        "loops": node.get("Actual Loops"),
+        "actual_ms": node.get("Actual Total Time"),
+        "shared_hit": node.get("Shared Hit Blocks"),
+        "shared_read": node.get("Shared Read Blocks"),
+    }]
+    for child in node.get("Plans", []):
+        nodes += plan_nodes(child, depth + 1)
+    return nodes
+
+
+def plan_shape(nodes):
+    """Node types and relations only, so row counts and timings do not register as plan changes"""
+    return " > ".join(f"{n['node']}({n['relation'] or n['index'] or ''})".replace("()", "") for n in nodes)
+
+
+def benchmark(cur, sql, runs):
+    """EXPLAIN ANALYZE once, then time ``runs`` plain executions; returns the result entry"""
+    sql = sql.strip().rstrip(";")
+    cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+    explain = cur.fetchone()[0]
+    if isinstance(explain, str):
+        explain = json.loads(explain)
+    root = explain[0]
+    nodes = plan_nodes(root["Plan"])
+
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        cur.execute(sql)
+        rows = len(cur.fetchall())
+        timings.append((time.perf_counter() - started) * 1000)
+
+    shape = plan_shape(nodes)
+    return {
+        "rows": rows,
+        "runs": runs,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "max_ms": round(max(timings), 2),
+        "planning_ms": root.get("Planning Time"),
+        "execution_ms": root.get("Execution Time"),
+        "shared_hit": root["Plan"].get("Shared Hit Blocks"),
+        "shared_read": root["Plan"].get("Shared Read Blocks"),
+        "plan_shape": shape,
+        "plan_hash": hashlib.sha1(shape.encode()).hexdigest()[:12],
+        "nodes": nodes,
+    }
+
+
+def compare(results, baseline_path):
+    """Print cards whose p95 regressed or whose plan shape changed since ``baseline_path``"""
+    with open(baseline_path) as f:
+        baseline = {(c["source"], c["name"]): c for c in json.load(f)["cards"]}
+    print(f"\nCompared with {baseline_path}:")
+    flagged = 0
+    for card in results:
+        old = baseline.get((card["source"], card["name"]))
+        if old is None or "error" in card or "error" in old:
+            continue
+        notes = []
+        if card["p95_ms"] > old["p95_ms"] * REGRESSION_RATIO:
+            notes.append(f"p95 {old['p95_ms']:.1f} -> {card['p95_ms']:.1f} ms")
+        if card["plan_hash"] != old["plan_hash"]:
+            notes.append(f"plan changed: {old['plan_shape']}  =>  {card['plan_shape']}")
+        if notes:
+            flagged += 1
+            print(f"  ! {card['name']}: {'; '.join(notes)}")
+    if not flagged:
+        print("  No regressions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard card SQL with EXPLAIN ANALYZE")
+    parser.add_argument("--dsn", help="libpq connection string (default: DB_CONFIG of seed_extended_data.py)")
+    parser.add_argument("--runs", type=int, default=RUNS, help="Timed executions per card")
+    parser.add_argument("--timeout", type=int, default=STATEMENT_TIMEOUT_S,
+                        help="statement_timeout per query, in seconds")
+    parser.add_argument("--definitions", default=DEFINITIONS_DIR, help="Directory of declarative card files")
+    parser.add_argument("--cards", nargs="+", metavar="NAME", help="Only benchmark cards with these names")
+    parser.add_argument("--output", default="card_benchmark.json", help="JSON results file")
+    parser.add_argument("--baseline", metavar="PATH", help="Earlier results file to compare against")
+    args = parser.parse_args()
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    queries = card_queries(args.definitions)
+    if args.cards:
+        queries = [q for q in queries if q[1] in args.cards]
+
+    conn = db_pool.connect({}, dsn=args.dsn) if args.dsn else db_pool.connect(DB_CONFIG)
+    conn.set_session(readonly=True, autocommit=True)
+    results = []
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET statement_timeout = %s", (args.timeout * 1000,))
+            cur.execute("SELECT current_database(), version()")
+            database, version = cur.fetchone()
+            print(f"Benchmarking {len(queries)} cards on {database}, {args.runs} runs each\n")
+            print(f"{'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'hit':>8} {'read':>8}  card")
+            for source, name, sql in queries:
+                entry = {"source": source, "name": name, "query": sql}
+                try:
+                    entry.update(benchmark(cur, sql, args.runs))
+                    print(f"{entry['p50_ms']:9.1f} {entry['p95_ms']:9.1f} {entry['max_ms']:9.1f} "
+                          f"{entry['shared_hit'] or 0:8} {entry['shared_read'] or 0:8}  {name}")
+                except psycopg2.Error as e:
+                    entry["error"] = str(e).strip()
+                    print(f"{'failed':>9} {'':>9} {'':>9} {'':>8} {'':>8}  {name}: {entry['error']}")
+                results.append(entry)
+    finally:
+        conn.close()
+
+    report = {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "database": database,
+        "server_version": version,
+        "runs": args.runs,
+        "cards": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\nResults written to {args.output}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
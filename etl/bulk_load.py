@@ -0,0 +1,69 @@
+"""
+Bulk loading helpers shared by the ETL scripts.
+
+- copy_rows / copy_columns: stream rows into a table with COPY FROM STDIN
+- upsert_rows: paged multi-row INSERT ... ON CONFLICT for tables that need upserts
+"""
+
+import io
+import psycopg2.extras
+
+# Rows per multi-row INSERT ... ON CONFLICT statement
+UPSERT_PAGE_SIZE = 500
+
+
+def _copy_text(value):
+    """Render a single value in PostgreSQL COPY text format."""
+    if value is None:
+        return '\\N'
+    return (str(value)
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r'))
+
+
+def copy_rows(cur, table, columns, rows):
+    """Bulk load rows into a table with COPY FROM STDIN from an in-memory buffer.
+
+    Values are sent in COPY text format, so enum columns such as
+    ``delivery_status`` are cast by the column's input function exactly like
+    an explicit ``::delivery_status_enum`` would. Columns left out of
+    ``columns`` (``created_at``, serial ids) get their table defaults.
+    """
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write('\t'.join(_copy_text(value) for value in row))
+        buffer.write('\n')
+        count += 1
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+    return count
+
+
+def copy_columns(cur, table, columns, batch):
+    """COPY a columnar batch (dict of column name -> equal-length sequence) into a table."""
+    return copy_rows(cur, table, columns, zip(*(batch[col] for col in columns)))
+
+
+def upsert_rows(cur, table, columns, rows, conflict_columns, page_size=UPSERT_PAGE_SIZE,
+                update_columns=None):
+    """Insert rows in pages of multi-row INSERT ... ON CONFLICT statements.
+
+    Existing rows are left untouched unless ``update_columns`` is given, in
+    which case those columns are overwritten from the incoming row.
+    """
+    rows = list(rows)
+    if update_columns:
+        on_conflict = "DO UPDATE SET " + ", ".join(f"{col} = EXCLUDED.{col}" for col in update_columns)
+    else:
+        on_conflict = "DO NOTHING"
+    psycopg2.extras.execute_values(
+        cur,
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s "
+        f"ON CONFLICT ({', '.join(conflict_columns)}) {on_conflict}",
+        rows,
+        page_size=page_size,
+    )
+    return len(rows)
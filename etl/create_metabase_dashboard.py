@@ -5,16 +5,30 @@ Creates a visually appealing demo dashboard via Metabase API
 
 Usage:
     python create_metabase_dashboard.py --email admin@example.com --password yourpass
+    python create_metabase_dashboard.py --email admin@example.com --workers 16
+
+Every card is run once after the deploy (MetabaseAPI.warm_dashboard), so
+Metabase's result cache and Postgres's buffer cache are hot before anyone
+opens the dashboard.
+
+Cards with a ``materialize`` block read from a sales_insights.mv_* view,
+which is created (see materialized_views.py) before the cards are.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import argparse
 import sys
 import time
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 METABASE_URL = "http://localhost:3000"
 
+# Cards created at once; also the size of the keep-alive connection pool
+CARD_WORKERS = 8
+
 # Color palette
 COLORS = {
     "primary": "#005F73",
@@ -39,208 +53,22 @@ CATEGORY_COLORS = {
     "Non Woven": "#AE2012",
 }
 
-
-class MetabaseAPI:
-    def __init__(self, base_url):
-        self.base_url = base_url
-        self.session_token = None
-        self.database_id = None
-
-    def authenticate(self, email, password):
-        """Get session token from Metabase"""
-        response = requests.post(
-            f"{self.base_url}/api/session",
-            json={"username": email, "password": password}
-        )
-        if response.status_code != 200:
-            raise Exception(f"Authentication failed: {response.text}")
-        self.session_token = response.json()["id"]
-        print(f"✓ Authenticated successfully")
-        return self.session_token
-
-    def _headers(self):
-        return {"X-Metabase-Session": self.session_token}
-
-    def get_databases(self):
-        """List all databases"""
-        response = requests.get(
-            f"{self.base_url}/api/database",
-            headers=self._headers()
-        )
-        return response.json()["data"]
-
-    def find_database(self, name_contains="epb"):
-        """Find database by partial name match"""
-        databases = self.get_databases()
-        for db in databases:
-            if name_contains.lower() in db["name"].lower():
-                self.database_id = db["id"]
-                print(f"✓ Found database: {db['name']} (ID: {db['id']})")
-                return db["id"]
-        # If no match, use first non-sample database
-        for db in databases:
-            if "sample" not in db["name"].lower():
-                self.database_id = db["id"]
-                print(f"✓ Using database: {db['name']} (ID: {db['id']})")
-                return db["id"]
-        raise Exception("No suitable database found")
-
-    def create_collection(self, name, color="#509EE3"):
-        """Create a collection to organize dashboards"""
-        response = requests.post(
-            f"{self.base_url}/api/collection",
-            headers=self._headers(),
-            json={"name": name, "color": color}
-        )
-        if response.status_code == 200:
-            collection_id = response.json()["id"]
-            print(f"✓ Created collection: {name} (ID: {collection_id})")
-            return collection_id
-        else:
-            print(f"  Collection may already exist, continuing...")
-            # Try to find existing collection
-            collections = requests.get(
-                f"{self.base_url}/api/collection",
-                headers=self._headers()
-            ).json()
-            for c in collections:
-                if c.get("name") == name:
-                    return c["id"]
-            return None
-
-    def create_card(self, name, query, display_type, vis_settings=None, description=None):
-        """Create a question/card"""
-        payload = {
-            "name": name,
-            "display": display_type,
-            "dataset_query": {
-                "type": "native",
-                "native": {"query": query},
-                "database": self.database_id
-            },
-            "visualization_settings": vis_settings or {}
-        }
-        # Only include description if it's a non-empty string
-        if description:
-            payload["description"] = description
-        response = requests.post(
-            f"{self.base_url}/api/card",
-            headers=self._headers(),
-            json=payload
-        )
-        if response.status_code == 200:
-            card_id = response.json()["id"]
-            print(f"  ✓ Created card: {name} (ID: {card_id})")
-            return card_id
-        else:
-            print(f"  ✗ Failed to create card {name}: {response.text}")
-            return None
-
-    def create_dashboard(self, name, description="", collection_id=None):
-        """Create a dashboard"""
-        payload = {
-            "name": name,
-            "description": description,
-        }
-        if collection_id:
-            payload["collection_id"] = collection_id
-
-        response = requests.post(
-            f"{self.base_url}/api/dashboard",
-            headers=self._headers(),
-            json=payload
-        )
-        if response.status_code == 200:
-            dashboard_id = response.json()["id"]
-            print(f"✓ Created dashboard: {name} (ID: {dashboard_id})")
-            return dashboard_id
-        else:
-            print(f"✗ Failed to create dashboard: {response.text}")
-            return None
-
-    def update_dashboard_cards(self, dashboard_id, cards_layout):
-        """Update dashboard with all cards at once (Metabase v0.50+)"""
-        dashcards = []
-        for idx, (card_id, row, col, size_x, size_y) in enumerate(cards_layout):
-            if card_id:
-                dashcards.append({
-                    "id": -(idx + 1),  # Negative ID for new cards
-                    "card_id": card_id,
-                    "row": row,
-                    "col": col,
-                    "size_x": size_x,
-                    "size_y": size_y
-                })
-
-        response = requests.put(
-            f"{self.base_url}/api/dashboard/{dashboard_id}",
-            headers=self._headers(),
-            json={"dashcards": dashcards}
-        )
-        if response.status_code == 200:
-            added = len(response.json().get("dashcards", []))
-            print(f"  ✓ Added {added} cards to dashboard")
-            return True
-        else:
-            print(f"  ✗ Failed to update dashboard: {response.text}")
-            return False
-
-    def add_text_card(self, dashboard_id, text, row, col, size_x, size_y):
-        """Add a text/heading card to dashboard"""
-        payload = {
-            "cardId": None,
-            "row": row,
-            "col": col,
-            "size_x": size_x,
-            "size_y": size_y,
-            "visualization_settings": {
-                "virtual_card": {
-                    "name": None,
-                    "display": "text",
-                    "visualization_settings": {},
-                    "dataset_query": {},
-                    "archived": False
-                },
-                "text": text
-            }
-        }
-        response = requests.post(
-            f"{self.base_url}/api/dashboard/{dashboard_id}/cards",
-            headers=self._headers(),
-            json=payload
-        )
-        return response.status_code == 200
-
-
-def create_demo_dashboard(api):
-    """Create the complete demo dashboard with all cards"""
-
-    # Create collection
-    collection_id = api.create_collection("EPB Sales Demo", "#0A9396")
-
-    # Create main dashboard
-    dashboard_id = api.create_dashboard(
-        name="EPB Sales Insights Demo",
-        description="Executive dashboard showcasing sales performance, product analytics, and customer insights from KINTEX data",
-        collection_id=collection_id
-    )
-
-    if not dashboard_id:
-        print("Failed to create dashboard, exiting")
-        return
-
-    print("\n--- Creating Executive Overview Cards ---")
+# Cards of the demo dashboard, keyed for DEMO_LAYOUT. Cards are independent
+# of each other, so they are created concurrently (MetabaseAPI.create_cards).
+DEMO_CARDS = [
+    # --- Executive Overview ---
 
     # Card 1: Total Revenue (Big Number)
-    card1 = api.create_card(
-        name="Total Revenue",
-        query="""
+    {
+        "key": "total_revenue",
+        "name": "Total Revenue",
+        "query": """
 SELECT SUM(revenue_amount) AS total_revenue
-FROM sales_insights.sales_orders
+FROM sales_insights.daily_sales_rollup
 WHERE order_date >= '2025-06-01';
         """.strip(),
-        display_type="scalar",
-        vis_settings={
+        "display": "scalar",
+        "visualization_settings": {
             "column_settings": {
                 '["name","total_revenue"]': {
                     "prefix": "MYR ",
@@ -249,19 +77,20 @@ WHERE order_date >= '2025-06-01';
                 }
             }
         },
-        description="Total revenue from all orders since June 2025"
-    )
+        "description": "Total revenue from all orders since June 2025"
+    },
 
     # Card 2: Order Count
-    card2 = api.create_card(
-        name="Total Orders",
-        query="""
-SELECT COUNT(DISTINCT order_id) AS total_orders
-FROM sales_insights.sales_orders
+    {
+        "key": "total_orders",
+        "name": "Total Orders",
+        "query": """
+SELECT SUM(order_count) AS total_orders
+FROM sales_insights.daily_sales_rollup
 WHERE order_date >= '2025-06-01';
         """.strip(),
-        display_type="scalar",
-        vis_settings={
+        "display": "scalar",
+        "visualization_settings": {
             "column_settings": {
                 '["name","total_orders"]': {
                     "suffix": " orders",
@@ -270,18 +99,19 @@ WHERE order_date >= '2025-06-01';
                 }
             }
         }
-    )
+    },
 
     # Card 3: Average Order Value
-    card3 = api.create_card(
-        name="Average Order Value",
-        query="""
-SELECT ROUND(SUM(revenue_amount) / COUNT(DISTINCT order_id), 2) AS avg_order_value
-FROM sales_insights.sales_orders
+    {
+        "key": "avg_order_value",
+        "name": "Average Order Value",
+        "query": """
+SELECT ROUND(SUM(revenue_amount) / NULLIF(SUM(order_count), 0), 2) AS avg_order_value
+FROM sales_insights.daily_sales_rollup
 WHERE order_date >= '2025-06-01';
         """.strip(),
-        display_type="scalar",
-        vis_settings={
+        "display": "scalar",
+        "visualization_settings": {
             "column_settings": {
                 '["name","avg_order_value"]': {
                     "prefix": "MYR ",
@@ -290,18 +120,19 @@ WHERE order_date >= '2025-06-01';
                 }
             }
         }
-    )
+    },
 
     # Card 4: Gross Margin %
-    card4 = api.create_card(
-        name="Gross Profit Margin",
-        query="""
+    {
+        "key": "gross_margin",
+        "name": "Gross Profit Margin",
+        "query": """
 SELECT ROUND(SUM(gross_profit) / NULLIF(SUM(revenue_amount), 0) * 100, 1) AS margin_pct
-FROM sales_insights.sales_orders
+FROM sales_insights.daily_sales_rollup
 WHERE order_date >= '2025-06-01';
         """.strip(),
-        display_type="scalar",
-        vis_settings={
+        "display": "scalar",
+        "visualization_settings": {
             "column_settings": {
                 '["name","margin_pct"]': {
                     "suffix": "%",
@@ -310,23 +141,24 @@ WHERE order_date >= '2025-06-01';
                 }
             }
         }
-    )
+    },
 
     # Card 5: Monthly Revenue Trend (Line Chart)
-    card5 = api.create_card(
-        name="Monthly Revenue & Profit Trend",
-        query="""
+    {
+        "key": "monthly_trend",
+        "name": "Monthly Revenue & Profit Trend",
+        "query": """
 SELECT
     DATE_TRUNC('month', order_date)::date AS month,
     SUM(revenue_amount) AS revenue,
     SUM(gross_profit) AS profit
-FROM sales_insights.sales_orders
+FROM sales_insights.daily_sales_rollup
 WHERE order_date >= '2025-06-01'
 GROUP BY DATE_TRUNC('month', order_date)
 ORDER BY month;
         """.strip(),
-        display_type="line",
-        vis_settings={
+        "display": "line",
+        "visualization_settings": {
             "graph.dimensions": ["month"],
             "graph.metrics": ["revenue", "profit"],
             "graph.x_axis.title_text": "Month",
@@ -334,80 +166,84 @@ ORDER BY month;
             "graph.colors": [COLORS["secondary"], COLORS["accent3"]],
             "graph.show_values": False
         }
-    )
+    },
 
     # Card 6: Top 5 Salespeople (Horizontal Bar)
-    card6 = api.create_card(
-        name="Top 5 Sales Representatives",
-        query="""
+    {
+        "key": "top_salespeople",
+        "name": "Top 5 Sales Representatives",
+        "query": """
 SELECT
     sp.salesperson_name,
     SUM(o.revenue_amount) AS revenue
-FROM sales_insights.sales_orders o
+FROM sales_insights.daily_sales_rollup o
 JOIN sales_insights.salespeople sp ON o.salesperson_id = sp.salesperson_id
 WHERE o.order_date >= '2025-06-01'
 GROUP BY sp.salesperson_name
 ORDER BY revenue DESC
 LIMIT 5;
         """.strip(),
-        display_type="bar",
-        vis_settings={
+        "display": "bar",
+        "visualization_settings": {
             "graph.dimensions": ["salesperson_name"],
             "graph.metrics": ["revenue"],
             "graph.x_axis.title_text": "Revenue (MYR)",
             "graph.colors": [COLORS["primary"]],
             "graph.show_values": True
         }
-    )
+    },
 
-    print("\n--- Creating Product Performance Cards ---")
+    # --- Product Performance ---
 
     # Card 7: Revenue by Category (Pie/Donut)
-    card7 = api.create_card(
-        name="Revenue by Product Category",
-        query="""
+    {
+        "key": "revenue_by_category",
+        "name": "Revenue by Product Category",
+        "query": """
 SELECT
     product_category,
     SUM(revenue_amount) AS revenue
-FROM sales_insights.sales_orders
+FROM sales_insights.daily_sales_rollup
 WHERE order_date >= '2025-06-01'
 GROUP BY product_category
 ORDER BY revenue DESC;
         """.strip(),
-        display_type="pie",
-        vis_settings={
+        "display": "pie",
+        "visualization_settings": {
             "pie.show_legend": True,
             "pie.percent_visibility": "inside",
             "pie.show_total": True
         }
-    )
+    },
 
     # Card 8: Margin by Category (Bar Chart)
-    card8 = api.create_card(
-        name="Profit Margin by Category",
-        query="""
+    {
+        "key": "margin_by_category",
+        "name": "Profit Margin by Category",
+        "query": """
 SELECT
     product_category,
     ROUND(SUM(gross_profit) / NULLIF(SUM(revenue_amount), 0) * 100, 1) AS margin_pct
-FROM sales_insights.sales_orders
+FROM sales_insights.daily_sales_rollup
 WHERE order_date >= '2025-06-01'
 GROUP BY product_category
 ORDER BY margin_pct DESC;
         """.strip(),
-        display_type="bar",
-        vis_settings={
+        "display": "bar",
+        "visualization_settings": {
             "graph.dimensions": ["product_category"],
             "graph.metrics": ["margin_pct"],
             "graph.x_axis.title_text": "Margin %",
             "graph.colors": [COLORS["accent3"]],
             "graph.show_values": True
         }
-    )
+    },
 
     # Card 9: Top Products Table
-    card9 = api.create_card(
-        name="Top 10 Products by Revenue",
-        query="""
+    {
+        "key": "top_products",
+        "name": "Top 10 Products by Revenue",
+        "query": """
 SELECT
     product_name,
     product_category,
@@ -420,41 +256,52 @@ GROUP BY product_name, product_category
 ORDER BY revenue DESC
 LIMIT 10;
         """.strip(),
-        display_type="table",
-        vis_settings={
+        "display": "table",
+        "visualization_settings": {
             "column_settings": {
                 '["name","revenue"]': {"prefix": "MYR ", "decimals": 0}
             }
         }
-    )
+    },
 
     # Card 10: Sales Channel Mix
-    card10 = api.create_card(
-        name="Revenue by Sales Channel",
-        query="""
+    {
+        "key": "revenue_by_channel",
+        "name": "Revenue by Sales Channel",
+        "query": """
 SELECT
     sales_channel,
     SUM(revenue_amount) AS revenue
-FROM sales_insights.sales_orders
+FROM sales_insights.daily_sales_rollup
 WHERE order_date >= '2025-06-01'
 GROUP BY sales_channel
 ORDER BY revenue DESC;
         """.strip(),
-        display_type="bar",
-        vis_settings={
+        "display": "bar",
+        "visualization_settings": {
             "graph.dimensions": ["sales_channel"],
             "graph.metrics": ["revenue"],
             "graph.colors": [COLORS["secondary"]],
             "graph.show_values": True
         }
-    )
+    },
 
-    print("\n--- Creating Customer & Pipeline Cards ---")
+    # --- Customer & Pipeline ---
 
     # Card 11: Top Customers
-    card11 = api.create_card(
-        name="Top 10 Customers by Revenue",
-        query="""
+    {
+        "key": "top_customers",
+        "name": "Top 10 Customers by Revenue",
+        "query": """
+SELECT customer_name, customer_segment, revenue, order_count
+FROM sales_insights.mv_top_customers_revenue
+ORDER BY revenue DESC
+LIMIT 10;
+        """.strip(),
+        "materialize": {
+            "view": "mv_top_customers_revenue",
+            "unique_key": ["customer_name", "customer_segment"],
+            "query": """
 SELECT
     c.customer_name,
     c.customer_segment,
@@ -464,41 +311,41 @@ FROM sales_insights.sales_orders o
 JOIN sales_insights.customers c ON o.customer_id = c.customer_id
 WHERE o.order_date >= '2025-06-01'
 GROUP BY c.customer_name, c.customer_segment
-ORDER BY revenue DESC
-LIMIT 10;
-        """.strip(),
-        display_type="table",
-        vis_settings={
+            """.strip(),
+        },
+        "display": "table",
+        "visualization_settings": {
             "column_settings": {
                 '["name","revenue"]': {"prefix": "MYR ", "decimals": 0}
             }
         }
-    )
+    },
 
     # Card 12: Revenue by Segment (Pie)
-    card12 = api.create_card(
-        name="Revenue by Customer Segment",
-        query="""
+    {
+        "key": "revenue_by_segment",
+        "name": "Revenue by Customer Segment",
+        "query": """
 SELECT
-    c.customer_segment,
-    SUM(o.revenue_amount) AS revenue
-FROM sales_insights.sales_orders o
-JOIN sales_insights.customers c ON o.customer_id = c.customer_id
-WHERE o.order_date >= '2025-06-01'
-GROUP BY c.customer_segment
+    customer_segment,
+    SUM(revenue_amount) AS revenue
+FROM sales_insights.daily_sales_rollup
+WHERE order_date >= '2025-06-01'
+GROUP BY customer_segment
 ORDER BY revenue DESC;
         """.strip(),
-        display_type="pie",
-        vis_settings={
+        "display": "pie",
+        "visualization_settings": {
             "pie.show_legend": True,
             "pie.percent_visibility": "inside"
         }
-    )
+    },
 
     # Card 13: Revenue by Region
-    card13 = api.create_card(
-        name="Revenue by Region",
-        query="""
+    {
+        "key": "revenue_by_region",
+        "name": "Revenue by Region",
+        "query": """
 SELECT
     c.region,
     SUM(o.revenue_amount) AS revenue,
@@ -509,24 +356,25 @@ WHERE o.order_date >= '2025-06-01'
 GROUP BY c.region
 ORDER BY revenue DESC;
         """.strip(),
-        display_type="bar",
-        vis_settings={
+        "display": "bar",
+        "visualization_settings": {
             "graph.dimensions": ["region"],
             "graph.metrics": ["revenue"],
             "graph.colors": [COLORS["primary"]],
             "graph.show_values": True
         }
-    )
+    },
 
     # Card 14: Quotation Pipeline
-    card14 = api.create_card(
-        name="Quotation Pipeline by Status",
-        query="""
+    {
+        "key": "quotation_pipeline",
+        "name": "Quotation Pipeline by Status",
+        "query": """
 SELECT
     status,
-    COUNT(*) AS quote_count,
+    SUM(quote_count) AS quote_count,
     SUM(quoted_amount) AS total_value
-FROM sales_insights.sales_quotations
+FROM sales_insights.daily_quotation_rollup
 WHERE quotation_date >= '2025-06-01'
 GROUP BY status
 ORDER BY
@@ -537,8 +385,8 @@ ORDER BY
         WHEN 'Lost' THEN 4
     END;
         """.strip(),
-        display_type="bar",
-        vis_settings={
+        "display": "bar",
+        "visualization_settings": {
             "graph.dimensions": ["status"],
             "graph.metrics": ["total_value"],
             "graph.x_axis.title_text": "Status",
@@ -546,22 +394,31 @@ ORDER BY
             "graph.colors": [COLORS["accent4"]],
             "graph.show_values": True
         }
-    )
+    },
 
     # Card 15: Quote-to-Order Conversion
-    card15 = api.create_card(
-        name="Quote-to-Order Conversion by Category",
-        query="""
+    {
+        "key": "quote_conversion",
+        "name": "Quote-to-Order Conversion by Category",
+        "query": """
+SELECT product_category, quotations, converted, conversion_pct
+FROM sales_insights.mv_quote_conversion_by_category
+ORDER BY conversion_pct DESC NULLS LAST;
+        """.strip(),
+        "materialize": {
+            "view": "mv_quote_conversion_by_category",
+            "unique_key": ["product_category"],
+            "query": """
 WITH quotes AS (
-    SELECT product_category, COUNT(DISTINCT quotation_id) AS quote_count
-    FROM sales_insights.sales_quotations
+    SELECT product_category, SUM(quote_count) AS quote_count
+    FROM sales_insights.daily_quotation_rollup
     WHERE quotation_date >= '2025-06-01'
     GROUP BY product_category
 ),
 orders AS (
-    SELECT product_category, COUNT(DISTINCT order_id) AS converted_orders
-    FROM sales_insights.sales_orders
-    WHERE quotation_id IS NOT NULL AND order_date >= '2025-06-01'
+    SELECT product_category, SUM(quoted_order_count) AS converted_orders
+    FROM sales_insights.daily_sales_rollup
+    WHERE order_date >= '2025-06-01'
     GROUP BY product_category
 )
 SELECT
@@ -571,81 +428,376 @@ SELECT
     ROUND(COALESCE(o.converted_orders, 0)::numeric / NULLIF(q.quote_count, 0) * 100, 1) AS conversion_pct
 FROM quotes q
 LEFT JOIN orders o ON q.product_category = o.product_category
-ORDER BY conversion_pct DESC NULLS LAST;
-        """.strip(),
-        display_type="table",
-        vis_settings={
+            """.strip(),
+        },
+        "display": "table",
+        "visualization_settings": {
             "column_settings": {
                 '["name","conversion_pct"]': {"suffix": "%", "decimals": 1}
             }
         }
-    )
+    },
 
     # Card 16: Daily Orders (Sparkline style)
-    card16 = api.create_card(
-        name="Daily Order Volume (Last 30 Days)",
-        query="""
+    {
+        "key": "daily_orders",
+        "name": "Daily Order Volume (Last 30 Days)",
+        "query": """
 SELECT
-    order_date::date AS date,
-    COUNT(*) AS orders,
+    order_date AS date,
+    SUM(order_count) AS orders,
     SUM(revenue_amount) AS revenue
-FROM sales_insights.sales_orders
+FROM sales_insights.daily_sales_rollup
 WHERE order_date >= CURRENT_DATE - INTERVAL '30 days'
-GROUP BY order_date::date
+GROUP BY order_date
 ORDER BY date;
         """.strip(),
-        display_type="line",
-        vis_settings={
+        "display": "line",
+        "visualization_settings": {
             "graph.dimensions": ["date"],
             "graph.metrics": ["orders"],
             "graph.colors": [COLORS["secondary"]],
             "graph.show_values": False
         }
+    },
+]
+
+# Dashboard layout: (card key, row, col, size_x, size_y) on Metabase's 18-column grid
+# Spacious layout for visual impact
+DEMO_LAYOUT = [
+    # ===== EXECUTIVE OVERVIEW SECTION =====
+    # Row 0-3: Hero KPI cards - large and prominent
+    ("total_revenue", 0, 0, 6, 4),          # Total Revenue - BIG hero metric
+    ("total_orders", 0, 6, 6, 4),           # Order Count
+    ("avg_order_value", 0, 12, 6, 4),       # AOV
+
+    # Row 4-7: Second row KPIs + key metric
+    ("gross_margin", 4, 0, 6, 4),           # Margin %
+    ("daily_orders", 4, 6, 12, 4),          # Daily Orders - wide sparkline
+
+    # Row 8-15: Main trend chart - full width hero
+    ("monthly_trend", 8, 0, 18, 8),         # Monthly Trend - FULL WIDTH
+
+    # Row 16-23: Salespeople + Category breakdown
+    ("top_salespeople", 16, 0, 9, 8),       # Top Salespeople - half width
+    ("revenue_by_category", 16, 9, 9, 8),   # Category Pie - half width
+
+    # ===== PRODUCT PERFORMANCE SECTION =====
+    # Row 24-31: Margin analysis
+    ("margin_by_category", 24, 0, 9, 8),    # Margin Bar
+    ("revenue_by_channel", 24, 9, 9, 8),    # Channel Mix
+
+    # Row 32-41: Products table - full width for readability
+    ("top_products", 32, 0, 18, 10),        # Products Table - FULL WIDTH
+
+    # ===== CUSTOMER & PIPELINE SECTION =====
+    # Row 42-51: Customer insights
+    ("top_customers", 42, 0, 12, 10),       # Top Customers - prominent
+    ("revenue_by_segment", 42, 12, 6, 5),   # Segment Pie
+    ("revenue_by_region", 47, 12, 6, 5),    # Region Bar
+
+    # Row 52-59: Pipeline analysis
+    ("quotation_pipeline", 52, 0, 9, 8),    # Pipeline Status
+    ("quote_conversion", 52, 9, 9, 8),      # Conversion Table
+]
+
+
+class MetabaseAPI:
+    def __init__(self, base_url, pool_size=CARD_WORKERS):
+        self.base_url = base_url
+        self.session_token = None
+        self.database_id = None
+        # One keep-alive session for every call, with a connection per worker
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Round trips made so far, for reporting what a deploy cost
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+        self.session.hooks["response"].append(self._count_call)
+
+    def _count_call(self, response, *args, **kwargs):
+        with self._calls_lock:
+            self.calls += 1
+
+    def authenticate(self, email, password):
+        """Get session token from Metabase"""
+        response = self.session.post(
+            f"{self.base_url}/api/session",
+            json={"username": email, "password": password}
+        )
+        if response.status_code != 200:
+            raise Exception(f"Authentication failed: {response.text}")
+        self.session_token = response.json()["id"]
+        self.session.headers["X-Metabase-Session"] = self.session_token
+        print(f"✓ Authenticated successfully")
+        return self.session_token
+
+    def get_databases(self):
+        """List all databases"""
+        response = self.session.get(f"{self.base_url}/api/database")
+        return response.json()["data"]
+
+    def find_database(self, name_contains="epb"):
+        """Find database by partial name match"""
+        databases = self.get_databases()
+        for db in databases:
+            if name_contains.lower() in db["name"].lower():
+                self.database_id = db["id"]
+                print(f"✓ Found database: {db['name']} (ID: {db['id']})")
+                return db["id"]
+        # If no match, use first non-sample database
+        for db in databases:
+            if "sample" not in db["name"].lower():
+                self.database_id = db["id"]
+                print(f"✓ Using database: {db['name']} (ID: {db['id']})")
+                return db["id"]
+        raise Exception("No suitable database found")
+
+    def find_collection(self, name):
+        """ID of the collection called ``name``, or None"""
+        collections = self.session.get(f"{self.base_url}/api/collection").json()
+        for c in collections:
+            if c.get("name") == name and not c.get("archived"):
+                return c["id"]
+        return None
+
+    def create_collection(self, name, color="#509EE3"):
+        """Create a collection to organize dashboards"""
+        response = self.session.post(
+            f"{self.base_url}/api/collection",
+            json={"name": name, "color": color}
+        )
+        if response.status_code == 200:
+            collection_id = response.json()["id"]
+            print(f"✓ Created collection: {name} (ID: {collection_id})")
+            return collection_id
+        else:
+            print(f"  Collection may already exist, continuing...")
+            # Try to find existing collection
+            collections = self.session.get(f"{self.base_url}/api/collection").json()
+            for c in collections:
+                if c.get("name") == name:
+                    return c["id"]
+            return None
+
+    def create_card(self, name, query, display_type, vis_settings=None, description=None, collection_id=None):
+        """Create a question/card"""
+        payload = {
+            "name": name,
+            "display": display_type,
+            "dataset_query": {
+                "type": "native",
+                "native": {"query": query},
+                "database": self.database_id
+            },
+            "visualization_settings": vis_settings or {}
+        }
+        # Only include description if it's a non-empty string
+        if description:
+            payload["description"] = description
+        if collection_id:
+            payload["collection_id"] = collection_id
+        response = self.session.post(
+            f"{self.base_url}/api/card",
+            json=payload
+        )
+        if response.status_code == 200:
+            card_id = response.json()["id"]
+            print(f"  ✓ Created card: {name} (ID: {card_id})")
+            return card_id
+        else:
+            print(f"  ✗ Failed to create card {name}: {response.text}")
+            return None
+
+    def create_cards(self, specs, workers=CARD_WORKERS, collection_id=None):
+        """Create independent cards concurrently; returns {key: card_id}, None for failed cards"""
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                spec["key"]: executor.submit(self.create_card, spec["name"], spec["query"], spec["display"],
+                                             spec.get("visualization_settings"), spec.get("description"),
+                                             collection_id)
+                for spec in specs
+            }
+            return {key: future.result() for key, future in futures.items()}
+
+    def update_card(self, card_id, fields):
+        """Update (or, with {"archived": True}, archive) an existing card"""
+        response = self.session.put(
+            f"{self.base_url}/api/card/{card_id}",
+            json=fields
+        )
+        if response.status_code == 200:
+            return True
+        print(f"  ✗ Failed to update card {card_id}: {response.text}")
+        return False
+
+    def create_dashboard(self, name, description="", collection_id=None):
+        """Create a dashboard"""
+        payload = {
+            "name": name,
+            "description": description,
+        }
+        if collection_id:
+            payload["collection_id"] = collection_id
+
+        response = self.session.post(
+            f"{self.base_url}/api/dashboard",
+            json=payload
+        )
+        if response.status_code == 200:
+            dashboard_id = response.json()["id"]
+            print(f"✓ Created dashboard: {name} (ID: {dashboard_id})")
+            return dashboard_id
+        else:
+            print(f"✗ Failed to create dashboard: {response.text}")
+            return None
+
+    def find_dashboard(self, name):
+        """ID of the (unarchived) dashboard called ``name``, or None"""
+        response = self.session.get(
+            f"{self.base_url}/api/search",
+            params={"q": name, "models": "dashboard"}
+        )
+        for item in response.json().get("data", []):
+            if item["name"] == name and not item.get("archived"):
+                return item["id"]
+        return None
+
+    def get_dashboard(self, dashboard_id):
+        """Dashboard with its tabs, parameters and dashcards (each embedding its full card)"""
+        response = self.session.get(f"{self.base_url}/api/dashboard/{dashboard_id}")
+        response.raise_for_status()
+        return response.json()
+
+    def update_dashboard(self, dashboard_id, fields):
+        """PUT dashboard fields (name, parameters, tabs, dashcards, ...) in one call"""
+        response = self.session.put(
+            f"{self.base_url}/api/dashboard/{dashboard_id}",
+            json=fields
+        )
+        if response.status_code == 200:
+            return response.json()
+        print(f"  ✗ Failed to update dashboard: {response.text}")
+        return None
+
+    def run_card(self, card_id):
+        """Run a saved card's query; returns its row count, or None if it failed"""
+        response = self.session.post(f"{self.base_url}/api/card/{card_id}/query")
+        if response.status_code in (200, 202):
+            result = response.json()
+            if result.get("status") == "completed":
+                return result.get("row_count", 0)
+        return None
+
+    def warm_dashboard(self, dashboard_id, workers=CARD_WORKERS):
+        """Run every card on a dashboard concurrently to prime the caches.
+
+        Returns [(card name, seconds, row count or None)], slowest first.
+        """
+        dashboard = self.get_dashboard(dashboard_id)
+        cards = {dc["card_id"]: dc["card"]["name"] for dc in dashboard.get("dashcards", []) if dc.get("card_id")}
+
+        def run(card_id):
+            started = time.perf_counter()
+            rows = self.run_card(card_id)
+            return cards[card_id], time.perf_counter() - started, rows
+
+        print(f"\n--- Warming {len(cards)} Cards ({workers} at a time) ---")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            timings = sorted(executor.map(run, cards), key=lambda t: t[1], reverse=True)
+        for name, seconds, rows in timings:
+            if rows is None:
+                print(f"  ✗ {seconds:6.2f}s  {name} (query failed)")
+            else:
+                print(f"  ✓ {seconds:6.2f}s  {name} ({rows} rows)")
+        print(f"  Warmed {sum(1 for _, _, rows in timings if rows is not None)}/{len(timings)} cards "
+              f"in {time.perf_counter() - started:.1f}s")
+        return timings
+
+    def update_dashboard_cards(self, dashboard_id, cards_layout):
+        """Update dashboard with all cards at once (Metabase v0.50+)"""
+        dashcards = []
+        for idx, (card_id, row, col, size_x, size_y) in enumerate(cards_layout):
+            if card_id:
+                dashcards.append({
+                    "id": -(idx + 1),  # Negative ID for new cards
+                    "card_id": card_id,
+                    "row": row,
+                    "col": col,
+                    "size_x": size_x,
+                    "size_y": size_y
+                })
+
+        response = self.session.put(
+            f"{self.base_url}/api/dashboard/{dashboard_id}",
+            json={"dashcards": dashcards}
+        )
+        if response.status_code == 200:
+            added = len(response.json().get("dashcards", []))
+            print(f"  ✓ Added {added} cards to dashboard")
+            return True
+        else:
+            print(f"  ✗ Failed to update dashboard: {response.text}")
+            return False
+
+    def add_text_card(self, dashboard_id, text, row, col, size_x, size_y):
+        """Add a text/heading card to dashboard"""
+        payload = {
+            "cardId": None,
+            "row": row,
+            "col": col,
+            "size_x": size_x,
+            "size_y": size_y,
+            "visualization_settings": {
+                "virtual_card": {
+                    "name": None,
+                    "display": "text",
+                    "visualization_settings": {},
+                    "dataset_query": {},
+                    "archived": False
+                },
+                "text": text
+            }
+        }
+        response = self.session.post(
+            f"{self.base_url}/api/dashboard/{dashboard_id}/cards",
+            json=payload
+        )
+        return response.status_code == 200
+
+
+def create_demo_dashboard(api, workers=CARD_WORKERS):
+    """Create the complete demo dashboard with all cards"""
+
+    # Create collection
+    collection_id = api.create_collection("EPB Sales Demo", "#0A9396")
+
+    # Create main dashboard
+    dashboard_id = api.create_dashboard(
+        name="EPB Sales Insights Demo",
+        description="Executive dashboard showcasing sales performance, product analytics, and customer insights from KINTEX data",
+        collection_id=collection_id
     )
 
+    if not dashboard_id:
+        print("Failed to create dashboard, exiting")
+        return
+
+    print(f"\n--- Creating {len(DEMO_CARDS)} Cards ({workers} at a time) ---")
+    started = time.perf_counter()
+    card_ids = api.create_cards(DEMO_CARDS, workers=workers)
+    print(f"  Created {sum(1 for card_id in card_ids.values() if card_id)} cards "
+          f"in {time.perf_counter() - started:.1f}s")
+
     print("\n--- Adding Cards to Dashboard ---")
 
-    # Layout: 18-column grid (Metabase default width)
-    # Spacious layout for visual impact
-    cards_layout = [
-        # ===== EXECUTIVE OVERVIEW SECTION =====
-        # Row 0-3: Hero KPI cards - large and prominent
-        (card1, 0, 0, 6, 4),     # Total Revenue - BIG hero metric
-        (card2, 0, 6, 6, 4),     # Order Count
-        (card3, 0, 12, 6, 4),    # AOV
-
-        # Row 4-7: Second row KPIs + key metric
-        (card4, 4, 0, 6, 4),     # Margin %
-        (card16, 4, 6, 12, 4),   # Daily Orders - wide sparkline
-
-        # Row 8-15: Main trend chart - full width hero
-        (card5, 8, 0, 18, 8),    # Monthly Trend - FULL WIDTH
-
-        # Row 16-23: Salespeople + Category breakdown
-        (card6, 16, 0, 9, 8),    # Top Salespeople - half width
-        (card7, 16, 9, 9, 8),    # Category Pie - half width
-
-        # ===== PRODUCT PERFORMANCE SECTION =====
-        # Row 24-31: Margin analysis
-        (card8, 24, 0, 9, 8),    # Margin Bar
-        (card10, 24, 9, 9, 8),   # Channel Mix
-
-        # Row 32-41: Products table - full width for readability
-        (card9, 32, 0, 18, 10),  # Products Table - FULL WIDTH
-
-        # ===== CUSTOMER & PIPELINE SECTION =====
-        # Row 42-51: Customer insights
-        (card11, 42, 0, 12, 10), # Top Customers - prominent
-        (card12, 42, 12, 6, 5),  # Segment Pie
-        (card13, 47, 12, 6, 5),  # Region Bar
-
-        # Row 52-59: Pipeline analysis
-        (card14, 52, 0, 9, 8),   # Pipeline Status
-        (card15, 52, 9, 9, 8),   # Conversion Table
-    ]
-
-    # Add all cards to dashboard in one API call
+    # Every card ID is known by now; add them all in one API call
+    cards_layout = [(card_ids[key], row, col, size_x, size_y) for key, row, col, size_x, size_y in DEMO_LAYOUT]
     api.update_dashboard_cards(dashboard_id, cards_layout)
+    api.warm_dashboard(dashboard_id, workers=workers)
 
     print(f"\n{'='*60}")
     print(f"✓ Dashboard created successfully!")
@@ -656,10 +808,53 @@ ORDER BY date;
     return dashboard_id
 
 
+def warm_after_load(dashboard_name, url=METABASE_URL, workers=CARD_WORKERS):
+    """Warm a dashboard by name once an ETL load has finished.
+
+    Credentials come from METABASE_EMAIL and METABASE_PASSWORD. A failure
+    is reported but never raised, since the load itself has already
+    succeeded.
+    """
+    email, password = os.environ.get("METABASE_EMAIL"), os.environ.get("METABASE_PASSWORD")
+    if not email or not password:
+        print("  Skipping Metabase warm-up: set METABASE_EMAIL and METABASE_PASSWORD")
+        return None
+    try:
+        api = MetabaseAPI(url, pool_size=workers)
+        api.authenticate(email, password)
+        dashboard_id = api.find_dashboard(dashboard_name)
+        if dashboard_id is None:
+            print(f"  Skipping Metabase warm-up: no dashboard named {dashboard_name!r}")
+            return None
+        return api.warm_dashboard(dashboard_id, workers=workers)
+    except Exception as e:
+        print(f"  ✗ Metabase warm-up failed: {e}")
+        return None
+
+
+def ensure_card_views(cards, dsn=None, dry_run=False):
+    """Create or rebuild the materialized views of ``cards``; returns {view: action}"""
+    # Imported here so talking to Metabase alone needs neither psycopg2 nor a DB config
+    import materialized_views
+    specs = materialized_views.card_views(cards)
+    if not specs:
+        return {}
+    import db_pool
+    from seed_extended_data import DB_CONFIG
+    conn = db_pool.connect({}, dsn=dsn) if dsn else db_pool.connect(DB_CONFIG)
+    try:
+        return materialized_views.ensure_views(conn, specs, dry_run=dry_run)
+    finally:
+        conn.close()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Create Metabase demo dashboard")
     parser.add_argument("--email", required=True, help="Metabase admin email")
     parser.add_argument("--password", required=False, help="Metabase admin password (will prompt if not provided)")
+    parser.add_argument("--workers", type=int, default=CARD_WORKERS, help="Cards created concurrently")
+    parser.add_argument("--dsn", help="libpq connection string for the card views "
+                                      "(default: DB_CONFIG of seed_extended_data.py)")
     args = parser.parse_args()
 
     print("="*60)
@@ -672,7 +867,7 @@ def main():
         print("Error: Password required. Provide via --password or METABASE_PASSWORD env var")
         sys.exit(1)
 
-    api = MetabaseAPI(METABASE_URL)
+    api = MetabaseAPI(METABASE_URL, pool_size=args.workers)
 
     try:
         # Authenticate
@@ -681,8 +876,11 @@ def main():
         # Find database
         api.find_database("epb")
 
+        # Views behind the materialized cards must exist before the cards run
+        ensure_card_views(DEMO_CARDS, dsn=args.dsn)
+
         # Create dashboard
-        create_demo_dashboard(api)
+        create_demo_dashboard(api, workers=args.workers)
 
     except Exception as e:
         print(f"\n✗ Error: {e}")
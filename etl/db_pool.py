@@ -0,0 +1,158 @@
+"""
+Connection pooling, TCP keepalives and transient-failure retry for the ETL scripts.
+
+Usage:
+    pool = db_pool.get_pool(RDS_DB, maxconn=4)
+    with db_pool.pooled(pool) as conn:
+        ...
+
+    # Each chunk commits on its own; a dropped connection only replays that chunk
+    db_pool.write_chunks(pool, chunks, lambda conn, rows: copy_rows(conn.cursor(), ...))
+
+Connections are opened with keepalives so idle sockets across the WAN link
+to RDS are not silently dropped, and every connect is retried with
+exponential backoff on OperationalError / InterfaceError.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.pool
+
+from etl_metrics import InstrumentedConnection
+
+KEEPALIVE_OPTIONS = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 5,
+    "connect_timeout": 15,
+}
+
+# Errors worth retrying: the server or network went away, not a bad statement
+TRANSIENT_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+CONNECT_ATTEMPTS = 5
+WRITE_ATTEMPTS = 4
+BACKOFF_SECONDS = 1.0
+CHUNK_SIZE = 5000
+
+
+def backoff_delay(attempt, base=BACKOFF_SECONDS):
+    """Exponentially growing, jittered delay in seconds before retry ``attempt``"""
+    return base * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+
+def backoff(attempt, base=BACKOFF_SECONDS):
+    """Sleep for backoff_delay(attempt) seconds"""
+    time.sleep(backoff_delay(attempt, base))
+
+
+def connect(config, attempts=CONNECT_ATTEMPTS, **kwargs):
+    """Open a keepalive-enabled, instrumented connection, retrying transient failures"""
+    options = {**KEEPALIVE_OPTIONS, "connection_factory": InstrumentedConnection, **config, **kwargs}
+    for attempt in range(1, attempts + 1):
+        try:
+            return psycopg2.connect(**options)
+        except TRANSIENT_ERRORS as e:
+            if attempt == attempts:
+                raise
+            print(f"  Connect to {config.get('host')} failed ({str(e).strip()}), retry {attempt}/{attempts - 1}")
+            backoff(attempt)
+
+
+class RetryingPool(psycopg2.pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool that retries connects and never hands out closed connections"""
+
+    def __init__(self, minconn, maxconn, config, attempts=CONNECT_ATTEMPTS):
+        self._config = config
+        self._attempts = attempts
+        super().__init__(minconn, maxconn)
+
+    def _connect(self, key=None):
+        conn = connect(self._config, self._attempts)
+        if key is not None:
+            self._used[key] = conn
+            self._rused[id(conn)] = key
+        else:
+            self._pool.append(conn)
+        return conn
+
+    def getconn(self, key=None):
+        conn = super().getconn(key)
+        while conn.closed:
+            # Broken by a network drop while idle in the pool: replace it
+            self.putconn(conn, key, close=True)
+            conn = super().getconn(key)
+        return conn
+
+
+_pools = {}
+
+
+def get_pool(config, maxconn=4, minconn=1):
+    """Shared pool per database config, created on first use"""
+    key = tuple(sorted(config.items()))
+    if key not in _pools:
+        _pools[key] = RetryingPool(minconn, maxconn, config)
+    return _pools[key]
+
+
+def close_all():
+    for pool in _pools.values():
+        pool.closeall()
+    _pools.clear()
+
+
+@contextmanager
+def pooled(pool):
+    """Borrow a connection; broken connections are discarded instead of returned"""
+    conn = pool.getconn()
+    broken = False
+    try:
+        yield conn
+    except TRANSIENT_ERRORS:
+        broken = True
+        raise
+    finally:
+        if not conn.closed and not broken:
+            conn.rollback()
+        pool.putconn(conn, close=broken or bool(conn.closed))
+
+
+def chunked(rows, size=CHUNK_SIZE):
+    """Split a sequence of rows into lists of at most ``size`` rows"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_chunks(pool, chunks, write, attempts=WRITE_ATTEMPTS):
+    """Apply ``write(conn, chunk)`` to each chunk in its own committed transaction.
+
+    A transient failure rolls back and replays only the failing chunk on a
+    fresh connection; chunks already committed are not repeated. Returns the
+    sum of the values returned by ``write``.
+    """
+    total = 0
+    for chunk in chunks:
+        for attempt in range(1, attempts + 1):
+            try:
+                with pooled(pool) as conn:
+                    result = write(conn, chunk)
+                    conn.commit()
+                total += result or 0
+                break
+            except TRANSIENT_ERRORS as e:
+                if attempt == attempts:
+                    raise
+                print(f"  Write failed ({str(e).strip()}), replaying chunk ({attempt}/{attempts - 1})")
+                backoff(attempt)
+    return total
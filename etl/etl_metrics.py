@@ -0,0 +1,266 @@
+"""
+Per-stage timing and throughput instrumentation for the ETL scripts.
+
+Usage:
+    metrics = etl_metrics.start_run("kintex_to_rds", progress=True)
+    conn = psycopg2.connect(connection_factory=etl_metrics.InstrumentedConnection, **DB)
+
+    with etl_metrics.stage("generate_sales_orders") as st:
+        st.add_rows(generate_sales_orders(conn))
+
+    metrics.write_report("run.json")   # or run.csv
+
+Every stage records wall time, rows, rows/sec, database round trips and
+bytes sent. Round trips and bytes are counted by InstrumentedConnection /
+InstrumentedCursor and attributed to the stage active on the calling
+thread, so stages running on worker threads are measured independently.
+Commits are additionally aggregated into a "commit" stage.
+"""
+
+import csv
+import json
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import psycopg2.extensions
+
+REPORT_FIELDS = ("stage", "calls", "seconds", "rows", "rows_per_sec", "round_trips", "bytes_sent")
+
+_run = None
+_local = threading.local()
+
+
+class StageStats:
+    """Accumulated counters for one named stage (may be entered many times)"""
+
+    def __init__(self, name, run=None):
+        self.name = name
+        self.run = run
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.round_trips = 0
+        self.bytes_sent = 0
+        self._started = None
+        self._lock = threading.Lock()
+
+    def add_rows(self, n):
+        with self._lock:
+            self.rows += n or 0
+
+    def add_io(self, round_trips=1, bytes_sent=0):
+        with self._lock:
+            self.round_trips += round_trips
+            self.bytes_sent += bytes_sent
+
+    def progress(self, done, total, label=""):
+        """Draw a live progress line with ETA (when the run enables it)"""
+        if not (self.run and self.run.show_progress and self._started):
+            return
+        elapsed = time.perf_counter() - self._started
+        eta = elapsed / done * (total - done) if done else 0.0
+        sys.stderr.write(f"\r  {self.name} {label} [{done}/{total}] "
+                         f"{elapsed:,.0f}s elapsed, ETA {eta:,.0f}s   ")
+        if done >= total:
+            sys.stderr.write("\n")
+        sys.stderr.flush()
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "calls": self.calls,
+            "seconds": round(self.seconds, 3),
+            "rows": self.rows,
+            "rows_per_sec": round(self.rows_per_sec, 1),
+            "round_trips": self.round_trips,
+            "bytes_sent": self.bytes_sent,
+        }
+
+
+class RunMetrics:
+    """All stages of one ETL run, in the order they were first entered"""
+
+    def __init__(self, name, show_progress=False):
+        self.name = name
+        self.show_progress = show_progress
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def get_stage(self, name):
+        with self._lock:
+            if name not in self.stages:
+                self.stages[name] = StageStats(name, self)
+            return self.stages[name]
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def report(self):
+        return {
+            "run": self.name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "elapsed_seconds": round(self.elapsed, 3),
+            "stages": [s.as_dict() for s in self.stages.values()],
+        }
+
+    def write_report(self, path):
+        """Write the run report as JSON, or CSV when the path ends in .csv"""
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+                writer.writeheader()
+                writer.writerows(s.as_dict() for s in self.stages.values())
+        else:
+            with open(path, "w") as f:
+                json.dump(self.report(), f, indent=2)
+        print(f"Wrote run report to {path}")
+
+    def print_summary(self):
+        print(f"\n{'Stage':<32}{'Seconds':>10}{'Rows':>12}{'Rows/s':>12}{'Trips':>8}{'Bytes':>14}")
+        for s in self.stages.values():
+            print(f"{s.name:<32}{s.seconds:>10.2f}{s.rows:>12,}{s.rows_per_sec:>12,.0f}"
+                  f"{s.round_trips:>8,}{s.bytes_sent:>14,}")
+        print(f"{'total':<32}{self.elapsed:>10.2f}")
+
+
+def start_run(name, progress=False):
+    """Start collecting metrics for this process; returns the RunMetrics"""
+    global _run
+    _run = RunMetrics(name, progress)
+    return _run
+
+
+def current_stage():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def progress(done, total, label=""):
+    """Update the progress line of the stage active on this thread, if any"""
+    stats = current_stage()
+    if stats is not None:
+        stats.progress(done, total, label)
+
+
+@contextmanager
+def stage(name):
+    """Time a block as (part of) the named stage on the current thread"""
+    stats = _run.get_stage(name) if _run else StageStats(name)
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(stats)
+    started = time.perf_counter()
+    stats._started = stats._started or started
+    try:
+        yield stats
+    finally:
+        stack.pop()
+        with stats._lock:
+            stats.calls += 1
+            stats.seconds += time.perf_counter() - started
+
+
+def record(name, seconds, rows=0):
+    """Add one timed call to the named stage without making it current.
+
+    For asyncio code, where many calls of different stages are in flight on
+    one thread and the thread-local stack used by stage() cannot tell them
+    apart. Round trips and bytes are not counted for such calls.
+    """
+    stats = _run.get_stage(name) if _run else StageStats(name)
+    with stats._lock:
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.rows += rows or 0
+    return stats
+
+
+class _CountingReader:
+    """File wrapper that counts bytes handed to COPY FROM STDIN"""
+
+    def __init__(self, f):
+        self._f = f
+        self.bytes = 0
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        self.bytes += len(data.encode("utf-8") if isinstance(data, str) else data)
+        return data
+
+    def readline(self, size=-1):
+        data = self._f.readline(size)
+        self.bytes += len(data.encode("utf-8") if isinstance(data, str) else data)
+        return data
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """Cursor that attributes round trips and bytes sent to the current stage"""
+
+    def _record(self, round_trips=1, extra_bytes=0):
+        stats = current_stage()
+        if stats is not None:
+            stats.add_io(round_trips, len(self.query or b"") + extra_bytes)
+
+    def execute(self, query, vars=None):
+        try:
+            return super().execute(query, vars)
+        finally:
+            self._record()
+
+    def executemany(self, query, vars_list):
+        vars_list = list(vars_list)
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            self._record(round_trips=len(vars_list))
+
+    def copy_expert(self, sql, file, size=8192):
+        # COPY ... TO STDOUT writes into the file and sends nothing but the statement
+        reader = None if re.search(r"\bTO\s+STDOUT\b", sql, re.IGNORECASE) else _CountingReader(file)
+        try:
+            return super().copy_expert(sql, reader or file, size)
+        finally:
+            stats = current_stage()
+            if stats is not None:
+                stats.add_io(1, len(sql) + (reader.bytes if reader else 0))
+
+    def fetchmany(self, size=None):
+        rows = super().fetchmany(size) if size is not None else super().fetchmany()
+        if self.name:  # named cursors fetch from the server on every call
+            stats = current_stage()
+            if stats is not None:
+                stats.add_io(1, 0)
+        return rows
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    """Connection whose cursors are instrumented and whose commits are timed"""
+
+    def cursor(self, *args, **kwargs):
+        kwargs.setdefault("cursor_factory", InstrumentedCursor)
+        return super().cursor(*args, **kwargs)
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = current_stage()
+            if stats is not None:
+                stats.add_io(1, 0)
+            if _run:
+                commit_stats = _run.get_stage("commit")
+                with commit_stats._lock:
+                    commit_stats.calls += 1
+                    commit_stats.seconds += elapsed
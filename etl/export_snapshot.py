@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Export the sales_insights schema to date-partitioned Parquet for local analysis.
+
+Usage:
+    python export_snapshot.py data/snapshot             # incremental: only changed months
+    python export_snapshot.py data/snapshot --full      # re-export everything
+    python export_snapshot.py data/snapshot --tables sales_orders sales_quotations
+
+    duckdb -init data/snapshot/views.sql               # then: SELECT ... FROM sales_orders
+
+Every table is streamed out with COPY ... TO STDOUT and converted to zstd
+Parquet, one file per month (<dir>/<table>/month=YYYY-MM/data.parquet) for
+dated tables and a single file for master data. The files are written with
+the column types declared in Postgres. A manifest records a fingerprint of
+every exported month. A re-run exports only the months whose fingerprint
+changed and drops the files of months that no longer exist. A month's
+fingerprint is its row count and a sum of row hashes, read from the monthly
+partition itself where the table is partitioned. Statistics counters are
+not used: they are not transactional and are lost on a stats reset.
+
+The whole export runs in one read-only REPEATABLE READ transaction, so
+every table comes from the same snapshot.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pacsv = pq = None
+
+import db_pool
+import etl_metrics
+from etl_metrics import stage
+from seed_extended_data import DB_CONFIG
+from sinks import PARQUET_COMPRESSION
+
+SCHEMA = "sales_insights"
+
+# Table -> date column it is partitioned by in the export (None: one file)
+EXPORT_TABLES = {
+    "customers": None,
+    "product_catalog": None,
+    "salespeople": None,
+    "sales_orders": "order_date",
+    "sales_quotations": "quotation_date",
+    "sales_targets": "target_date",
+    "inventory_snapshots": "snapshot_date",
+    "sales_forecasts": "forecast_date",
+    "daily_sales_rollup": "order_date",
+    "daily_quotation_rollup": "quotation_date",
+}
+
+MANIFEST = "_manifest.json"
+VIEWS = "views.sql"
+WHOLE_TABLE = "all"
+
+
+def arrow_type(data_type, precision, scale):
+    """Arrow type for a Postgres column, as reported by information_schema"""
+    if data_type == "date":
+        return pa.date32()
+    if data_type == "numeric":
+        return pa.decimal128(precision, scale) if precision else pa.float64()
+    if data_type in ("integer", "smallint"):
+        return pa.int32()
+    if data_type == "bigint":
+        return pa.int64()
+    if data_type in ("double precision", "real"):
+        return pa.float64()
+    if data_type == "boolean":
+        return pa.bool_()
+    if data_type == "timestamp without time zone":
+        return pa.timestamp("us")
+    return pa.string()  # text, enums, jsonb
+
+
+def table_columns(cur, schema, table):
+    cur.execute("""
+        SELECT column_name, data_type, numeric_precision, numeric_scale
+        FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = %s
+        ORDER BY ordinal_position
+    """, (schema, table))
+    return [(name, arrow_type(data_type, precision, scale))
+            for name, data_type, precision, scale in cur.fetchall()]
+
+
+def month_fingerprints(cur, schema, table, date_column):
+    """{partition: (fingerprint, relation to read, WHERE clause)} for the current snapshot"""
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = %s::regclass", (f"{schema}.{table}",))
+    if cur.fetchone()[0] == "p":
+        # Each monthly partition is hashed on its own, so a month is read
+        # from its partition rather than filtered out of the parent
+        cur.execute("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+        """, (f"{schema}.{table}",))
+        months = {}
+        for relname, in cur.fetchall():
+            match = re.search(r"_(\d{4})(\d{2})$", relname)
+            if match:
+                cur.execute(f"SELECT count(*), sum(hashtext(t::text)::bigint) FROM {schema}.{relname} t")
+                count, digest = cur.fetchone()
+                months[f"{match[1]}-{match[2]}"] = (f"{count}:{digest}", f"{schema}.{relname}", "")
+        return months
+
+    if date_column is None:
+        cur.execute(f"SELECT count(*), sum(hashtext(t::text)::bigint) FROM {schema}.{table} t")
+        count, digest = cur.fetchone()
+        return {WHOLE_TABLE: (f"{count}:{digest}", f"{schema}.{table}", "")}
+
+    cur.execute(f"""
+        SELECT to_char({date_column}, 'YYYY-MM'), count(*), sum(hashtext(t::text)::bigint)
+        FROM {schema}.{table} t
+        GROUP BY 1
+    """)
+    months = {}
+    for month, count, digest in cur.fetchall():
+        where = cur.mogrify(f"WHERE to_char({date_column}, 'YYYY-MM') = %s", (month,)).decode()
+        months[month] = (f"{count}:{digest}", f"{schema}.{table}", where)
+    return months
+
+
+def partition_path(root, table, partition):
+    if partition == WHOLE_TABLE:
+        return os.path.join(root, table, "data.parquet")
+    return os.path.join(root, table, f"month={partition}", "data.parquet")
+
+
+def export_relation(cur, relation, where, columns, path):
+    """COPY one relation (or month of it) to a Parquet file; returns the row count.
+
+    COPY output is spooled to a temporary file and converted in streaming
+    batches, so memory stays flat however large the month is.
+    """
+    names = [name for name, _ in columns]
+    schema = pa.schema(columns)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with tempfile.TemporaryFile() as spool:
+        cur.copy_expert(f"COPY (SELECT {', '.join(names)} FROM {relation} {where}) "
+                        f"TO STDOUT WITH (FORMAT csv, HEADER)", spool)
+        spool.seek(0)
+        reader = pacsv.open_csv(
+            spool,
+            convert_options=pacsv.ConvertOptions(
+                column_types=dict(columns), true_values=["t"], false_values=["f"],
+                strings_can_be_null=True, quoted_strings_can_be_null=False),
+        )
+        count = 0
+        tmp = f"{path}.tmp"
+        with pq.ParquetWriter(tmp, schema, compression=PARQUET_COMPRESSION) as writer:
+            for batch in reader:
+                writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+                count += batch.num_rows
+        os.replace(tmp, path)
+    return count
+
+
+def load_manifest(root):
+    path = os.path.join(root, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(root, manifest):
+    tmp = os.path.join(root, f"{MANIFEST}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(root, MANIFEST))
+
+
+def write_views(root, tables):
+    """DuckDB views over the exported files, for ``duckdb -init views.sql``"""
+    base = os.path.abspath(root)  # DuckDB resolves paths against its own working directory
+    with open(os.path.join(root, VIEWS), "w") as f:
+        for table in tables:
+            if EXPORT_TABLES[table] is None:
+                source = f"read_parquet('{base}/{table}/data.parquet')"
+            else:
+                source = f"read_parquet('{base}/{table}/*/data.parquet', hive_partitioning = true)"
+            f.write(f"CREATE OR REPLACE VIEW {table} AS SELECT * FROM {source};\n")
+
+
+def export_table(cur, root, schema, table, known, full=False):
+    """Export the changed months of one table; returns (fingerprints, months written, rows)"""
+    columns = table_columns(cur, schema, table)
+    current = month_fingerprints(cur, schema, table, EXPORT_TABLES[table])
+    written = rows = 0
+    for partition, (fingerprint, relation, where) in sorted(current.items()):
+        path = partition_path(root, table, partition)
+        if not full and known.get(partition) == fingerprint and os.path.exists(path):
+            continue
+        rows += export_relation(cur, relation, where, columns, path)
+        written += 1
+    for partition in set(known) - set(current):
+        shutil.rmtree(os.path.dirname(partition_path(root, table, partition)), ignore_errors=True)
+    return {partition: fingerprint for partition, (fingerprint, _, _) in current.items()}, written, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export sales_insights to date-partitioned Parquet")
+    parser.add_argument("output", help="Snapshot directory (created if missing)")
+    parser.add_argument("--schema", default=SCHEMA, help="Schema to export")
+    parser.add_argument("--tables", nargs="+", choices=list(EXPORT_TABLES), default=list(EXPORT_TABLES),
+                        help="Tables to export (default: all)")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-export every month instead of only those that changed")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write per-stage timings to a .json or .csv run report")
+    args = parser.parse_args()
+    if pa is None:
+        parser.error("export_snapshot.py needs the pyarrow package (pip install pyarrow)")
+    metrics = etl_metrics.start_run("export_snapshot")
+
+    os.makedirs(args.output, exist_ok=True)
+    manifest = load_manifest(args.output)
+    conn = db_pool.connect(DB_CONFIG)
+    # One consistent snapshot for every table, and no chance of writing
+    conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+    try:
+        with conn.cursor() as cur:
+            for table in args.tables:
+                with stage(f"export_{table}") as st:
+                    manifest[table], written, rows = export_table(
+                        cur, args.output, args.schema, table, manifest.get(table, {}), full=args.full)
+                    st.add_rows(rows)
+                print(f"{table}: {written} of {len(manifest[table])} partitions exported ({rows:,} rows)")
+                save_manifest(args.output, manifest)
+        write_views(args.output, [table for table in EXPORT_TABLES if table in manifest])
+        print(f"Snapshot written to {args.output}; query it with: duckdb -init {os.path.join(args.output, VIEWS)}")
+    finally:
+        conn.close()
+        metrics.print_summary()
+        if args.report:
+            metrics.write_report(args.report)
+
+
+if __name__ == "__main__":
+    main()
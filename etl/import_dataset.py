@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Bulk import a dataset written with --sink parquet/csv into sales_insights.
+
+Usage:
+    python import_dataset.py data/seed42                # replace the tables found in the dataset
+    python import_dataset.py data/seed42 --append       # add to the existing rows
+    python import_dataset.py data/run1 --schema sales_insights_next
+
+The dataset can come from seed_extended_data.py or kintex_to_rds.py. Files
+are loaded with COPY, several at a time, with secondary indexes dropped
+during the load. Indexes and rollups are rebuilt afterwards and the tables
+are analyzed, and the dashboard card views reading from them refreshed.
+"""
+
+import argparse
+
+import db_pool
+import etl_metrics
+import maintenance
+import materialized_views
+import rollups
+import sinks
+from etl_metrics import stage
+from seed_extended_data import DB_CONFIG
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import a generated dataset directory with COPY")
+    parser.add_argument("dataset", help="Directory written by --sink parquet/csv")
+    parser.add_argument("--schema", default=sinks.SCHEMA, help="Target schema")
+    parser.add_argument("--append", action="store_true",
+                        help="Keep existing rows instead of truncating the imported tables first")
+    parser.add_argument("--workers", type=int, default=sinks.IMPORT_WORKERS,
+                        help="Files loaded in parallel")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write per-stage timings to a .json or .csv run report")
+    args = parser.parse_args()
+    metrics = etl_metrics.start_run("import_dataset")
+
+    pool = db_pool.get_pool(DB_CONFIG, maxconn=max(4, args.workers))
+    conn = db_pool.connect(DB_CONFIG)
+    try:
+        with stage("drop_indexes"):
+            maintenance.drop_secondary_indexes(conn, args.schema)
+        totals = sinks.import_dataset(pool, args.dataset, schema=args.schema, append=args.append,
+                                      workers=args.workers)
+
+        with stage("refresh_rollups"), conn.cursor() as cur:
+            rollups.ensure_rollup_tables(cur, args.schema)
+            for table in rollups.ROLLUPS:
+                if table in totals:
+                    print(f"Rolled up {table} into {rollups.refresh(cur, table, schema=args.schema)} daily rows")
+        conn.commit()
+
+        with stage("build_indexes"):
+            maintenance.build_secondary_indexes(pool, args.schema)
+        with stage("analyze"):
+            maintenance.analyze_tables(conn, args.schema)
+        with stage("refresh_views"):
+            rolled_up = [rollup for table, (rollup, _, _) in rollups.ROLLUPS.items() if table in totals]
+            materialized_views.refresh(conn, args.schema, tables=list(totals) + rolled_up)
+        print(f"Imported {sum(totals.values()):,} rows into {args.schema}")
+    finally:
+        conn.close()
+        db_pool.close_all()
+        metrics.print_summary()
+        if args.report:
+            metrics.write_report(args.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,44 @@ This script:
 1. Extracts real master data (customers, products, salespeople, categories) from KINTEX
 2. Generates realistic sales transactions based on this master data
 3. Loads everything into the RDS sales_insights schema for Metabase dashboards
+
+Usage:
+    python kintex_to_rds.py                 # full truncate-and-reload
+    python kintex_to_rds.py --incremental   # upsert only new/changed master data
+    python kintex_to_rds.py --shadow        # reload into a shadow schema, then swap
+    python kintex_to_rds.py --backend asyncpg   # load transactions with asyncpg
+    python kintex_to_rds.py --sink parquet --output data/run1   # files only, no RDS
+    python kintex_to_rds.py --warm-dashboard "Sales Insights"    # then prime Metabase's caches
 """
 
-import psycopg2
+import argparse
+import hashlib
+import json
+import os
+import re
 import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from functools import partial
 from decimal import Decimal
 
+import async_load
+import db_pool
+import etl_metrics
+import maintenance
+import materialized_views
+import pipeline
+import rollups
+import sinks
+from bulk_load import UPSERT_PAGE_SIZE, upsert_rows
+from etl_metrics import stage
+
+try:
+    import create_metabase_dashboard as metabase
+except ImportError:  # requests is only needed for --warm-dashboard
+    metabase = None
+
 # Local KINTEX database connection
 LOCAL_DB = {
     'host': 'localhost',
@@ -28,6 +59,14 @@ RDS_DB = {
     'password': 'Buyabread87',
 }
 
+# Live schema read by Metabase, and the shadow schema used for zero-downtime loads
+SCHEMA = 'sales_insights'
+SHADOW_SCHEMA = 'sales_insights_next'
+
+# Schema DDL and validation queries shared with the SQL seed scripts
+SEED_SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            '..', 'data', 'seeds', 'sales_dashboard')
+
 # Category mapping from KINTEX cat1_id to dashboard-friendly names
 CATEGORY_MAP = {
     'FAB': 'Upholstery Fabric',
@@ -56,18 +95,112 @@ SEGMENT_MAP = {
     'SILKSCREEN & ADVERTISING': 'Commercial',
 }
 
+# Rows fetched per round trip from KINTEX server-side cursors
+EXTRACT_BATCH_SIZE = 5000
+
+# Column order of the master data rows built by customer_rows & co.
+CUSTOMER_COLUMNS = (
+    'customer_id', 'customer_name', 'customer_segment', 'region', 'industry',
+    'credit_limit', 'credit_utilized', 'first_order_date', 'last_order_date',
+)
+PRODUCT_COLUMNS = (
+    'product_id', 'product_name', 'product_category', 'product_family',
+    'unit_cost', 'unit_price', 'launch_date', 'lifecycle_stage', 'reorder_point', 'uom',
+)
+SALESPERSON_COLUMNS = ('salesperson_id', 'salesperson_name', 'department', 'territory', 'hire_date')
+
+# Column order used when bulk loading generated rows with COPY
+SALES_ORDER_COLUMNS = (
+    'order_id', 'order_date', 'customer_id', 'product_category', 'product_name',
+    'quantity', 'revenue_amount', 'currency', 'delivery_status', 'salesperson_id',
+    'quotation_id', 'unit_price', 'unit_cost', 'gross_profit', 'discount_rate',
+    'sales_channel',
+)
+SALES_QUOTATION_COLUMNS = (
+    'quotation_id', 'quotation_date', 'customer_id', 'product_category',
+    'quoted_amount', 'currency', 'status', 'salesperson_id',
+    'expected_close_date', 'estimated_margin', 'probability',
+)
+SALES_TARGET_COLUMNS = ('target_date', 'granularity', 'entity_id', 'target_amount')
+INVENTORY_SNAPSHOT_COLUMNS = (
+    'snapshot_date', 'product_id', 'stock_on_hand', 'reserved_units', 'inbound_units',
+)
+SALES_FORECAST_COLUMNS = (
+    'forecast_date', 'horizon', 'product_category', 'predicted_revenue', 'predicted_margin',
+)
+GENERATED_COLUMNS = {
+    'sales_orders': SALES_ORDER_COLUMNS,
+    'sales_quotations': SALES_QUOTATION_COLUMNS,
+    'sales_targets': SALES_TARGET_COLUMNS,
+    'inventory_snapshots': INVENTORY_SNAPSHOT_COLUMNS,
+    'sales_forecasts': SALES_FORECAST_COLUMNS,
+}
+
 
 def get_local_connection():
-    return psycopg2.connect(**LOCAL_DB)
+    return db_pool.connect(LOCAL_DB)
 
 
 def get_rds_connection():
-    return psycopg2.connect(**RDS_DB)
+    return db_pool.connect(RDS_DB)
 
 
-def extract_customers(local_conn, limit=100):
-    """Extract top customers from KINTEX with credit info."""
-    query = """
+def get_local_pool(maxconn=3):
+    """Thread-safe pool of KINTEX connections for concurrent extracts."""
+    return db_pool.get_pool(LOCAL_DB, maxconn=maxconn)
+
+
+def get_rds_pool(maxconn=4):
+    """Thread-safe pool of keepalive RDS connections for concurrent, retried loads."""
+    return db_pool.get_pool(RDS_DB, maxconn=maxconn)
+
+
+def run_concurrently(tasks):
+    """Run callables on a thread pool.
+
+    ``tasks`` maps a name to a zero-argument callable. Returns an iterator of
+    (name, result) in completion order.
+    """
+    # Submit eagerly so the tasks are already running while the caller
+    # does other work before consuming the results.
+    executor = ThreadPoolExecutor(max_workers=len(tasks))
+    futures = {executor.submit(task): name for name, task in tasks.items()}
+    executor.shutdown(wait=False)
+    return ((futures[future], future.result()) for future in as_completed(futures))
+
+
+def stream_query(conn, name, query, params=None, batch_size=EXTRACT_BATCH_SIZE):
+    """Yield result batches from a named server-side cursor.
+
+    Only ``batch_size`` rows are held in memory at a time, however large the
+    result set is on the server.
+    """
+    with conn.cursor(name=name) as cur:
+        cur.itersize = batch_size
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+
+def extract_customers(local_conn, limit=100, since=None, ids=(), batch_size=EXTRACT_BATCH_SIZE):
+    """Extract top customers from KINTEX with credit info, in batches.
+
+    When ``since`` is given only customers created on or after that date,
+    plus the customers in ``ids``, are returned (oldest first). That is how
+    incremental runs pick up new rows and re-check the loaded ones. The
+    watermark date itself is included, since more customers may have been
+    created on it after the last run. A ``limit`` of None returns every
+    matching customer.
+    """
+    if since is None:
+        where, order_by, params = "", "ORDER BY credit_limit DESC NULLS LAST", (limit,)
+    else:
+        where, order_by, params = ("AND (create_date >= %s OR cust_id = ANY(%s))", "ORDER BY create_date",
+                                   (since, list(ids), limit))
+    query = f"""
     SELECT
         cust_id,
         name,
@@ -77,17 +210,41 @@ def extract_customers(local_conn, limit=100):
         create_date
     FROM customer
     WHERE name IS NOT NULL AND name != ''
-    ORDER BY credit_limit DESC NULLS LAST
+    {where}
+    {order_by}
     LIMIT %s
     """
+    return stream_query(local_conn, 'extract_customers', query, params, batch_size)
+
+
+def customer_watermark(local_conn):
+    """Latest create_date of the whole KINTEX customer table, as an ISO string watermark.
+
+    Taken over every customer rather than the loaded top-N, so an
+    incremental run after a full one picks up exactly the customers created
+    since.
+    """
     with local_conn.cursor() as cur:
-        cur.execute(query, (limit,))
-        return cur.fetchall()
+        cur.execute("SELECT MAX(create_date) FROM customer WHERE name IS NOT NULL AND name != ''")
+        latest = cur.fetchone()[0]
+    return latest.isoformat() if latest else None
 
 
-def extract_products(local_conn, per_category=10):
-    """Extract products from KINTEX with category info - samples from each category."""
-    query = """
+def loaded_ids(rds_conn, table, key, schema=SCHEMA):
+    """Primary keys already loaded into an RDS table."""
+    with rds_conn.cursor() as cur:
+        cur.execute(f"SELECT {key} FROM {schema}.{table}")
+        return [row[0] for row in cur.fetchall()]
+
+
+def extract_products(local_conn, per_category=10, sample=True, batch_size=EXTRACT_BATCH_SIZE):
+    """Extract products from KINTEX with category info - samples from each category, in batches.
+
+    With ``sample=False`` the first products per category by stk_id are taken
+    instead of a random window, so repeated incremental runs see the same rows.
+    """
+    window_order = "RANDOM()" if sample else "s.stk_id"
+    query = f"""
     WITH ranked AS (
         SELECT
             s.stk_id,
@@ -95,7 +252,7 @@ def extract_products(local_conn, per_category=10):
             COALESCE(c.name, s.cat1_id, 'Other') as product_category,
             s.cat1_id as category_code,
             s.uom_id,
-            ROW_NUMBER() OVER (PARTITION BY s.cat1_id ORDER BY RANDOM()) as rn
+            ROW_NUMBER() OVER (PARTITION BY s.cat1_id ORDER BY {window_order}) as rn
         FROM stkmas s
         LEFT JOIN stkcat1 c ON s.cat1_id = c.cat1_id
         WHERE s.name IS NOT NULL
@@ -106,13 +263,11 @@ def extract_products(local_conn, per_category=10):
     WHERE rn <= %s
     ORDER BY category_code, stk_id
     """
-    with local_conn.cursor() as cur:
-        cur.execute(query, (per_category,))
-        return cur.fetchall()
+    return stream_query(local_conn, 'extract_products', query, (per_category,), batch_size)
 
 
-def extract_salespeople(local_conn):
-    """Extract salespeople from KINTEX."""
+def extract_salespeople(local_conn, batch_size=EXTRACT_BATCH_SIZE):
+    """Extract salespeople from KINTEX, in batches."""
     query = """
     SELECT
         emp_id,
@@ -124,345 +279,777 @@ def extract_salespeople(local_conn):
     ORDER BY emp_id
     LIMIT 15
     """
-    with local_conn.cursor() as cur:
-        cur.execute(query)
-        return cur.fetchall()
+    return stream_query(local_conn, 'extract_salespeople', query, batch_size=batch_size)
 
 
-def clear_rds_data(rds_conn):
-    """Clear existing data in RDS sales_insights schema."""
+def ensure_etl_state(rds_conn, schema=SCHEMA):
+    """Create the etl_state table that holds per-table sync watermarks."""
     with rds_conn.cursor() as cur:
-        cur.execute("SET search_path TO sales_insights, public;")
-        cur.execute("TRUNCATE TABLE sales_orders CASCADE;")
-        cur.execute("TRUNCATE TABLE sales_quotations;")
-        cur.execute("TRUNCATE TABLE inventory_snapshots;")
-        cur.execute("TRUNCATE TABLE sales_targets RESTART IDENTITY;")
-        cur.execute("TRUNCATE TABLE sales_forecasts RESTART IDENTITY;")
-        cur.execute("TRUNCATE TABLE product_catalog CASCADE;")
-        cur.execute("TRUNCATE TABLE salespeople CASCADE;")
-        cur.execute("TRUNCATE TABLE customers CASCADE;")
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {schema}.etl_state (
+                table_name TEXT PRIMARY KEY,
+                watermark TEXT,
+                row_hashes JSONB NOT NULL DEFAULT '{{}}'::jsonb,
+                updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW()
+            )
+        """)
     rds_conn.commit()
-    print("Cleared existing RDS data")
 
 
-def load_salespeople(rds_conn, salespeople):
-    """Load salespeople into RDS."""
+def get_etl_state(rds_conn, table_name, schema=SCHEMA):
+    """Return (watermark, row_hashes) recorded by the last sync of a table."""
     with rds_conn.cursor() as cur:
-        cur.execute("SET search_path TO sales_insights, public;")
-        for emp_id, name, dept in salespeople:
-            territory = random.choice(['Central', 'North', 'South', 'East', 'West'])
-            hire_date = datetime.now() - timedelta(days=random.randint(365, 2500))
-            cur.execute("""
-                INSERT INTO salespeople (salesperson_id, salesperson_name, department, territory, hire_date)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (salesperson_id) DO NOTHING
-            """, (emp_id, name, dept, territory, hire_date.date()))
-    rds_conn.commit()
-    print(f"Loaded {len(salespeople)} salespeople")
+        cur.execute(f"SELECT watermark, row_hashes FROM {schema}.etl_state WHERE table_name = %s",
+                    (table_name,))
+        row = cur.fetchone()
+    return row if row else (None, {})
 
 
-def load_customers(rds_conn, customers):
-    """Load customers into RDS."""
+def save_etl_state(rds_conn, table_name, watermark=None, row_hashes=None, schema=SCHEMA):
+    """Record the high-water mark and/or row hashes for a table."""
     with rds_conn.cursor() as cur:
-        cur.execute("SET search_path TO sales_insights, public;")
-        for cust_id, name, segment, industry, credit_limit, create_date in customers:
-            mapped_segment = SEGMENT_MAP.get(segment, 'Other')
-            region = random.choice(['Kuala Lumpur', 'Penang', 'Johor Bahru', 'Kuching', 'Melaka', 'Ipoh', 'Sabah'])
-            credit_utilized = float(credit_limit) * random.uniform(0.2, 0.8)
-            first_order = datetime.now() - timedelta(days=random.randint(180, 900))
-            last_order = datetime.now() - timedelta(days=random.randint(1, 30))
-
-            cur.execute("""
-                INSERT INTO customers (customer_id, customer_name, customer_segment, region, industry,
-                                       credit_limit, credit_utilized, first_order_date, last_order_date)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (customer_id) DO NOTHING
-            """, (cust_id, name, mapped_segment, region, industry or 'General',
-                  credit_limit, round(credit_utilized, 2), first_order.date(), last_order.date()))
+        cur.execute(f"""
+            INSERT INTO {schema}.etl_state (table_name, watermark, row_hashes, updated_at)
+            VALUES (%s, %s, %s, NOW())
+            ON CONFLICT (table_name) DO UPDATE
+            SET watermark = COALESCE(EXCLUDED.watermark, etl_state.watermark),
+                row_hashes = EXCLUDED.row_hashes,
+                updated_at = NOW()
+        """, (table_name, watermark, json.dumps(row_hashes or {})))
     rds_conn.commit()
-    print(f"Loaded {len(customers)} customers")
 
 
-def load_products(rds_conn, products):
-    """Load products into RDS product_catalog."""
-    with rds_conn.cursor() as cur:
-        cur.execute("SET search_path TO sales_insights, public;")
-        for stk_id, name, category, cat_code, uom in products:
-            mapped_category = CATEGORY_MAP.get(cat_code, category)
-            unit_cost = round(random.uniform(15, 50), 2)
-            unit_price = round(unit_cost * random.uniform(1.8, 2.5), 2)
-            launch_date = datetime.now() - timedelta(days=random.randint(200, 800))
-            lifecycle = random.choice(['Launch', 'Growth', 'Mature'])
-            reorder_point = random.randint(100, 300)
-
-            cur.execute("""
-                INSERT INTO product_catalog (product_id, product_name, product_category, product_family,
-                                             unit_cost, unit_price, launch_date, lifecycle_stage, reorder_point, uom)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (product_id) DO NOTHING
-            """, (stk_id, name[:100], mapped_category, category, unit_cost, unit_price,
-                  launch_date.date(), lifecycle, reorder_point, uom or 'ROLL'))
-    rds_conn.commit()
-    print(f"Loaded {len(products)} products")
+def row_hash(row):
+    """Stable content hash of an extracted source row."""
+    return hashlib.md5(repr(tuple(row)).encode('utf-8')).hexdigest()
 
 
-def generate_sales_orders(rds_conn, customers, products, salespeople, days=180):
-    """Generate realistic sales orders based on extracted master data."""
-    with rds_conn.cursor() as cur:
-        cur.execute("SET search_path TO sales_insights, public;")
+def changed_rows(rows, known_hashes):
+    """Split extracted rows into those that are new or changed since the last sync.
 
-        # Get loaded data IDs
-        cur.execute("SELECT customer_id FROM customers")
-        customer_ids = [r[0] for r in cur.fetchall()]
+    Rows are keyed by their first column. Returns (changed_rows, all_hashes).
+    """
+    changed = []
+    hashes = {}
+    for row in rows:
+        key = str(row[0])
+        hashes[key] = row_hash(row)
+        if known_hashes.get(key) != hashes[key]:
+            changed.append(row)
+    return changed, hashes
 
-        cur.execute("SELECT product_id, product_name, product_category, unit_price, unit_cost FROM product_catalog")
-        products_data = cur.fetchall()
 
-        cur.execute("SELECT salesperson_id FROM salespeople")
-        salesperson_ids = [r[0] for r in cur.fetchall()]
+def latest_create_date(customers, default=None):
+    """Highest customer create_date in a batch (or ``default``), as an ISO string watermark."""
+    dates = [row[5].isoformat() for row in customers if row[5] is not None]
+    if default:
+        dates.append(default)
+    return max(dates) if dates else None
 
-        if not customer_ids or not products_data or not salesperson_ids:
-            print("Missing master data, skipping order generation")
-            return
 
-        order_count = 0
-        start_date = datetime.now() - timedelta(days=days)
-
-        for day_offset in range(days + 1):
-            order_date = start_date + timedelta(days=day_offset)
-            # Generate 10-20 orders per day
-            daily_orders = random.randint(10, 20)
-
-            for i in range(daily_orders):
-                order_id = f"SO-{order_date.strftime('%Y%m%d')}-{str(i+1).zfill(3)}"
-                customer_id = random.choice(customer_ids)
-                prod = random.choice(products_data)
-                product_id, product_name, product_category, unit_price, unit_cost = prod
-                salesperson_id = random.choice(salesperson_ids)
-
-                quantity = random.randint(5, 30)
-                discount_rate = round(random.uniform(0, 15), 2)
-                revenue = round(float(unit_price) * quantity * (1 - discount_rate/100), 2)
-                gross_profit = round((float(unit_price) - float(unit_cost)) * quantity * (1 - discount_rate/100), 2)
-
-                delivery_status = random.choices(
-                    ['Delivered', 'Shipped', 'Pending', 'Cancelled'],
-                    weights=[60, 20, 15, 5]
-                )[0]
-
-                sales_channel = random.choice(['Direct', 'Distributor', 'Online', 'Key Account'])
-                quotation_id = f"SQ-{order_date.strftime('%Y%m%d')}-{random.randint(1,99):03d}" if random.random() < 0.35 else None
-
-                cur.execute("""
-                    INSERT INTO sales_orders (order_id, order_date, customer_id, product_category, product_name,
-                                              quantity, revenue_amount, currency, delivery_status, salesperson_id,
-                                              quotation_id, unit_price, unit_cost, gross_profit, discount_rate,
-                                              sales_channel, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, 'MYR', %s::delivery_status_enum, %s, %s, %s, %s, %s, %s, %s, NOW())
-                """, (order_id, order_date.date(), customer_id, product_category, product_name[:100],
-                      quantity, revenue, delivery_status, salesperson_id, quotation_id,
-                      unit_price, unit_cost, gross_profit, discount_rate, sales_channel))
-                order_count += 1
-
-        rds_conn.commit()
-        print(f"Generated {order_count} sales orders")
-
-
-def generate_quotations(rds_conn, days=180):
-    """Generate quotations based on loaded master data."""
-    with rds_conn.cursor() as cur:
-        cur.execute("SET search_path TO sales_insights, public;")
+def set_search_path(cur, schema=SCHEMA):
+    cur.execute(f"SET search_path TO {schema}, public;")
 
-        cur.execute("SELECT customer_id FROM customers")
-        customer_ids = [r[0] for r in cur.fetchall()]
 
-        cur.execute("SELECT product_category, unit_price, unit_cost FROM product_catalog")
-        products_data = cur.fetchall()
+def _schema_sql(filename, schema):
+    """Read a seed SQL script with the sales_insights schema renamed to ``schema``."""
+    with open(os.path.join(SEED_SQL_DIR, filename)) as f:
+        sql = f.read()
+    return re.sub(r'\bsales_insights\b', schema, sql)
 
-        cur.execute("SELECT salesperson_id FROM salespeople")
-        salesperson_ids = [r[0] for r in cur.fetchall()]
 
-        if not customer_ids or not products_data or not salesperson_ids:
-            return
-
-        quote_count = 0
-        start_date = datetime.now() - timedelta(days=days)
-        statuses = ['Draft', 'Active', 'Completed', 'Lost']
-
-        for day_offset in range(days + 1):
-            quote_date = start_date + timedelta(days=day_offset)
-            # 3-6 quotations per day
-            daily_quotes = random.randint(3, 6)
-
-            for i in range(daily_quotes):
-                quotation_id = f"SQ-{quote_date.strftime('%Y%m%d')}-{str(i+1).zfill(3)}"
-                customer_id = random.choice(customer_ids)
-                prod = random.choice(products_data)
-                product_category, unit_price, unit_cost = prod
-                salesperson_id = random.choice(salesperson_ids)
-
-                quantity = random.randint(40, 100)
-                quoted_amount = round(float(unit_price) * quantity, 2)
-                estimated_margin = round((float(unit_price) - float(unit_cost)) * quantity, 2)
-                status = random.choice(statuses)
-                probability = {'Draft': 0.25, 'Active': 0.55, 'Completed': 0.90, 'Lost': 0.10}[status]
-                probability = round(probability + random.uniform(-0.05, 0.05), 2)
-                expected_close = quote_date + timedelta(days=random.randint(7, 45))
-
-                cur.execute("""
-                    INSERT INTO sales_quotations (quotation_id, quotation_date, customer_id, product_category,
-                                                  quoted_amount, currency, status, salesperson_id,
-                                                  expected_close_date, estimated_margin, probability, created_at)
-                    VALUES (%s, %s, %s, %s, %s, 'MYR', %s::quotation_status_enum, %s, %s, %s, %s, NOW())
-                """, (quotation_id, quote_date.date(), customer_id, product_category,
-                      quoted_amount, status, salesperson_id, expected_close.date(),
-                      estimated_margin, probability))
-                quote_count += 1
-
-        rds_conn.commit()
-        print(f"Generated {quote_count} quotations")
-
-
-def generate_targets(rds_conn):
-    """Generate sales targets."""
+def prepare_shadow_schema(rds_conn, shadow=SHADOW_SCHEMA):
+    """(Re)create an empty shadow schema from 01_schema.sql."""
     with rds_conn.cursor() as cur:
-        cur.execute("SET search_path TO sales_insights, public;")
+        cur.execute(f"DROP SCHEMA IF EXISTS {shadow} CASCADE")
+        set_search_path(cur, shadow)
+        cur.execute(_schema_sql('01_schema.sql', shadow))
+    rds_conn.commit()
+    print(f"Prepared shadow schema {shadow}")
 
-        cur.execute("SELECT DISTINCT product_category FROM product_catalog")
-        categories = [r[0] for r in cur.fetchall()]
 
-        cur.execute("SELECT salesperson_id FROM salespeople")
-        salesperson_ids = [r[0] for r in cur.fetchall()]
+def validate_schema(rds_conn, schema=SCHEMA):
+    """Run the 04_validation.sql checks against a schema; every query must return rows."""
+    sql = _schema_sql('04_validation.sql', schema)
+    # Drop psql meta-commands and comments, then split into statements
+    lines = [line for line in sql.splitlines()
+             if not line.lstrip().startswith(('\\', '--'))]
+    statements = [stmt.strip() for stmt in '\n'.join(lines).split(';') if stmt.strip()]
 
-        # Generate monthly targets for past 6 months + current + next month
-        for month_offset in range(-5, 2):
-            target_date = (datetime.now().replace(day=1) + timedelta(days=32*month_offset)).replace(day=1)
+    with rds_conn.cursor() as cur:
+        for stmt in statements:
+            cur.execute(stmt)
+            if not cur.fetchall():
+                raise RuntimeError(f"Validation query returned no rows in {schema}:\n{stmt}")
+    rds_conn.rollback()
+    print(f"Validated {len(statements)} checks against {schema}")
 
-            # Company target
-            cur.execute("""
-                INSERT INTO sales_targets (target_date, granularity, entity_id, target_amount)
-                VALUES (%s, 'company', 'ALL', %s)
-            """, (target_date.date(), round(random.uniform(400000, 550000), 2)))
 
-            # Category targets
-            for cat in categories:
-                cur.execute("""
-                    INSERT INTO sales_targets (target_date, granularity, entity_id, target_amount)
-                    VALUES (%s, 'category', %s, %s)
-                """, (target_date.date(), cat, round(random.uniform(60000, 120000), 2)))
+def swap_schemas(rds_conn, shadow=SHADOW_SCHEMA, live=SCHEMA):
+    """Atomically promote the shadow schema to live, then drop the old tables."""
+    retired = f"{live}_old"
+    with rds_conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {retired} CASCADE")
+    rds_conn.commit()
 
-            # Salesperson targets
-            for sp_id in salesperson_ids:
-                cur.execute("""
-                    INSERT INTO sales_targets (target_date, granularity, entity_id, target_amount)
-                    VALUES (%s, 'salesperson', %s, %s)
-                """, (target_date.date(), sp_id, round(random.uniform(50000, 90000), 2)))
+    with rds_conn.cursor() as cur:
+        cur.execute(f"ALTER SCHEMA {live} RENAME TO {retired}")
+        cur.execute(f"ALTER SCHEMA {shadow} RENAME TO {live}")
+    rds_conn.commit()
+    print(f"Swapped {shadow} into {live}")
 
-        rds_conn.commit()
-        print("Generated sales targets")
+    # Dropping waits for in-flight dashboard queries on the old tables, so it
+    # runs after the swap has committed rather than inside it.
+    with rds_conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {retired} CASCADE")
+    rds_conn.commit()
 
 
-def generate_inventory_snapshots(rds_conn):
-    """Generate inventory snapshots."""
+def clear_rds_data(rds_conn, schema=SCHEMA):
+    """Clear existing data in RDS sales_insights schema."""
     with rds_conn.cursor() as cur:
-        cur.execute("SET search_path TO sales_insights, public;")
+        set_search_path(cur, schema)
+        cur.execute("TRUNCATE TABLE sales_orders CASCADE;")
+        cur.execute("TRUNCATE TABLE sales_quotations;")
+        cur.execute("TRUNCATE TABLE inventory_snapshots;")
+        cur.execute("TRUNCATE TABLE sales_targets RESTART IDENTITY;")
+        cur.execute("TRUNCATE TABLE sales_forecasts RESTART IDENTITY;")
+        cur.execute("TRUNCATE TABLE product_catalog CASCADE;")
+        cur.execute("TRUNCATE TABLE salespeople CASCADE;")
+        cur.execute("TRUNCATE TABLE customers CASCADE;")
+    rds_conn.commit()
+    print(f"Cleared existing RDS data in {schema}")
 
-        cur.execute("SELECT product_id, reorder_point FROM product_catalog")
-        products = cur.fetchall()
 
-        # Weekly snapshots for past 12 weeks
-        for week_offset in range(12):
-            snapshot_date = datetime.now() - timedelta(weeks=week_offset)
-            for product_id, reorder_point in products:
-                stock = max(50, reorder_point + random.randint(-50, 100))
-                reserved = random.randint(0, 40)
-                inbound = random.randint(0, 60)
+def ensure_partitions(rds_conn, start_date, end_date, schema=SCHEMA):
+    """Create the monthly sales_orders / sales_quotations partitions covering a date range."""
+    with rds_conn.cursor() as cur:
+        for table in ('sales_orders', 'sales_quotations'):
+            cur.execute(f"SELECT {schema}.ensure_month_partitions(%s, %s, %s)",
+                        (f"{schema}.{table}", start_date.date(), end_date.date()))
+            created = cur.fetchone()[0]
+            if created:
+                print(f"Created {created} monthly partitions of {schema}.{table}")
+    rds_conn.commit()
 
-                cur.execute("""
-                    INSERT INTO inventory_snapshots (snapshot_date, product_id, stock_on_hand, reserved_units, inbound_units)
-                    VALUES (%s, %s, %s, %s, %s)
-                    ON CONFLICT (snapshot_date, product_id) DO NOTHING
-                """, (snapshot_date.date(), product_id, stock, reserved, inbound))
 
-        rds_conn.commit()
-        print("Generated inventory snapshots")
+def refresh_rollups(rds_conn, schema=SCHEMA):
+    """Rebuild the daily rollup tables the dashboard cards read from."""
+    with rds_conn.cursor() as cur:
+        rollups.ensure_rollup_tables(cur, schema=schema)
+        written = rollups.refresh_all(cur, schema=schema)
+    rds_conn.commit()
+    for table, count in written.items():
+        print(f"Rolled up {table} into {count} daily rows")
+    return sum(written.values())
+
+
+def salesperson_rows(salespeople):
+    """Map KINTEX employees to salespeople rows."""
+    rows = []
+    for emp_id, name, dept in salespeople:
+        territory = random.choice(['Central', 'North', 'South', 'East', 'West'])
+        hire_date = datetime.now() - timedelta(days=random.randint(365, 2500))
+        rows.append((emp_id, name, dept, territory, hire_date.date()))
+    return rows
+
+
+def customer_rows(customers):
+    """Map KINTEX customers to customers rows."""
+    rows = []
+    for cust_id, name, segment, industry, credit_limit, create_date in customers:
+        mapped_segment = SEGMENT_MAP.get(segment, 'Other')
+        region = random.choice(['Kuala Lumpur', 'Penang', 'Johor Bahru', 'Kuching', 'Melaka', 'Ipoh', 'Sabah'])
+        credit_utilized = float(credit_limit) * random.uniform(0.2, 0.8)
+        first_order = datetime.now() - timedelta(days=random.randint(180, 900))
+        last_order = datetime.now() - timedelta(days=random.randint(1, 30))
+        rows.append((cust_id, name, mapped_segment, region, industry or 'General',
+                     credit_limit, round(credit_utilized, 2), first_order.date(), last_order.date()))
+    return rows
+
+
+def product_rows(products):
+    """Map KINTEX stock items to product_catalog rows with generated pricing."""
+    rows = []
+    for stk_id, name, category, cat_code, uom in products:
+        mapped_category = CATEGORY_MAP.get(cat_code, category)
+        unit_cost = round(random.uniform(15, 50), 2)
+        unit_price = round(unit_cost * random.uniform(1.8, 2.5), 2)
+        launch_date = datetime.now() - timedelta(days=random.randint(200, 800))
+        lifecycle = random.choice(['Launch', 'Growth', 'Mature'])
+        reorder_point = random.randint(100, 300)
+        rows.append((stk_id, name[:100], mapped_category, category, unit_cost, unit_price,
+                     launch_date.date(), lifecycle, reorder_point, uom or 'ROLL'))
+    return rows
+
+
+# Master table -> (KINTEX row transform, columns of the rows it returns)
+MASTER_TABLES = {
+    'customers': (customer_rows, CUSTOMER_COLUMNS),
+    'product_catalog': (product_rows, PRODUCT_COLUMNS),
+    'salespeople': (salesperson_rows, SALESPERSON_COLUMNS),
+}
 
 
-def generate_forecasts(rds_conn):
-    """Generate sales forecasts."""
+def load_salespeople(rds_conn, rows, page_size=UPSERT_PAGE_SIZE, update_existing=False,
+                     schema=SCHEMA):
+    """Load salespeople rows (see salesperson_rows) into RDS."""
     with rds_conn.cursor() as cur:
-        cur.execute("SET search_path TO sales_insights, public;")
+        set_search_path(cur, schema)
+        upsert_rows(cur, 'salespeople', SALESPERSON_COLUMNS, rows, ('salesperson_id',), page_size=page_size,
+                    update_columns=('salesperson_name', 'department') if update_existing else None)
+    rds_conn.commit()
+    print(f"Loaded {len(rows)} salespeople")
 
-        cur.execute("SELECT DISTINCT product_category FROM product_catalog")
-        categories = [r[0] for r in cur.fetchall()]
 
-        horizons = [
-            (0, 'Current Month'),
-            (30, 'Next Month'),
-            (60, '60-90 Day Outlook'),
-            (90, '90+ Day Outlook'),
-        ]
+def load_customers(rds_conn, rows, page_size=UPSERT_PAGE_SIZE, update_existing=False,
+                   schema=SCHEMA):
+    """Load customers rows (see customer_rows) into RDS."""
+    with rds_conn.cursor() as cur:
+        set_search_path(cur, schema)
+        upsert_rows(cur, 'customers', CUSTOMER_COLUMNS, rows, ('customer_id',), page_size=page_size,
+                    update_columns=('customer_name', 'customer_segment', 'industry', 'credit_limit')
+                    if update_existing else None)
+    rds_conn.commit()
+    print(f"Loaded {len(rows)} customers")
+
+
+def load_products(rds_conn, rows, page_size=UPSERT_PAGE_SIZE, update_existing=False,
+                  schema=SCHEMA):
+    """Load product_catalog rows (see product_rows) into RDS.
+
+    ``update_existing`` refreshes the KINTEX-sourced columns of products that
+    are already loaded; generated pricing and lifecycle data are kept.
+    """
+    with rds_conn.cursor() as cur:
+        set_search_path(cur, schema)
+        upsert_rows(cur, 'product_catalog', PRODUCT_COLUMNS, rows, ('product_id',), page_size=page_size,
+                    update_columns=('product_name', 'product_category', 'product_family', 'uom')
+                    if update_existing else None)
+    rds_conn.commit()
+    print(f"Loaded {len(rows)} products")
+
 
-        for days_ahead, horizon_name in horizons:
-            forecast_date = datetime.now() + timedelta(days=days_ahead)
-            for cat in categories:
-                cur.execute("""
-                    INSERT INTO sales_forecasts (forecast_date, horizon, product_category, predicted_revenue, predicted_margin)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (forecast_date.date(), horizon_name, cat,
-                      round(random.uniform(60000, 100000), 2),
-                      round(random.uniform(25000, 45000), 2)))
+@dataclass
+class MasterData:
+    """Master data exactly as loaded into RDS, shared read-only by every generator.
 
-        rds_conn.commit()
-        print("Generated sales forecasts")
+    Built once from the rows the load phase wrote, so generating transactions
+    needs no further queries against RDS. ``products`` holds
+    (product_id, product_name, product_category, reorder_point) and lines up
+    index for index with the float ``unit_prices`` / ``unit_costs``.
+    """
+    customer_ids: list = field(default_factory=list)
+    salesperson_ids: list = field(default_factory=list)
+    products: list = field(default_factory=list)
+    unit_prices: list = field(default_factory=list)
+    unit_costs: list = field(default_factory=list)
+    products_by_category: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(cls, customers, products, salespeople):
+        """Build from customer_rows / product_rows / salesperson_rows output.
+
+        The first row per key wins, as it does for the loaders' inserts.
+        """
+        catalog = {}
+        for product_id, name, category, _, unit_cost, unit_price, _, _, reorder_point, _ in products:
+            catalog.setdefault(product_id, (product_id, name, category, reorder_point,
+                                            float(unit_price), float(unit_cost)))
+        master = cls(
+            customer_ids=list(dict.fromkeys(row[0] for row in customers)),
+            salesperson_ids=list(dict.fromkeys(row[0] for row in salespeople)),
+            products=[p[:4] for p in catalog.values()],
+            unit_prices=[p[4] for p in catalog.values()],
+            unit_costs=[p[5] for p in catalog.values()],
+        )
+        for index, (_, _, category, _) in enumerate(master.products):
+            master.products_by_category.setdefault(category, []).append(index)
+        return master
+
+    @property
+    def categories(self):
+        return sorted(self.products_by_category)
+
+    def __bool__(self):
+        return bool(self.customer_ids and self.products and self.salesperson_ids)
+
+
+def generate_sales_orders(master, days=180):
+    """Yield realistic sales order rows based on extracted master data."""
+    if not master:
+        print("Missing master data, skipping order generation")
+        return
+    customer_ids, salesperson_ids = master.customer_ids, master.salesperson_ids
+    products, unit_prices, unit_costs = master.products, master.unit_prices, master.unit_costs
+
+    start_date = datetime.now() - timedelta(days=days)
+
+    for day_offset in range(days + 1):
+        etl_metrics.progress(day_offset + 1, days + 1, 'days')
+        order_date = start_date + timedelta(days=day_offset)
+        # Generate 10-20 orders per day
+        daily_orders = random.randint(10, 20)
+
+        for i in range(daily_orders):
+            order_id = f"SO-{order_date.strftime('%Y%m%d')}-{str(i+1).zfill(3)}"
+            customer_id = random.choice(customer_ids)
+            p = random.randrange(len(products))
+            product_id, product_name, product_category, _ = products[p]
+            unit_price, unit_cost = unit_prices[p], unit_costs[p]
+            salesperson_id = random.choice(salesperson_ids)
+
+            quantity = random.randint(5, 30)
+            discount_rate = round(random.uniform(0, 15), 2)
+            revenue = round(unit_price * quantity * (1 - discount_rate/100), 2)
+            gross_profit = round((unit_price - unit_cost) * quantity * (1 - discount_rate/100), 2)
+
+            delivery_status = random.choices(
+                ['Delivered', 'Shipped', 'Pending', 'Cancelled'],
+                weights=[60, 20, 15, 5]
+            )[0]
+
+            sales_channel = random.choice(['Direct', 'Distributor', 'Online', 'Key Account'])
+            quotation_id = f"SQ-{order_date.strftime('%Y%m%d')}-{random.randint(1,99):03d}" if random.random() < 0.35 else None
+
+            yield (order_id, order_date.date(), customer_id, product_category, product_name,
+                   quantity, revenue, 'MYR', delivery_status, salesperson_id, quotation_id,
+                   unit_price, unit_cost, gross_profit, discount_rate, sales_channel)
+
+
+def generate_quotations(master, days=180):
+    """Yield quotation rows based on loaded master data."""
+    if not master:
+        return
+    customer_ids, salesperson_ids = master.customer_ids, master.salesperson_ids
+    products, unit_prices, unit_costs = master.products, master.unit_prices, master.unit_costs
+
+    start_date = datetime.now() - timedelta(days=days)
+    statuses = ['Draft', 'Active', 'Completed', 'Lost']
+
+    for day_offset in range(days + 1):
+        etl_metrics.progress(day_offset + 1, days + 1, 'days')
+        quote_date = start_date + timedelta(days=day_offset)
+        # 3-6 quotations per day
+        daily_quotes = random.randint(3, 6)
+
+        for i in range(daily_quotes):
+            quotation_id = f"SQ-{quote_date.strftime('%Y%m%d')}-{str(i+1).zfill(3)}"
+            customer_id = random.choice(customer_ids)
+            p = random.randrange(len(products))
+            product_category = products[p][2]
+            unit_price, unit_cost = unit_prices[p], unit_costs[p]
+            salesperson_id = random.choice(salesperson_ids)
+
+            quantity = random.randint(40, 100)
+            quoted_amount = round(unit_price * quantity, 2)
+            estimated_margin = round((unit_price - unit_cost) * quantity, 2)
+            status = random.choice(statuses)
+            probability = {'Draft': 0.25, 'Active': 0.55, 'Completed': 0.90, 'Lost': 0.10}[status]
+            probability = round(probability + random.uniform(-0.05, 0.05), 2)
+            expected_close = quote_date + timedelta(days=random.randint(7, 45))
+
+            yield (quotation_id, quote_date.date(), customer_id, product_category,
+                   quoted_amount, 'MYR', status, salesperson_id, expected_close.date(),
+                   estimated_margin, probability)
+
+
+def generate_targets(master):
+    """Yield sales target rows."""
+    categories, salesperson_ids = master.categories, master.salesperson_ids
+
+    # Generate monthly targets for past 6 months + current + next month
+    for month_offset in range(-5, 2):
+        target_date = (datetime.now().replace(day=1) + timedelta(days=32*month_offset)).replace(day=1)
+
+        # Company target
+        yield (target_date.date(), 'company', 'ALL', round(random.uniform(400000, 550000), 2))
+
+        # Category targets
+        for cat in categories:
+            yield (target_date.date(), 'category', cat, round(random.uniform(60000, 120000), 2))
+
+        # Salesperson targets
+        for sp_id in salesperson_ids:
+            yield (target_date.date(), 'salesperson', sp_id, round(random.uniform(50000, 90000), 2))
+
+
+def generate_inventory_snapshots(master):
+    """Yield inventory snapshot rows."""
+    # Weekly snapshots for past 12 weeks
+    for week_offset in range(12):
+        snapshot_date = datetime.now() - timedelta(weeks=week_offset)
+        for product_id, _, _, reorder_point in master.products:
+            stock = max(50, reorder_point + random.randint(-50, 100))
+            reserved = random.randint(0, 40)
+            inbound = random.randint(0, 60)
+            # Snapshot dates and product ids are unique within a run, and the
+            # table is truncated beforehand, so COPY needs no ON CONFLICT guard.
+            yield (snapshot_date.date(), product_id, stock, reserved, inbound)
+
+
+def generate_forecasts(master):
+    """Yield sales forecast rows."""
+    categories = master.categories
+
+    horizons = [
+        (0, 'Current Month'),
+        (30, 'Next Month'),
+        (60, '60-90 Day Outlook'),
+        (90, '90+ Day Outlook'),
+    ]
+
+    for days_ahead, horizon_name in horizons:
+        forecast_date = datetime.now() + timedelta(days=days_ahead)
+        for cat in categories:
+            yield (forecast_date.date(), horizon_name, cat,
+                   round(random.uniform(60000, 100000), 2),
+                   round(random.uniform(25000, 45000), 2))
+
+
+def transaction_generators(master, days=180):
+    """Pipeline producers for every generated table."""
+    return {
+        'sales_orders': partial(generate_sales_orders, master, days=days),
+        'sales_quotations': partial(generate_quotations, master, days=days),
+        'sales_targets': partial(generate_targets, master),
+        'inventory_snapshots': partial(generate_inventory_snapshots, master),
+        'sales_forecasts': partial(generate_forecasts, master),
+    }
+
+
+def sink_loader(sink):
+    """Pipeline loader writing each batch of generated rows through ``sink``."""
+    return lambda table, rows: sink.write(table, GENERATED_COLUMNS[table], rows)
+
+
+def stream_table(local_pool, rds_pool, extract, transform, load, schema=SCHEMA, known_hashes=None,
+                 update_existing=False, watermark_of=None):
+    """Stream one KINTEX extract into RDS batch by batch on its own pooled connections.
+
+    Each batch is mapped to RDS rows by ``transform`` before it is written.
+    When ``known_hashes`` is given, only rows whose hash differs from it are
+    loaded. ``watermark_of`` maps a batch to its ISO high-water mark. Returns
+    a summary dict with the rows seen and loaded, the row hashes (when
+    diffing), the highest watermark and the RDS rows written.
+    """
+    load_stage = load.__name__
+    extract_stage = load_stage.replace('load_', 'extract_', 1)
+    summary = {'rows': 0, 'loaded': 0, 'hashes': {}, 'watermark': None, 'loaded_rows': []}
+    with db_pool.pooled(local_pool) as local_conn:
+        batches = extract(local_conn)
+        while True:
+            with stage(extract_stage) as st:
+                batch = next(batches, None)
+                st.add_rows(len(batch or ()))
+            if batch is None:
+                break
+            summary['rows'] += len(batch)
+            if known_hashes is not None:
+                batch, hashes = changed_rows(batch, known_hashes)
+                summary['hashes'].update(hashes)
+            if not batch:
+                continue
+            if watermark_of:
+                summary['watermark'] = watermark_of(batch, summary['watermark'])
+            # Transform once, so a replayed batch writes the same generated values
+            rows = transform(batch)
+            # Each batch commits on its own pooled connection and is replayed
+            # alone if the link to RDS drops mid-write
+            with stage(load_stage) as st:
+                db_pool.write_chunks(rds_pool, [rows], partial(
+                    load, update_existing=update_existing, schema=schema))
+                st.add_rows(len(rows))
+            summary['loaded'] += len(rows)
+            summary['loaded_rows'].extend(rows)
+    return summary
+
+
+def incremental_sync(local_pool, rds_pool, rds_conn, per_category=8):
+    """Upsert master data that is new or changed since the last recorded sync.
+
+    Customers created since the create_date high-water mark are pulled
+    together with the customers already loaded; products and salespeople
+    are small enough to extract in full. All three are diffed by row hash,
+    so only new or edited rows are written.
+    Transactions already in RDS are left in place; the rollups are rebuilt
+    only when customers changed. Card views reading from anything that was
+    written are refreshed afterwards.
+    """
+    ensure_etl_state(rds_conn)
+    watermark, customer_hashes = get_etl_state(rds_conn, 'customers')
+    customer_ids = loaded_ids(rds_conn, 'customers', 'customer_id') if watermark else ()
+
+    tasks = {
+        'customers': partial(stream_table, local_pool, rds_pool,
+                             partial(extract_customers, limit=None, since=watermark, ids=customer_ids),
+                             customer_rows, load_customers, update_existing=True,
+                             known_hashes=customer_hashes, watermark_of=latest_create_date),
+        'product_catalog': partial(stream_table, local_pool, rds_pool,
+                                   partial(extract_products, per_category=per_category, sample=False),
+                                   product_rows, load_products, update_existing=True,
+                                   known_hashes=get_etl_state(rds_conn, 'product_catalog')[1]),
+        'salespeople': partial(stream_table, local_pool, rds_pool, extract_salespeople,
+                               salesperson_rows, load_salespeople, update_existing=True,
+                               known_hashes=get_etl_state(rds_conn, 'salespeople')[1]),
+    }
+
+    customers_changed = False
+    for name, summary in run_concurrently(tasks):
+        print(f"Synced {name}: {summary['loaded']} new or changed of {summary['rows']} extracted")
+        if name == 'customers':
+            save_etl_state(rds_conn, name, watermark=summary['watermark'] or watermark,
+                           row_hashes=summary['hashes'])
+            customers_changed = summary['loaded'] > 0
+        else:
+            save_etl_state(rds_conn, name, row_hashes=summary['hashes'])
+
+    # The sales rollup is denormalized on customer region and segment
+    if customers_changed:
+        with stage('refresh_rollups') as st:
+            st.add_rows(refresh_rollups(rds_conn))
+
+    written = list(tasks) + ([rollup for rollup, _, _ in rollups.ROLLUPS.values()] if customers_changed else [])
+    with stage('analyze'):
+        maintenance.analyze_tables(rds_conn, tables=written)
+    with stage('refresh_views'):
+        materialized_views.refresh(rds_conn, tables=written)
+
+
+def extract_and_load(local_pool, rds_pool, rds_conn, per_category=8, customer_limit=100,
+                     schema=SCHEMA, truncate=True):
+    """Reload master data into ``schema``, record the resulting sync state and
+    return it as a MasterData for the transaction generators.
+
+    The three KINTEX extracts run concurrently, each streaming batches from a
+    server-side cursor straight into its loader, so wall time is bounded by
+    the slowest table.
+    """
+    if truncate:
+        with stage('clear_rds_data'):
+            clear_rds_data(rds_conn, schema=schema)
+
+    # Read before extracting, so customers created meanwhile are picked up next time
+    with db_pool.pooled(local_pool) as local_conn:
+        watermark = customer_watermark(local_conn)
+
+    tasks = {
+        'customers': partial(stream_table, local_pool, rds_pool,
+                             partial(extract_customers, limit=customer_limit),
+                             customer_rows, load_customers, schema=schema, known_hashes={}),
+        'product_catalog': partial(stream_table, local_pool, rds_pool,
+                                   partial(extract_products, per_category=per_category),
+                                   product_rows, load_products, schema=schema, known_hashes={}),
+        'salespeople': partial(stream_table, local_pool, rds_pool, extract_salespeople,
+                               salesperson_rows, load_salespeople, schema=schema, known_hashes={}),
+    }
+
+    ensure_etl_state(rds_conn, schema=schema)
+    loaded = {}
+    for name, summary in run_concurrently(tasks):
+        print(f"Extracted and loaded {summary['loaded']} {name} from KINTEX")
+        if name == 'customers':
+            save_etl_state(rds_conn, name, watermark=watermark, row_hashes=summary['hashes'], schema=schema)
+        else:
+            save_etl_state(rds_conn, name, row_hashes=summary['hashes'], schema=schema)
+        loaded[name] = summary['loaded_rows']
+    return MasterData.from_rows(loaded['customers'], loaded['product_catalog'], loaded['salespeople'])
+
+
+def write_dataset(local_pool, sink, per_category=8, customer_limit=100, workers=pipeline.PRODUCERS,
+                  loaders=pipeline.LOADERS):
+    """Extract master data and generate transactions into a file sink, without touching RDS.
+
+    The master tables are written too, so sinks.import_dataset can replay
+    the whole dataset into an empty schema.
+    """
+    for table in [*MASTER_TABLES, *GENERATED_COLUMNS]:
+        sinks.clear(sink.root, table)
+
+    extracts = {
+        'customers': partial(extract_customers, limit=customer_limit),
+        'product_catalog': partial(extract_products, per_category=per_category),
+        'salespeople': extract_salespeople,
+    }
+    loaded = {}
+    for table, extract in extracts.items():
+        transform, columns = MASTER_TABLES[table]
+        with db_pool.pooled(local_pool) as local_conn, stage(f'extract_{table}') as st:
+            loaded[table] = [row for batch in extract(local_conn) for row in transform(batch)]
+            st.add_rows(len(loaded[table]))
+        sink.write(table, columns, loaded[table])
+        print(f"Wrote {len(loaded[table])} {table} to {sink.root}")
+    master = MasterData.from_rows(loaded['customers'], loaded['product_catalog'], loaded['salespeople'])
+
+    generated = pipeline.run(transaction_generators(master), sink_loader(sink),
+                             workers=workers, loaders=loaders)
+    for table, count in generated.items():
+        print(f"Wrote {count} {table} to {sink.root}")
+
+
+def warm_dashboard(name):
+    """Run every card of a Metabase dashboard so the first viewer after a load gets cached results"""
+    print(f"\n--- WARM DASHBOARD {name!r} ---")
+    if metabase is None:
+        print("  Skipping Metabase warm-up: needs the requests package (pip install requests)")
+        return
+    with stage('warm_dashboard'):
+        metabase.warm_after_load(name)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Load KINTEX master data and generated sales into RDS")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--incremental", action="store_true",
+                      help="Upsert only new/changed master data instead of truncating and reloading")
+    mode.add_argument("--shadow", action="store_true",
+                      help=f"Build a full copy in {SHADOW_SCHEMA}, validate it, then swap it in atomically")
+    parser.add_argument("--customer-limit", type=int, default=100,
+                        help="Top customers by credit limit to load on a full run (0 for all)")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write per-stage timings to a .json or .csv run report")
+    parser.add_argument("--progress", action="store_true",
+                        help="Show a live progress line with ETA for long stages")
+    parser.add_argument("--generators", type=int, default=pipeline.PRODUCERS,
+                        help="Threads generating transaction rows")
+    parser.add_argument("--loaders", type=int, default=pipeline.LOADERS,
+                        help="Concurrent loads of generated batches into RDS")
+    parser.add_argument("--backend", choices=["psycopg2", "asyncpg"], default="psycopg2",
+                        help="Load generated transactions with psycopg2 threads or asyncpg on one event loop")
+    parser.add_argument("--sink", choices=sinks.SINK_KINDS, default="postgres",
+                        help="Write to RDS, or to Parquet / gzip CSV files under --output without touching RDS")
+    parser.add_argument("--output", metavar="DIR",
+                        help="Dataset directory for --sink parquet/csv (load it later with import_dataset.py)")
+    parser.add_argument("--warm-dashboard", metavar="NAME",
+                        help="After loading, run every card of this Metabase dashboard "
+                             "(credentials from METABASE_EMAIL / METABASE_PASSWORD)")
+    args = parser.parse_args()
+    to_files = args.sink != 'postgres'
+    if to_files and (args.incremental or args.shadow or args.backend != 'psycopg2'):
+        parser.error(f"--sink {args.sink} cannot be combined with --incremental, --shadow or --backend asyncpg")
+    if to_files and args.warm_dashboard:
+        parser.error("--warm-dashboard needs a database load; it cannot be combined with --sink files")
+    if to_files and not args.output:
+        parser.error(f"--sink {args.sink} needs --output DIR")
+    if args.generators < 1 or args.loaders < 1:
+        parser.error("--generators and --loaders must be at least 1")
+    metrics = etl_metrics.start_run('kintex_to_rds', progress=args.progress)
+    schema = SHADOW_SCHEMA if args.shadow else SCHEMA
+
     print("=" * 60)
     print("KINTEX to RDS ETL Pipeline")
     print("=" * 60)
 
     # Connect to databases
     print("\nConnecting to databases...")
-    local_conn = get_local_connection()
-    rds_conn = get_rds_connection()
+    local_pool = get_local_pool(maxconn=3)
+    rds_pool = rds_conn = None
+    if not to_files:
+        # Producers work from in-memory master data; only loaders hold connections
+        rds_pool = get_rds_pool(maxconn=max(4, args.loaders))
+        rds_conn = get_rds_connection()
     print("Connected successfully!")
 
     try:
-        # Extract from KINTEX
-        print("\n--- EXTRACT PHASE ---")
-        customers = extract_customers(local_conn, limit=100)
-        print(f"Extracted {len(customers)} customers from KINTEX")
-
-        products = extract_products(local_conn, per_category=8)
-        print(f"Extracted {len(products)} products from KINTEX (8 per category)")
-
-        salespeople = extract_salespeople(local_conn)
-        print(f"Extracted {len(salespeople)} salespeople from KINTEX")
+        if to_files:
+            print(f"\n--- WRITE DATASET TO {args.output} ({args.sink}) ---")
+            write_dataset(local_pool, sinks.open_sink(args.sink, args.output), per_category=8,
+                          customer_limit=args.customer_limit or None,
+                          workers=args.generators, loaders=args.loaders)
+
+            print("\n" + "=" * 60)
+            print("DATASET WRITTEN SUCCESSFULLY!")
+            print("=" * 60)
+            return
 
-        # Clear and Load to RDS
-        print("\n--- LOAD PHASE ---")
-        clear_rds_data(rds_conn)
+        if args.incremental:
+            print("\n--- INCREMENTAL SYNC ---")
+            incremental_sync(local_pool, rds_pool, rds_conn, per_category=8)
+            if args.warm_dashboard:
+                warm_dashboard(args.warm_dashboard)
 
-        load_salespeople(rds_conn, salespeople)
-        load_customers(rds_conn, customers)
-        load_products(rds_conn, products)
+            print("\n" + "=" * 60)
+            print("INCREMENTAL SYNC COMPLETED SUCCESSFULLY!")
+            print("=" * 60)
+            return
 
-        # Generate transactions
-        print("\n--- GENERATE TRANSACTIONS ---")
-        generate_sales_orders(rds_conn, customers, products, salespeople, days=180)
-        generate_quotations(rds_conn, days=180)
-        generate_targets(rds_conn)
-        generate_inventory_snapshots(rds_conn)
-        generate_forecasts(rds_conn)
+        if args.shadow:
+            with stage('prepare_shadow_schema'):
+                prepare_shadow_schema(rds_conn, SHADOW_SCHEMA)
+
+        # Bulk load with primary keys only; secondary indexes are rebuilt afterwards
+        with stage('drop_indexes'):
+            maintenance.drop_secondary_indexes(rds_conn, schema)
+
+        try:
+            # Stream KINTEX extracts concurrently straight into RDS
+            print("\n--- EXTRACT AND LOAD PHASE ---")
+            master = extract_and_load(local_pool, rds_pool, rds_conn, per_category=8,
+                                      customer_limit=args.customer_limit or None,
+                                      schema=schema, truncate=not args.shadow)
+            print(f"Master data: {len(master.customer_ids)} customers, {len(master.products)} products "
+                  f"in {len(master.products_by_category)} categories, {len(master.salesperson_ids)} salespeople")
+
+            # Generate transactions on producer threads while loaders (threads, or
+            # asyncpg tasks with --backend asyncpg) COPY finished batches into RDS
+            print("\n--- GENERATE TRANSACTIONS ---")
+            with stage('ensure_partitions'):
+                ensure_partitions(rds_conn, datetime.now() - timedelta(days=180), datetime.now(), schema=schema)
+            generators = transaction_generators(master, days=180)
+            if args.backend == 'asyncpg':
+                generated = async_load.run(generators, GENERATED_COLUMNS, RDS_DB, schema=schema,
+                                           workers=args.generators, loaders=args.loaders)
+            else:
+                generated = pipeline.run(generators, sink_loader(sinks.PostgresSink(rds_pool, schema)),
+                                         workers=args.generators, loaders=args.loaders)
+            for table, count in generated.items():
+                print(f"Generated {count} {table}")
+
+            with stage('refresh_rollups') as st:
+                st.add_rows(refresh_rollups(rds_conn, schema=schema))
+        finally:
+            # Rebuilt even when the load fails, so the live dashboards are never
+            # left without their indexes; the shadow schema has no readers yet,
+            # so it skips CONCURRENTLY
+            print("\n--- BUILD INDEXES AND ANALYZE ---")
+            if not rds_conn.closed:
+                rds_conn.rollback()  # an open transaction would stall CREATE INDEX CONCURRENTLY
+            with stage('build_indexes'):
+                maintenance.build_secondary_indexes(rds_pool, schema, concurrently=not args.shadow)
+
+        with stage('analyze'):
+            maintenance.analyze_tables(rds_conn, schema)
+
+        # Card views of the live schema would be dropped with it by the swap,
+        # so the shadow gets its own copies, built from the new tables
+        if args.shadow:
+            with stage('copy_views'):
+                materialized_views.copy_views(rds_conn, SCHEMA, SHADOW_SCHEMA)
+        else:
+            with stage('refresh_views'):
+                materialized_views.refresh(rds_conn, schema)
+
+        if args.shadow:
+            print("\n--- VALIDATE AND SWAP ---")
+            with stage('validate'):
+                validate_schema(rds_conn, SHADOW_SCHEMA)
+            with stage('swap'):
+                swap_schemas(rds_conn, SHADOW_SCHEMA, SCHEMA)
+
+        if args.warm_dashboard:
+            warm_dashboard(args.warm_dashboard)
 
         print("\n" + "=" * 60)
         print("ETL COMPLETED SUCCESSFULLY!")
         print("=" * 60)
 
     finally:
-        local_conn.close()
-        rds_conn.close()
+        db_pool.close_all()
+        if rds_conn is not None:
+            rds_conn.close()
+        metrics.print_summary()
+        if args.report:
+            metrics.write_report(args.report)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,121 @@
+"""
+Post-load maintenance: secondary indexes and planner statistics.
+
+Usage:
+    maintenance.drop_secondary_indexes(conn, schema)      # before a bulk load
+    ... load ...
+    maintenance.build_secondary_indexes(pool, schema)     # in parallel, afterwards
+    maintenance.analyze_tables(conn, schema)
+
+Bulk loads run without secondary indexes, which are then rebuilt once
+per load instead of being maintained row by row. Index builds run in
+parallel on pooled connections. Plain tables are built CONCURRENTLY so
+Metabase queries keep running against a live schema. Partitioned tables
+cannot be indexed concurrently, so they are built with a plain
+CREATE INDEX, which still only blocks writes.
+"""
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import db_pool
+
+SCHEMA = "sales_insights"
+
+BUILD_WORKERS = 4
+MAINTENANCE_WORK_MEM = "256MB"
+
+# (index name, table, definition) for everything beyond the primary keys.
+# BRIN suits the date columns: rows arrive in date order, so a tiny index
+# prunes most blocks for the "last N days" filters every card uses.
+SECONDARY_INDEXES = [
+    ("sales_orders_order_date_brin", "sales_orders", "USING brin (order_date)"),
+    ("sales_orders_customer_id_idx", "sales_orders", "(customer_id)"),
+    ("sales_orders_salesperson_id_idx", "sales_orders", "(salesperson_id)"),
+    ("sales_orders_quotation_id_idx", "sales_orders", "(quotation_id) WHERE quotation_id IS NOT NULL"),
+    ("sales_quotations_quotation_date_brin", "sales_quotations", "USING brin (quotation_date)"),
+    ("sales_quotations_customer_id_idx", "sales_quotations", "(customer_id)"),
+    ("sales_quotations_salesperson_id_idx", "sales_quotations", "(salesperson_id)"),
+    ("inventory_snapshots_product_id_idx", "inventory_snapshots", "(product_id)"),
+    ("sales_targets_granularity_date_idx", "sales_targets", "(granularity, target_date)"),
+]
+
+
+def drop_secondary_indexes(conn, schema=SCHEMA):
+    """Drop the secondary indexes so a bulk load only maintains primary keys"""
+    with conn.cursor() as cur:
+        for name, _, _ in SECONDARY_INDEXES:
+            cur.execute(f"DROP INDEX IF EXISTS {schema}.{name}")
+    conn.commit()
+    print(f"Dropped {len(SECONDARY_INDEXES)} secondary indexes in {schema}")
+
+
+def _partitioned_tables(pool, schema):
+    with db_pool.pooled(pool) as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT c.relname
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relkind = 'p'
+        """, (schema,))
+        return {row[0] for row in cur.fetchall()}
+
+
+def _build(pool, schema, specs, concurrently):
+    """Create ``specs`` one after another on a single autocommit connection"""
+    with db_pool.pooled(pool) as conn:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"SET maintenance_work_mem = '{MAINTENANCE_WORK_MEM}'")
+                for name, table, definition in specs:
+                    how = "CONCURRENTLY " if concurrently else ""
+                    cur.execute(f"CREATE INDEX {how}IF NOT EXISTS {name} ON {schema}.{table} {definition}")
+                cur.execute("RESET maintenance_work_mem")
+        finally:
+            conn.autocommit = False
+    return [name for name, _, _ in specs]
+
+
+def build_secondary_indexes(pool, schema=SCHEMA, concurrently=True, workers=BUILD_WORKERS):
+    """Create every secondary index, in parallel across pooled connections.
+
+    Concurrent builds on the same table would only queue behind each other,
+    so those are grouped per table; plain builds run one index per task.
+    """
+    partitioned = _partitioned_tables(pool, schema)
+    tasks = defaultdict(list)
+    for spec in SECONDARY_INDEXES:
+        name, table, _ = spec
+        concurrent = concurrently and table not in partitioned
+        tasks[(concurrent, table if concurrent else name)].append(spec)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_build, pool, schema, specs, concurrent)
+                   for (concurrent, _), specs in tasks.items()]
+        for future in as_completed(futures):
+            for name in future.result():
+                print(f"  Built index {schema}.{name}")
+
+
+def analyze_tables(conn, schema=SCHEMA, tables=None):
+    """ANALYZE the given tables, or every table in the schema.
+
+    Partitions are skipped: analyzing a partitioned table already updates
+    the statistics of each of its partitions.
+    """
+    with conn.cursor() as cur:
+        if tables is None:
+            cur.execute("""
+                SELECT c.relname
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = %s AND c.relkind IN ('r', 'p') AND NOT c.relispartition
+                ORDER BY c.relname
+            """, (schema,))
+            tables = [row[0] for row in cur.fetchall()]
+        for table in tables:
+            cur.execute(f"ANALYZE {schema}.{table}")
+    conn.commit()
+    print(f"Analyzed {len(tables)} tables in {schema}")
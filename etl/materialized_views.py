@@ -0,0 +1,171 @@
+"""
+Materialized views behind the heaviest dashboard cards.
+
+Usage:
+    # Deploy: create or rebuild the views declared by card definitions
+    materialized_views.ensure_views(conn, materialized_views.card_views(cards))
+
+    # After a load: refresh the views reading from the tables that changed
+    materialized_views.refresh(conn, tables=["sales_orders", "daily_sales_rollup"])
+
+A card is materialized by giving its definition a ``materialize`` block:
+
+    "materialize": {
+        "view": "mv_quote_conversion_by_category",
+        "unique_key": ["product_category"],
+        "query": "SELECT ... every row of the view ..."
+    }
+
+The card's own query then reads from sales_insights.<view>, so a
+dashboard view becomes a scan of a small precomputed table. Every view
+gets a unique index on ``unique_key``, which is what allows REFRESH ...
+CONCURRENTLY: readers keep seeing the previous rows while a refresh
+runs. A hash of the definition is stored in the view's comment, so
+redeploying an unchanged view does not rebuild it.
+
+Refreshes are driven by the catalog rather than by the card files. A
+load refreshes the mv_* views that depend on the tables it wrote, so the
+ETL needs no knowledge of the dashboards.
+"""
+
+import hashlib
+import time
+
+SCHEMA = "sales_insights"
+
+VIEW_PREFIX = "mv_"
+COMMENT_PREFIX = "card view "
+
+
+def card_views(cards):
+    """The ``materialize`` blocks of card definitions (dicts), checked for a name and key"""
+    views = []
+    for card in cards:
+        spec = card.get("materialize")
+        if not spec:
+            continue
+        if not spec["view"].startswith(VIEW_PREFIX):
+            raise ValueError(f"Materialized view of {card['name']!r} must be named {VIEW_PREFIX}*")
+        if not spec.get("unique_key"):
+            raise ValueError(f"Materialized view {spec['view']} needs a unique_key for concurrent refresh")
+        views.append(spec)
+    return views
+
+
+def definition_hash(spec):
+    text = "\n".join([spec["query"].strip().rstrip(";"), ",".join(spec["unique_key"])])
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def ensure_views(conn, specs, schema=SCHEMA, dry_run=False):
+    """Create each view, or rebuild it if its definition changed; returns {view: action}.
+
+    ``action`` is "create", "rebuild" or "unchanged". With ``dry_run`` nothing
+    is executed. A rebuilt view is populated before its transaction commits,
+    so cards never read an empty view.
+    """
+    actions = {}
+    with conn.cursor() as cur:
+        for spec in specs:
+            view, digest = spec["view"], definition_hash(spec)
+            cur.execute("SELECT obj_description(to_regclass(%s), 'pg_class'), to_regclass(%s) IS NOT NULL",
+                        (f"{schema}.{view}", f"{schema}.{view}"))
+            comment, exists = cur.fetchone()
+            if comment == f"{COMMENT_PREFIX}{digest}":
+                actions[view] = "unchanged"
+                continue
+            actions[view] = "rebuild" if exists else "create"
+            if dry_run:
+                continue
+
+            started = time.perf_counter()
+            cur.execute(f"DROP MATERIALIZED VIEW IF EXISTS {schema}.{view}")
+            cur.execute(f"CREATE MATERIALIZED VIEW {schema}.{view} AS "
+                        f"{spec['query'].strip().rstrip(';')} WITH DATA")
+            cur.execute(f"CREATE UNIQUE INDEX {view}_key ON {schema}.{view} ({', '.join(spec['unique_key'])})")
+            cur.execute(f"COMMENT ON MATERIALIZED VIEW {schema}.{view} IS %s", (f"{COMMENT_PREFIX}{digest}",))
+            cur.execute(f"ANALYZE {schema}.{view}")
+            conn.commit()
+            print(f"  {'Created' if actions[view] == 'create' else 'Rebuilt'} {schema}.{view} "
+                  f"in {time.perf_counter() - started:.1f}s")
+    conn.rollback()
+    return actions
+
+
+def views(cur, schema=SCHEMA, tables=None):
+    """mv_* views of ``schema``, or only those reading from any of ``tables``"""
+    if tables is None:
+        cur.execute("""
+            SELECT matviewname FROM pg_matviews
+            WHERE schemaname = %s AND matviewname LIKE %s
+            ORDER BY matviewname
+        """, (schema, f"{VIEW_PREFIX}%"))
+    else:
+        # A view's dependencies hang off its rewrite rule
+        cur.execute("""
+            SELECT DISTINCT v.relname
+            FROM pg_depend d
+            JOIN pg_rewrite r ON r.oid = d.objid
+            JOIN pg_class v ON v.oid = r.ev_class
+            JOIN pg_class t ON t.oid = d.refobjid
+            JOIN pg_namespace n ON n.oid = v.relnamespace
+            WHERE d.classid = 'pg_rewrite'::regclass
+              AND v.relkind = 'm' AND n.nspname = %s AND v.relname LIKE %s
+              AND t.relnamespace = n.oid AND t.relname = ANY(%s)
+            ORDER BY v.relname
+        """, (schema, f"{VIEW_PREFIX}%", list(tables)))
+    return [row[0] for row in cur.fetchall()]
+
+
+def refresh(conn, schema=SCHEMA, tables=None):
+    """REFRESH ... CONCURRENTLY every view (or those depending on ``tables``); returns the count.
+
+    Each view commits on its own. A view that was never populated cannot be
+    refreshed concurrently and gets a plain refresh instead.
+    """
+    with conn.cursor() as cur:
+        names = views(cur, schema, tables)
+        for view in names:
+            started = time.perf_counter()
+            cur.execute("SELECT ispopulated FROM pg_matviews WHERE schemaname = %s AND matviewname = %s",
+                        (schema, view))
+            concurrently = "CONCURRENTLY " if cur.fetchone()[0] else ""
+            cur.execute(f"REFRESH MATERIALIZED VIEW {concurrently}{schema}.{view}")
+            cur.execute(f"ANALYZE {schema}.{view}")
+            conn.commit()
+            print(f"  Refreshed {schema}.{view} in {time.perf_counter() - started:.1f}s")
+    return len(names)
+
+
+def copy_views(conn, source, target):
+    """Recreate the mv_* views of ``source`` in ``target``, populated from ``target``'s tables.
+
+    Used before a shadow schema is swapped in, so the swapped-in schema
+    already carries its views (and the card SQL keeps resolving). The
+    definitions, unique indexes and comments are copied from the catalog.
+    """
+    with conn.cursor() as cur:
+        # With an empty search_path every relation in a definition comes back schema-qualified
+        cur.execute("SET LOCAL search_path TO pg_catalog")
+        cur.execute("""
+            SELECT c.relname, pg_get_viewdef(c.oid), obj_description(c.oid, 'pg_class'),
+                   ARRAY(SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i WHERE i.indrelid = c.oid)
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relkind = 'm' AND c.relname LIKE %s
+            ORDER BY c.relname
+        """, (source, f"{VIEW_PREFIX}%"))
+        definitions = cur.fetchall()
+
+        for view, query, comment, indexes in definitions:
+            cur.execute(f"DROP MATERIALIZED VIEW IF EXISTS {target}.{view}")
+            cur.execute(f"CREATE MATERIALIZED VIEW {target}.{view} AS "
+                        f"{query.strip().rstrip(';').replace(f'{source}.', f'{target}.')} WITH DATA")
+            for index in indexes:
+                cur.execute(index.replace(f" ON {source}.", f" ON {target}."))
+            if comment:
+                cur.execute(f"COMMENT ON MATERIALIZED VIEW {target}.{view} IS %s", (comment,))
+            cur.execute(f"ANALYZE {target}.{view}")
+            print(f"  Copied {source}.{view} into {target}")
+    conn.commit()
+    return len(definitions)
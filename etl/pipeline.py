@@ -0,0 +1,109 @@
+"""
+Bounded producer/consumer pipeline that overlaps row generation with loading.
+
+Usage:
+    sink = sinks.PostgresSink(rds_pool, schema)   # COPYs each batch with bulk_load.copy_rows
+    totals = pipeline.run(
+        {"sales_orders": partial(generate_sales_orders, master)},
+        load=lambda table, rows: sink.write(table, GENERATED_COLUMNS[table], rows),
+    )
+
+Producers are zero-argument callables returning an iterable of rows. They
+run on worker threads and push fixed-size row batches onto a bounded queue,
+which loader threads drain into the database. When the loaders fall behind,
+producers block on the full queue, so memory stays at roughly
+``max_pending`` batches and wall time approaches max(generate, load) rather
+than their sum.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from db_pool import chunked
+from etl_metrics import stage
+
+PRODUCERS = 2
+LOADERS = 2
+MAX_PENDING = 8
+BATCH_SIZE = 2000
+
+_DONE = object()
+
+
+def run(producers, load, workers=PRODUCERS, loaders=LOADERS, max_pending=MAX_PENDING,
+        batch_size=BATCH_SIZE):
+    """Run ``producers`` through ``load(name, rows)`` and return rows loaded per name.
+
+    Generation is timed as stage ``generate_<name>`` and loading as
+    ``load_<name>``. The first error from any thread stops the pipeline and
+    is re-raised once every thread has finished.
+    """
+    if workers < 1 or loaders < 1:
+        # Without a loader the producers would block on the full queue forever
+        raise ValueError(f"pipeline.run needs at least one producer and one loader "
+                         f"(workers={workers}, loaders={loaders})")
+    pending = queue.Queue(maxsize=max_pending)
+    failed = threading.Event()
+    errors = []
+    totals = dict.fromkeys(producers, 0)
+    lock = threading.Lock()
+
+    def fail(e):
+        with lock:
+            errors.append(e)
+        failed.set()
+
+    def produce(name, make_rows):
+        try:
+            batches = chunked(make_rows(), batch_size)
+            while not failed.is_set():
+                with stage(f"generate_{name}") as st:
+                    batch = next(batches, None)
+                    st.add_rows(len(batch or ()))
+                if batch is None:
+                    return
+                # Block while the queue is full, but give up if a loader died
+                while not failed.is_set():
+                    try:
+                        pending.put((name, batch), timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            fail(e)
+
+    def drain():
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                return
+            if failed.is_set():
+                continue  # keep draining so producers never block forever
+            name, batch = item
+            try:
+                with stage(f"load_{name}") as st:
+                    count = load(name, batch)
+                    st.add_rows(count)
+                with lock:
+                    totals[name] += count
+            except Exception as e:
+                fail(e)
+
+    loader_threads = [threading.Thread(target=drain, name=f"loader-{i}", daemon=True)
+                      for i in range(loaders)]
+    for thread in loader_threads:
+        thread.start()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="producer") as executor:
+        for name, make_rows in producers.items():
+            executor.submit(produce, name, make_rows)
+
+    for _ in loader_threads:
+        pending.put(_DONE)
+    for thread in loader_threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    return totals
@@ -0,0 +1,116 @@
+"""
+Daily rollup tables behind the Metabase sales cards.
+
+Usage:
+    with conn.cursor() as cur:
+        rollups.ensure_rollup_tables(cur)
+        rollups.refresh(cur, "sales_orders", date(2025, 6, 1), date(2025, 6, 30))
+    conn.commit()
+
+daily_sales_rollup holds one row per order date, category, channel,
+salesperson, region and customer segment; daily_quotation_rollup one row
+per quotation date, category, status and salesperson. Both are derived
+entirely from the raw tables, so refreshing a date range simply deletes and
+recomputes that range. Callers refresh in the same transaction that
+changed the raw rows so cards never see the two disagree.
+"""
+
+SCHEMA = "sales_insights"
+
+ROLLUP_DDL = """
+CREATE TABLE IF NOT EXISTS {schema}.daily_sales_rollup (
+    order_date DATE NOT NULL,
+    product_category TEXT NOT NULL,
+    sales_channel TEXT NOT NULL,
+    salesperson_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    customer_segment TEXT NOT NULL,
+    order_count INTEGER NOT NULL,
+    quantity BIGINT NOT NULL,
+    revenue_amount NUMERIC(14,2) NOT NULL,
+    gross_profit NUMERIC(14,2) NOT NULL,
+    quoted_order_count INTEGER NOT NULL,
+    quoted_revenue_amount NUMERIC(14,2) NOT NULL,
+    PRIMARY KEY (order_date, product_category, sales_channel, salesperson_id, region, customer_segment)
+);
+
+CREATE TABLE IF NOT EXISTS {schema}.daily_quotation_rollup (
+    quotation_date DATE NOT NULL,
+    product_category TEXT NOT NULL,
+    status quotation_status_enum NOT NULL,
+    salesperson_id TEXT NOT NULL,
+    quote_count INTEGER NOT NULL,
+    quoted_amount NUMERIC(14,2) NOT NULL,
+    estimated_margin NUMERIC(14,2) NOT NULL,
+    PRIMARY KEY (quotation_date, product_category, status, salesperson_id)
+);
+"""
+
+SALES_ROLLUP_SELECT = """
+SELECT
+    o.order_date,
+    o.product_category,
+    o.sales_channel,
+    o.salesperson_id,
+    c.region,
+    c.customer_segment,
+    COUNT(*),
+    SUM(o.quantity),
+    SUM(o.revenue_amount),
+    SUM(o.gross_profit),
+    COUNT(o.quotation_id),
+    COALESCE(SUM(o.revenue_amount) FILTER (WHERE o.quotation_id IS NOT NULL), 0)
+FROM {schema}.sales_orders o
+JOIN {schema}.customers c ON c.customer_id = o.customer_id
+{where}
+GROUP BY o.order_date, o.product_category, o.sales_channel, o.salesperson_id,
+         c.region, c.customer_segment
+"""
+
+QUOTATION_ROLLUP_SELECT = """
+SELECT
+    q.quotation_date,
+    q.product_category,
+    q.status,
+    q.salesperson_id,
+    COUNT(*),
+    SUM(q.quoted_amount),
+    COALESCE(SUM(q.estimated_margin), 0)
+FROM {schema}.sales_quotations q
+{where}
+GROUP BY q.quotation_date, q.product_category, q.status, q.salesperson_id
+"""
+
+# Raw table -> (rollup table, raw date column as used in the SELECT, SELECT)
+ROLLUPS = {
+    "sales_orders": ("daily_sales_rollup", "o.order_date", SALES_ROLLUP_SELECT),
+    "sales_quotations": ("daily_quotation_rollup", "q.quotation_date", QUOTATION_ROLLUP_SELECT),
+}
+
+
+def ensure_rollup_tables(cur, schema=SCHEMA):
+    cur.execute(ROLLUP_DDL.format(schema=schema))
+
+
+def refresh(cur, table, start_date=None, end_date=None, schema=SCHEMA):
+    """Recompute the rollup of raw ``table`` for [start_date, end_date], or all dates.
+
+    Runs in the caller's transaction and returns the number of rollup rows
+    written.
+    """
+    rollup, date_column, select = ROLLUPS[table]
+    rollup_date = date_column.split(".", 1)[1]
+    if start_date is None:
+        cur.execute(f"DELETE FROM {schema}.{rollup}")
+        where, params = "", ()
+    else:
+        cur.execute(f"DELETE FROM {schema}.{rollup} WHERE {rollup_date} >= %s AND {rollup_date} <= %s",
+                    (start_date, end_date))
+        where, params = f"WHERE {date_column} >= %s AND {date_column} <= %s", (start_date, end_date)
+    cur.execute(f"INSERT INTO {schema}.{rollup} " + select.format(schema=schema, where=where), params)
+    return cur.rowcount
+
+
+def refresh_all(cur, start_date=None, end_date=None, schema=SCHEMA):
+    """Refresh every rollup for a date range (all dates when no range is given)"""
+    return {table: refresh(cur, table, start_date, end_date, schema) for table in ROLLUPS}
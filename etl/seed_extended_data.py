@@ -8,14 +8,44 @@ Features:
 - Year-over-year growth trends
 - Realistic quotation-to-order conversion
 - Weekend/holiday adjustments
+
+Usage:
+    python seed_extended_data.py                  # row-by-row Python generator
+    python seed_extended_data.py --engine numpy   # vectorized generator + COPY
+    python seed_extended_data.py --resume --seed 42   # skip months committed by an interrupted run
+    python seed_extended_data.py --workers 8 --seed 42   # month shards across 8 processes
+    python seed_extended_data.py --sink parquet --output data/seed42 --seed 42   # files, no writes
+    python seed_extended_data.py --scale-factor 100 --engine numpy --workers 8 --seed 42   # benchmark SF100
+
+Scale factors multiply customers, products, salespeople and daily volume
+by 10, 100 or 1000, TPC style. The distributions stay the same (see
+scale_master_data). A given --seed and --scale-factor always produce the
+same dataset.
 """
 
-import psycopg2
+import argparse
+import multiprocessing
 import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from decimal import Decimal
+from functools import partial
 import uuid
 
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for --engine numpy
+    np = None
+
+import db_pool
+import etl_metrics
+import maintenance
+import materialized_views
+import rollups
+import sinks
+from bulk_load import copy_columns, copy_rows, upsert_rows
+from etl_metrics import stage
+
 # Database connection
 DB_CONFIG = {
     "host": "pgm-zf88bk02y03831k6co.pgsql.kualalumpur.rds.aliyuncs.com",
@@ -25,6 +55,26 @@ DB_CONFIG = {
     "port": 5432
 }
 
+# Tables rewritten by a seeding run, analyzed once it finishes
+SEEDED_TABLES = [
+    "sales_orders", "sales_quotations", "daily_sales_rollup", "daily_quotation_rollup",
+    "sales_targets", "inventory_snapshots", "sales_forecasts", "seed_checkpoints",
+]
+
+# Benchmark dataset sizes; 1 is the plain seed on the existing master data
+SCALE_FACTORS = (1, 10, 100, 1000)
+
+# Suffix of the master data replicas added by --scale-factor: <id>-SF0001, ...
+REPLICA_MARKER = "-SF"
+REPLICA_PATTERN = f"{REPLICA_MARKER}[0-9]{{4}}$"
+
+# Master tables replicated by --scale-factor: (key column, name column)
+SCALED_TABLES = {
+    "customers": ("customer_id", "customer_name"),
+    "product_catalog": ("product_id", "product_name"),
+    "salespeople": ("salesperson_id", "salesperson_name"),
+}
+
 # Date range
 START_DATE = datetime(2024, 1, 1)
 END_DATE = datetime(2026, 12, 31)
@@ -68,34 +118,130 @@ SALES_CHANNELS = ["Direct", "Distributor", "Online", "Key Account"]
 DELIVERY_STATUSES = ["Pending", "Shipped", "Delivered", "Cancelled"]
 QUOTATION_STATUSES = ["Draft", "Active", "Completed", "Lost"]
 
+# Column order of the columnar batches produced by the numpy engine
+ORDER_COLUMNS = (
+    "order_id", "order_date", "customer_id", "product_category", "product_name",
+    "quantity", "revenue_amount", "currency", "delivery_status", "salesperson_id",
+    "quotation_id", "unit_price", "unit_cost", "gross_profit", "discount_rate", "sales_channel",
+)
+QUOTATION_COLUMNS = (
+    "quotation_id", "quotation_date", "customer_id", "product_category",
+    "quoted_amount", "currency", "status", "salesperson_id", "expected_close_date",
+    "estimated_margin", "probability",
+)
+
+TARGET_COLUMNS = ("target_date", "granularity", "entity_id", "target_amount")
+INVENTORY_COLUMNS = ("snapshot_date", "product_id", "stock_on_hand", "reserved_units", "inbound_units")
+FORECAST_COLUMNS = ("forecast_date", "horizon", "product_category", "predicted_revenue", "predicted_margin")
+
+# Delivery status mix by order age in days: (min days ago exclusive, statuses, weights)
+ORDER_STATUS_BUCKETS = [
+    (30, ["Delivered", "Cancelled"], [95, 5]),
+    (7, ["Delivered", "Shipped", "Cancelled"], [70, 25, 5]),
+    (0, ["Shipped", "Pending", "Delivered"], [50, 40, 10]),
+]
+
 
 def get_connection():
-    return psycopg2.connect(**DB_CONFIG)
+    return db_pool.connect(DB_CONFIG)
 
 
 def get_existing_data(conn):
-    """Fetch existing master data"""
+    """Fetch existing master data, ordered so a given seed draws the same rows on every run.
+
+    Replicas left by an earlier --scale-factor run are skipped, so the
+    result depends only on the original master data.
+    """
     cur = conn.cursor()
+    replica = (REPLICA_PATTERN,)
 
     # Get customers
-    cur.execute("SELECT customer_id FROM sales_insights.customers")
+    cur.execute("SELECT customer_id FROM sales_insights.customers WHERE customer_id !~ %s ORDER BY customer_id",
+                replica)
     customers = [row[0] for row in cur.fetchall()]
 
     # Get products with their categories
     cur.execute("""
         SELECT product_id, product_name, product_category, unit_cost, unit_price
         FROM sales_insights.product_catalog
-    """)
+        WHERE product_id !~ %s
+        ORDER BY product_id
+    """, replica)
     products = cur.fetchall()
 
     # Get salespeople
-    cur.execute("SELECT salesperson_id FROM sales_insights.salespeople")
+    cur.execute("SELECT salesperson_id FROM sales_insights.salespeople WHERE salesperson_id !~ %s "
+                "ORDER BY salesperson_id", replica)
     salespeople = [row[0] for row in cur.fetchall()]
 
     cur.close()
     return customers, products, salespeople
 
 
+def scale_master_data(conn, scale, sink=None):
+    """Replicate every customer, product and salesperson ``scale`` times; returns the scaled master data.
+
+    Replica k copies all columns of its original and appends ``-SF000k`` to
+    the id and name. Product prices and categories are therefore unchanged,
+    and spreading ``scale`` times the daily volume over ``scale`` times the
+    master rows keeps every per-entity distribution. Missing replicas are
+    added to the master tables, or, with a file ``sink``, the complete
+    scaled tables are written to it. Returns (customers, products,
+    salespeople) shaped like get_existing_data.
+    """
+    scaled = {}
+    with conn.cursor() as cur:
+        for table, (key, name) in SCALED_TABLES.items():
+            # Replicas of an earlier, larger scale factor are not originals
+            cur.execute(f"SELECT * FROM sales_insights.{table} WHERE {key} !~ %s ORDER BY {key}",
+                        (REPLICA_PATTERN,))
+            columns = [desc[0] for desc in cur.description]
+            originals = cur.fetchall()
+            key_at, name_at = columns.index(key), columns.index(name)
+            replicas = []
+            for k in range(1, scale):
+                suffix = f"{REPLICA_MARKER}{k:04d}"
+                for row in originals:
+                    replica = list(row)
+                    replica[key_at] += suffix
+                    replica[name_at] += suffix
+                    replicas.append(tuple(replica))
+            if sink is not None:
+                sink.write(table, columns, originals + replicas, partition="all")
+            else:
+                upsert_rows(cur, f"sales_insights.{table}", columns, replicas, (key,))
+            scaled[table] = [dict(zip(columns, row)) for row in originals + replicas]
+            print(f"  {table}: {len(originals)} x {scale} = {len(scaled[table]):,} rows")
+    conn.commit()
+
+    customers = [row["customer_id"] for row in scaled["customers"]]
+    products = [(row["product_id"], row["product_name"], row["product_category"], row["unit_cost"],
+                 row["unit_price"]) for row in scaled["product_catalog"]]
+    salespeople = [row["salesperson_id"] for row in scaled["salespeople"]]
+    return customers, products, salespeople
+
+
+def drop_stale_replicas(conn, scale):
+    """Delete the master data replicas numbered ``scale`` and above; returns rows deleted.
+
+    They are left by an earlier run at a larger scale factor. Called once
+    the transactions have been rewritten, since until then old orders and
+    quotations still reference them.
+    """
+    deleted = 0
+    with conn.cursor() as cur:
+        for table, (key, _) in SCALED_TABLES.items():
+            cur.execute(f"""
+                DELETE FROM sales_insights.{table}
+                WHERE {key} ~ %s AND right({key}, 4)::int >= %s
+            """, (REPLICA_PATTERN, scale))
+            if cur.rowcount:
+                print(f"  {table}: deleted {cur.rowcount:,} replicas of a larger scale factor")
+            deleted += cur.rowcount
+    conn.commit()
+    return deleted
+
+
 def generate_order_id(date, seq):
     """Generate unique order ID"""
     return f"ORD-{date.strftime('%Y%m%d')}-{seq:04d}"
@@ -110,7 +256,7 @@ def is_weekend(date):
     return date.weekday() >= 5
 
 
-def get_daily_order_count(date, base_count):
+def get_daily_order_count(date, base_count, rng=random):
     """Calculate expected orders for a given date"""
     # Apply seasonal multiplier
     seasonal = SEASONAL_MULTIPLIERS.get(date.month, 1.0)
@@ -122,145 +268,517 @@ def get_daily_order_count(date, base_count):
     weekend_mult = 0.3 if is_weekend(date) else 1.0
 
     # Random variation (+/- 30%)
-    variation = random.uniform(0.7, 1.3)
+    variation = rng.uniform(0.7, 1.3)
 
     count = base_count * seasonal * yoy * weekend_mult * variation
     return max(0, int(round(count)))
 
 
-def generate_orders(conn, start_date, end_date, customers, products, salespeople):
-    """Generate sales orders for date range"""
-    cur = conn.cursor()
+def month_windows(start_date, end_date):
+    """Yield (first_day, last_day) of each calendar month overlapping the range"""
+    current = start_date.replace(day=1)
+    while current <= end_date:
+        if current.month == 12:
+            next_month = current.replace(year=current.year + 1, month=1)
+        else:
+            next_month = current.replace(month=current.month + 1)
+        yield max(current, start_date), min(next_month - timedelta(days=1), end_date)
+        current = next_month
+
+
+def _np_days(first_day, last_day):
+    """Day array for a window plus the seasonal * YoY * weekend multiplier per day"""
+    days = np.arange(np.datetime64(first_day.date()), np.datetime64(last_day.date()) + 1)
+    months = days.astype("datetime64[M]").astype(int) % 12 + 1
+    years = days.astype("datetime64[Y]").astype(int) + 1970
+    weekday = (days.astype(int) + 3) % 7  # 1970-01-01 was a Thursday
+    seasonal = np.array([SEASONAL_MULTIPLIERS.get(m, 1.0) for m in range(13)])[months]
+    yoy = np.array([YOY_GROWTH.get(y, 1.0) for y in years])
+    weekend = np.where(weekday >= 5, 0.3, 1.0)
+    return days, seasonal * yoy * weekend
+
+
+def _np_daily_counts(rng, multipliers, base_counts):
+    """Vectorized get_daily_order_count: a (days x categories) matrix of row counts"""
+    variation = rng.uniform(0.7, 1.3, size=(len(multipliers), len(base_counts)))
+    counts = np.rint(np.outer(multipliers, base_counts) * variation)
+    return np.maximum(counts, 0).astype(np.int64)
+
+
+def _np_expand(counts):
+    """Row-level day index, category index and 1-based per-day sequence from a count matrix"""
+    n_days, n_cats = counts.shape
+    flat = counts.ravel()
+    row_day = np.repeat(np.repeat(np.arange(n_days), n_cats), flat)
+    row_cat = np.repeat(np.tile(np.arange(n_cats), n_days), flat)
+    day_totals = counts.sum(axis=1)
+    day_starts = np.cumsum(day_totals) - day_totals
+    seq = np.arange(len(row_day)) - np.repeat(day_starts, day_totals) + 1
+    return row_day, row_cat, seq
+
+
+def _np_weighted(rng, labels, weights, size):
+    p = np.asarray(weights, dtype=float)
+    return rng.choice(np.asarray(labels, dtype=object), size=size, p=p / p.sum())
+
+
+def _np_round_cents(numerator, divisor):
+    """Integer division rounding half away from zero, like NUMERIC(12,2) casts"""
+    return np.sign(numerator) * ((np.abs(numerator) + divisor // 2) // divisor)
+
+
+class _ProductArrays:
+    """Products of the seeded categories as flat arrays grouped by category"""
+
+    def __init__(self, products):
+        by_category = {}
+        for p in products:
+            by_category.setdefault(p[2], []).append(p)
+        cats = [(c, base) for c, base in CATEGORIES if c in by_category]
+        self.categories = np.array([c for c, _ in cats], dtype=object)
+        self.base_counts = np.array([base for _, base in cats])
+        ordered = [p for c, _ in cats for p in by_category[c]]
+        sizes = np.array([len(by_category[c]) for c, _ in cats])
+        self.offsets = np.cumsum(sizes) - sizes
+        self.sizes = sizes
+        self.names = np.array([p[1] for p in ordered], dtype=object)
+        self.cost_cents = np.array([int(Decimal(p[3]) * 100) for p in ordered], dtype=np.int64)
+        self.price_cents = np.array([int(Decimal(p[4]) * 100) for p in ordered], dtype=np.int64)
+
+    def pick(self, rng, row_cat):
+        """Random product index within each row's category"""
+        return self.offsets[row_cat] + rng.integers(0, self.sizes[row_cat])
+
+
+def generate_order_batches(start_date, end_date, customers, products, salespeople, rng, scale=1):
+    """Vectorized order generator yielding one columnar batch (dict of arrays) per month.
+
+    Same distributions as generate_orders, but whole months are drawn as
+    NumPy arrays and money is computed in integer cents. ``scale``
+    multiplies the daily order volume.
+    """
+    catalog = _ProductArrays(products)
+    customers = np.asarray(customers, dtype=object)
+    salespeople = np.asarray(salespeople, dtype=object)
+    today = np.datetime64(datetime.now().date())
+
+    for first_day, last_day in month_windows(start_date, end_date):
+        days, multipliers = _np_days(first_day, last_day)
+        counts = _np_daily_counts(rng, multipliers, catalog.base_counts * scale)
+        row_day, row_cat, seq = _np_expand(counts)
+        n = len(row_day)
+
+        product = catalog.pick(rng, row_cat)
+        quantity = rng.integers(5, 201, size=n)
+        discount = rng.choice(np.array([0, 0, 0, 5, 5, 10, 10, 15]), size=n)
+        price, cost = catalog.price_cents[product], catalog.cost_cents[product]
+        revenue = _np_round_cents(price * quantity * (100 - discount), 100)
+        profit = _np_round_cents((price - cost) * quantity * (100 - discount), 100)
+
+        order_dates = days[row_day]
+        days_ago = (today - order_dates).astype(int)
+        status = np.full(n, "Pending", dtype=object)
+        upper = None
+        for threshold, labels, weights in ORDER_STATUS_BUCKETS:
+            mask = days_ago > threshold if upper is None else (days_ago > threshold) & (days_ago <= upper)
+            status[mask] = _np_weighted(rng, labels, weights, mask.sum())
+            upper = threshold
+
+        day_keys = np.char.replace(days.astype(str), "-", "")
+        order_ids = np.char.add(np.char.add("ORD-", day_keys[row_day]),
+                                np.char.add("-", np.char.zfill(seq.astype(str), 4)))
+
+        yield first_day, {
+            "order_id": order_ids,
+            "order_date": order_dates,
+            "customer_id": customers[rng.integers(0, len(customers), size=n)],
+            "product_category": catalog.categories[row_cat],
+            "product_name": catalog.names[product],
+            "quantity": quantity,
+            "revenue_amount": revenue / 100,
+            "currency": np.full(n, "MYR", dtype=object),
+            "delivery_status": status,
+            "salesperson_id": salespeople[rng.integers(0, len(salespeople), size=n)],
+            "quotation_id": np.full(n, None, dtype=object),
+            "unit_price": price / 100,
+            "unit_cost": cost / 100,
+            "gross_profit": profit / 100,
+            "discount_rate": discount,
+            "sales_channel": rng.choice(np.asarray(SALES_CHANNELS, dtype=object), size=n),
+        }
+
+
+def generate_quotation_batches(start_date, end_date, customers, products, salespeople, rng, scale=1):
+    """Vectorized quotation generator yielding one columnar batch per month"""
+    catalog = _ProductArrays(products)
+    customers = np.asarray(customers, dtype=object)
+    salespeople = np.asarray(salespeople, dtype=object)
+    today = np.datetime64(datetime.now().date())
+
+    for first_day, last_day in month_windows(start_date, end_date):
+        days, multipliers = _np_days(first_day, last_day)
+        # Quotations are ~40% of order volume
+        counts = _np_daily_counts(rng, multipliers, catalog.base_counts * 0.4 * scale)
+        row_day, row_cat, seq = _np_expand(counts)
+        n = len(row_day)
+
+        product = catalog.pick(rng, row_cat)
+        quantity = rng.integers(10, 501, size=n)
+        price, cost = catalog.price_cents[product], catalog.cost_cents[product]
+
+        quote_dates = days[row_day]
+        expected_close = quote_dates + rng.integers(7, 61, size=n)
+        days_past_close = (today - expected_close).astype(int)
+
+        status = np.empty(n, dtype=object)
+        probability = np.empty(n)
+        old = days_past_close > 30
+        expired = (days_past_close > 0) & ~old
+        due_soon = (days_past_close > -14) & (days_past_close <= 0)
+        future = days_past_close <= -14
+
+        status[old] = _np_weighted(rng, ["Completed", "Lost"], [65, 35], old.sum())
+        probability[old] = np.where(status[old] == "Completed", 0.9, 0.1)
+        status[expired] = _np_weighted(rng, ["Completed", "Lost", "Active"], [50, 30, 20], expired.sum())
+        probability[expired] = rng.uniform(0.3, 0.7, size=expired.sum())
+        status[due_soon] = _np_weighted(rng, ["Active", "Completed"], [70, 30], due_soon.sum())
+        probability[due_soon] = rng.uniform(0.5, 0.8, size=due_soon.sum())
+        status[future] = _np_weighted(rng, ["Draft", "Active"], [30, 70], future.sum())
+        probability[future] = rng.uniform(0.3, 0.6, size=future.sum())
+
+        day_keys = np.char.replace(days.astype(str), "-", "")
+        quotation_ids = np.char.add(np.char.add("QUO-", day_keys[row_day]),
+                                    np.char.add("-", np.char.zfill(seq.astype(str), 4)))
+
+        yield first_day, {
+            "quotation_id": quotation_ids,
+            "quotation_date": quote_dates,
+            "customer_id": customers[rng.integers(0, len(customers), size=n)],
+            "product_category": catalog.categories[row_cat],
+            "quoted_amount": price * quantity / 100,
+            "currency": np.full(n, "MYR", dtype=object),
+            "status": status,
+            "salesperson_id": salespeople[rng.integers(0, len(salespeople), size=n)],
+            "expected_close_date": expected_close,
+            "estimated_margin": (price - cost) * quantity / 100,
+            "probability": np.round(probability, 2),
+        }
+
+
+def ensure_checkpoints(conn):
+    """Create the table recording which months of each table are fully seeded"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS sales_insights.seed_checkpoints (
+                table_name TEXT NOT NULL,
+                month DATE NOT NULL,
+                row_count INTEGER NOT NULL,
+                completed_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW(),
+                PRIMARY KEY (table_name, month)
+            )
+        """)
+    conn.commit()
 
-    # First, delete existing orders in date range
-    print(f"Clearing existing orders from {start_date.date()} to {end_date.date()}...")
-    cur.execute("""
-        DELETE FROM sales_insights.sales_orders
-        WHERE order_date >= %s AND order_date <= %s
-    """, (start_date.date(), end_date.date()))
 
-    current_date = start_date
-    total_orders = 0
-    order_seq = 0
+def completed_months(conn, table):
+    """First days of the months of ``table`` already committed by an earlier run"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT month FROM sales_insights.seed_checkpoints WHERE table_name = %s", (table,))
+        return {row[0] for row in cur.fetchall()}
 
-    # Group products by category
+
+def clear_checkpoints(conn, table):
+    with conn.cursor() as cur:
+        cur.execute("DELETE FROM sales_insights.seed_checkpoints WHERE table_name = %s", (table,))
+    conn.commit()
+
+
+def month_partition(table, first_day):
+    """Name of the monthly partition of ``table`` holding ``first_day``"""
+    return f"{table}_{first_day.strftime('%Y%m')}"
+
+
+def month_rng(table, first_day, engine, seed):
+    """RNG for one month of ``table``, seeded by (seed, table, month) alone"""
+    if engine == "numpy":
+        return np.random.default_rng([seed, list(SHARDED_TABLES).index(table), first_day.year, first_day.month])
+    return random.Random(f"{seed}:{table}:{first_day.strftime('%Y-%m')}")
+
+
+def write_month(conn, window, table, master, engine, seed, scale=1):
+    """Replace one month of ``table`` and checkpoint it.
+
+    The month is bulk loaded into a staging table, which gets its primary
+    key, foreign keys and a range CHECK, and is committed. The staging
+    table's creation is committed on its own first: LIKE holds a lock on the
+    parent, and keeping it through the load would make every other worker's
+    swap wait for this load. A second short transaction then swaps it in for the month's partition (DETACH + DROP
+    the old one, ATTACH the new one) and records the checkpoint, so nothing
+    is deleted row by row and readers never see a half-loaded month. A
+    replay after a failure simply rebuilds the staging table. The month's
+    daily rollup is recomputed in the swap transaction too.
+
+    Rows come from an RNG seeded by (seed, table, month) alone, so a month's
+    contents do not depend on which worker writes it or in what order.
+    """
+    first_day, last_day = window
+    date_column, columns, generate_batches, _, insert_days = SHARDED_TABLES[table]
+    customers, products, salespeople = master
+    month_start = first_day.date().replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1)
+    partition = month_partition(table, first_day)
+    staging = f"{partition}_load"
+
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS sales_insights.{staging}")
+        cur.execute(f"""
+            CREATE TABLE sales_insights.{staging}
+            (LIKE sales_insights.{table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+        """)
+        conn.commit()  # release the parent; only the swap below should lock it
+
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL", (f"sales_insights.{partition}",))
+        exists = cur.fetchone()[0]
+        if exists and (first_day.date() > month_start or last_day.date() < month_end - timedelta(days=1)):
+            # Partial month: keep the days of the old partition outside the window
+            cur.execute(f"""
+                INSERT INTO sales_insights.{staging}
+                SELECT * FROM sales_insights.{partition}
+                WHERE {date_column} < %s OR {date_column} > %s
+            """, (first_day.date(), last_day.date()))
+
+        rng = month_rng(table, first_day, engine, seed)
+        if engine == "numpy":
+            count = sum(copy_columns(cur, f"sales_insights.{staging}", columns, batch)
+                        for _, batch in generate_batches(first_day, last_day, customers, products,
+                                                         salespeople, rng, scale))
+        else:
+            count = insert_days(cur, first_day, last_day, customers, _products_by_category(products),
+                                salespeople, rng, target=f"sales_insights.{staging}", scale=scale)
+
+        # Build the keys now, outside the swap, so ATTACH adopts them instead
+        # of building and validating them under the parent's lock; the
+        # matching CHECK lets it skip the partition-bound scan as well
+        cur.execute(f"""
+            ALTER TABLE sales_insights.{staging}
+            ADD PRIMARY KEY ({columns[0]}, {date_column}),
+            ADD FOREIGN KEY (customer_id) REFERENCES sales_insights.customers(customer_id),
+            ADD FOREIGN KEY (salesperson_id) REFERENCES sales_insights.salespeople(salesperson_id),
+            ADD CONSTRAINT {staging}_range CHECK ({date_column} >= %s AND {date_column} < %s)
+        """, (month_start, month_end))
+        conn.commit()
+
+        cur.execute(f"LOCK TABLE sales_insights.{table} IN ACCESS EXCLUSIVE MODE")
+        if exists:
+            cur.execute(f"ALTER TABLE sales_insights.{table} DETACH PARTITION sales_insights.{partition}")
+            cur.execute(f"DROP TABLE sales_insights.{partition}")
+        cur.execute(f"ALTER TABLE sales_insights.{staging} RENAME TO {partition}")
+        cur.execute(f"""
+            ALTER TABLE sales_insights.{table}
+            ATTACH PARTITION sales_insights.{partition} FOR VALUES FROM (%s) TO (%s)
+        """, (month_start, month_end))
+        cur.execute(f"ALTER TABLE sales_insights.{partition} DROP CONSTRAINT {staging}_range")
+        rollups.refresh(cur, table, first_day.date(), last_day.date())
+        cur.execute("""
+            INSERT INTO sales_insights.seed_checkpoints (table_name, month, row_count)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (table_name, month)
+            DO UPDATE SET row_count = EXCLUDED.row_count, completed_at = NOW()
+        """, (table, month_start, count))
+    return count
+
+
+def write_month_file(window, table, master, engine, seed, sink, scale=1):
+    """Write one month of ``table`` through a file sink as partition YYYY-MM.
+
+    Draws from the same per-month RNG as write_month, so the files hold the
+    rows a database seed with the same seed would.
+    """
+    first_day, last_day = window
+    _, columns, generate_batches, generate_rows, _ = SHARDED_TABLES[table]
+    customers, products, salespeople = master
+    rng = month_rng(table, first_day, engine, seed)
+    partition = first_day.strftime("%Y-%m")
+    if engine == "numpy":
+        batches = (batch for _, batch in generate_batches(first_day, last_day, customers, products,
+                                                          salespeople, rng, scale))
+        return sink.write_columns(table, columns, batches, partition)
+    rows = generate_rows(first_day, last_day, customers, _products_by_category(products), salespeople, rng,
+                         scale)
+    return sink.write(table, columns, rows, partition)
+
+
+def _seed_month_worker(table, window, master, engine, seed, output=None, scale=1):
+    """Process-pool entry point: write one month to ``output`` (sink kind, directory)
+    or, by default, on this worker's own database connection"""
+    if output is not None:
+        return write_month_file(window, table, master, engine, seed, sinks.open_sink(*output), scale)
+    pool = db_pool.get_pool(DB_CONFIG, maxconn=1)
+    return db_pool.write_chunks(pool, [window], partial(write_month, table=table, master=master,
+                                                        engine=engine, seed=seed, scale=scale))
+
+
+def seed_by_month(conn, table, start_date, end_date, master, engine="python", seed=0, resume=False,
+                  workers=1, sink=None, scale=1):
+    """Reseed ``table`` one calendar month at a time, checkpointing each month.
+
+    Each month's partition is swapped for a freshly loaded one together
+    with its checkpoint (see write_month), so an interrupted run leaves only
+    whole months behind. With ``resume`` the months already
+    checkpointed are skipped. With ``workers`` > 1 months are sharded across
+    a process pool. With a file ``sink`` each month becomes one partition
+    file instead, and the files already written are the checkpoints.
+    Returns the number of rows written.
+    """
+    if sink is not None:
+        if resume:
+            done = {datetime.strptime(name, "%Y-%m").date()
+                    for name in sinks.written_partitions(sink.root, table)}
+        else:
+            sinks.clear(sink.root, table)
+            done = set()
+    else:
+        ensure_checkpoints(conn)
+        with conn.cursor() as cur:
+            rollups.ensure_rollup_tables(cur)
+        conn.commit()
+        if resume:
+            done = completed_months(conn, table)
+        else:
+            clear_checkpoints(conn, table)
+            done = set()
+
+    windows = [w for w in month_windows(start_date, end_date) if w[0].date().replace(day=1) not in done]
+    if done:
+        print(f"  Resuming: {len(done)} months already seeded, {len(windows)} to go")
+
+    total = 0
+    if workers > 1:
+        # spawn, not fork: children must not inherit the parent's open connections
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            output = (sink.kind, sink.root) if sink is not None else None
+            futures = {executor.submit(_seed_month_worker, table, window, master, engine, seed, output, scale):
+                       window
+                       for window in windows}
+            for done_count, future in enumerate(as_completed(futures), start=1):
+                month = futures[future][0].strftime('%Y-%m')
+                total += future.result()
+                print(f"  {month}: done")
+                etl_metrics.progress(done_count, len(windows), month)
+        return total
+
+    pool = db_pool.get_pool(DB_CONFIG) if sink is None else None
+    write = partial(write_month, table=table, master=master, engine=engine, seed=seed, scale=scale)
+    for done_count, window in enumerate(windows, start=1):
+        print(f"  {window[0].strftime('%Y-%m')}: generating...")
+        if sink is not None:
+            total += write_month_file(window, table, master, engine, seed, sink, scale)
+        else:
+            total += db_pool.write_chunks(pool, [window], write)
+        etl_metrics.progress(done_count, len(windows), window[0].strftime('%Y-%m'))
+    return total
+
+
+def _require_numpy():
+    if np is None:
+        raise SystemExit("--engine numpy requires numpy (pip install numpy)")
+
+
+def _products_by_category(products):
     products_by_category = {}
     for p in products:
         cat = p[2]
         if cat not in products_by_category:
             products_by_category[cat] = []
         products_by_category[cat].append(p)
+    return products_by_category
 
-    print("Generating orders...")
 
-    while current_date <= end_date:
+def order_rows(first_day, last_day, customers, products_by_category, salespeople, rng, scale=1):
+    """Yield the orders for each day in a window as ORDER_COLUMNS tuples, ``scale`` times the base volume"""
+    date = first_day
+    while date <= last_day:
         order_seq = 0
 
         for category, base_count in CATEGORIES:
             if category not in products_by_category:
                 continue
 
-            daily_count = get_daily_order_count(current_date, base_count)
+            daily_count = get_daily_order_count(date, base_count * scale, rng)
             cat_products = products_by_category[category]
 
             for _ in range(daily_count):
                 order_seq += 1
-                order_id = generate_order_id(current_date, order_seq)
+                order_id = generate_order_id(date, order_seq)
 
                 # Select random product from category
-                product = random.choice(cat_products)
+                product = rng.choice(cat_products)
                 product_id, product_name, _, unit_cost, unit_price = product
 
                 # Generate order details
-                customer_id = random.choice(customers)
-                salesperson_id = random.choice(salespeople)
+                customer_id = rng.choice(customers)
+                salesperson_id = rng.choice(salespeople)
 
-                quantity = random.randint(5, 200)
-                discount_rate = Decimal(str(random.choice([0, 0, 0, 5, 5, 10, 10, 15])))
+                quantity = rng.randint(5, 200)
+                discount_rate = Decimal(str(rng.choice([0, 0, 0, 5, 5, 10, 10, 15])))
 
                 effective_price = unit_price * (1 - discount_rate / 100)
                 revenue = effective_price * quantity
                 profit = (unit_price - unit_cost) * quantity * (1 - discount_rate / 100)
 
                 # Delivery status based on date
-                days_ago = (datetime.now() - current_date).days
+                days_ago = (datetime.now() - date).days
                 if days_ago > 30:
-                    status = random.choices(
+                    status = rng.choices(
                         ["Delivered", "Cancelled"],
                         weights=[95, 5]
                     )[0]
                 elif days_ago > 7:
-                    status = random.choices(
+                    status = rng.choices(
                         ["Delivered", "Shipped", "Cancelled"],
                         weights=[70, 25, 5]
                     )[0]
                 elif days_ago > 0:
-                    status = random.choices(
+                    status = rng.choices(
                         ["Shipped", "Pending", "Delivered"],
                         weights=[50, 40, 10]
                     )[0]
                 else:  # Future orders
                     status = "Pending"
 
-                sales_channel = random.choice(SALES_CHANNELS)
+                sales_channel = rng.choice(SALES_CHANNELS)
 
                 # Some orders linked to quotations (will link later)
                 quotation_id = None
 
-                cur.execute("""
-                    INSERT INTO sales_insights.sales_orders
-                    (order_id, order_date, customer_id, product_category, product_name,
-                     quantity, revenue_amount, currency, delivery_status, salesperson_id,
-                     quotation_id, unit_price, unit_cost, gross_profit, discount_rate, sales_channel)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, 'MYR', %s::delivery_status_enum,
-                            %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    order_id, current_date.date(), customer_id, category, product_name,
-                    quantity, float(revenue), status, salesperson_id, quotation_id,
+                yield (
+                    order_id, date.date(), customer_id, category, product_name,
+                    quantity, float(revenue), "MYR", status, salesperson_id, quotation_id,
                     float(unit_price), float(unit_cost), float(profit), float(discount_rate),
                     sales_channel
-                ))
-
-                total_orders += 1
-
-        # Progress indicator
-        if current_date.day == 1:
-            print(f"  {current_date.strftime('%Y-%m')}: generating...")
-
-        current_date += timedelta(days=1)
-
-    conn.commit()
-    print(f"Generated {total_orders} orders")
-    cur.close()
-    return total_orders
-
-
-def generate_quotations(conn, start_date, end_date, customers, products, salespeople):
-    """Generate quotations for date range"""
-    cur = conn.cursor()
+                )
 
-    # Clear existing quotations in range
-    print(f"Clearing existing quotations from {start_date.date()} to {end_date.date()}...")
-    cur.execute("""
-        DELETE FROM sales_insights.sales_quotations
-        WHERE quotation_date >= %s AND quotation_date <= %s
-    """, (start_date.date(), end_date.date()))
+        date += timedelta(days=1)
 
-    current_date = start_date
-    total_quotes = 0
-    quote_seq = 0
 
-    # Group products by category
-    products_by_category = {}
-    for p in products:
-        cat = p[2]
-        if cat not in products_by_category:
-            products_by_category[cat] = []
-        products_by_category[cat].append(p)
+def insert_order_days(cur, first_day, last_day, customers, products_by_category, salespeople, rng,
+                      target="sales_insights.sales_orders", scale=1):
+    """Row-by-row INSERT of the orders for each day in a window; returns the row count"""
+    count = 0
+    for row in order_rows(first_day, last_day, customers, products_by_category, salespeople, rng, scale):
+        cur.execute(f"""
+            INSERT INTO {target} ({", ".join(ORDER_COLUMNS)})
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s::delivery_status_enum,
+                    %s, %s, %s, %s, %s, %s, %s)
+        """, row)
+        count += 1
+    return count
 
-    print("Generating quotations...")
 
-    while current_date <= end_date:
+def quotation_rows(first_day, last_day, customers, products_by_category, salespeople, rng, scale=1):
+    """Yield the quotations for each day in a window as QUOTATION_COLUMNS tuples, ``scale`` times the base volume"""
+    date = first_day
+    while date <= last_day:
         quote_seq = 0
 
         # Quotations are ~40% of order volume
@@ -268,97 +786,118 @@ def generate_quotations(conn, start_date, end_date, customers, products, salespe
             if category not in products_by_category:
                 continue
 
-            daily_count = int(get_daily_order_count(current_date, base_count * 0.4))
+            daily_count = int(get_daily_order_count(date, base_count * 0.4 * scale, rng))
             cat_products = products_by_category[category]
 
             for _ in range(daily_count):
                 quote_seq += 1
-                quotation_id = generate_quotation_id(current_date, quote_seq)
+                quotation_id = generate_quotation_id(date, quote_seq)
 
-                product = random.choice(cat_products)
+                product = rng.choice(cat_products)
                 _, _, _, unit_cost, unit_price = product
 
-                customer_id = random.choice(customers)
-                salesperson_id = random.choice(salespeople)
+                customer_id = rng.choice(customers)
+                salesperson_id = rng.choice(salespeople)
 
-                quantity = random.randint(10, 500)
+                quantity = rng.randint(10, 500)
                 quoted_amount = unit_price * quantity
                 estimated_margin = (unit_price - unit_cost) * quantity
 
                 # Expected close date (7-60 days from quote)
-                close_days = random.randint(7, 60)
-                expected_close = current_date + timedelta(days=close_days)
+                close_days = rng.randint(7, 60)
+                expected_close = date + timedelta(days=close_days)
 
                 # Status based on expected close vs now
                 days_past_close = (datetime.now() - expected_close).days
 
                 if days_past_close > 30:
                     # Old quotes - mostly completed or lost
-                    status = random.choices(
+                    status = rng.choices(
                         ["Completed", "Lost"],
                         weights=[65, 35]
                     )[0]
                     probability = 0.9 if status == "Completed" else 0.1
                 elif days_past_close > 0:
                     # Recently expired
-                    status = random.choices(
+                    status = rng.choices(
                         ["Completed", "Lost", "Active"],
                         weights=[50, 30, 20]
                     )[0]
-                    probability = random.uniform(0.3, 0.7)
+                    probability = rng.uniform(0.3, 0.7)
                 elif days_past_close > -14:
                     # Due soon
-                    status = random.choices(
+                    status = rng.choices(
                         ["Active", "Completed"],
                         weights=[70, 30]
                     )[0]
-                    probability = random.uniform(0.5, 0.8)
+                    probability = rng.uniform(0.5, 0.8)
                 else:
                     # Future close dates
-                    status = random.choices(
+                    status = rng.choices(
                         ["Draft", "Active"],
                         weights=[30, 70]
                     )[0]
-                    probability = random.uniform(0.3, 0.6)
-
-                cur.execute("""
-                    INSERT INTO sales_insights.sales_quotations
-                    (quotation_id, quotation_date, customer_id, product_category,
-                     quoted_amount, currency, status, salesperson_id, expected_close_date,
-                     estimated_margin, probability)
-                    VALUES (%s, %s, %s, %s, %s, 'MYR', %s::quotation_status_enum,
-                            %s, %s, %s, %s)
-                """, (
-                    quotation_id, current_date.date(), customer_id, category,
-                    float(quoted_amount), status, salesperson_id, expected_close.date(),
+                    probability = rng.uniform(0.3, 0.6)
+
+                yield (
+                    quotation_id, date.date(), customer_id, category,
+                    float(quoted_amount), "MYR", status, salesperson_id, expected_close.date(),
                     float(estimated_margin), probability
-                ))
+                )
+
+        date += timedelta(days=1)
+
+
+def insert_quotation_days(cur, first_day, last_day, customers, products_by_category, salespeople, rng,
+                          target="sales_insights.sales_quotations", scale=1):
+    """Row-by-row INSERT of the quotations for each day in a window; returns the row count"""
+    count = 0
+    for row in quotation_rows(first_day, last_day, customers, products_by_category, salespeople, rng, scale):
+        cur.execute(f"""
+            INSERT INTO {target} ({", ".join(QUOTATION_COLUMNS)})
+            VALUES (%s, %s, %s, %s, %s, %s, %s::quotation_status_enum, %s, %s, %s, %s)
+        """, row)
+        count += 1
+    return count
+
+
+# Month-sharded tables:
+# (date column, COPY columns, numpy batch generator, row generator, row-by-row inserter)
+SHARDED_TABLES = {
+    "sales_orders": ("order_date", ORDER_COLUMNS, generate_order_batches, order_rows, insert_order_days),
+    "sales_quotations": ("quotation_date", QUOTATION_COLUMNS, generate_quotation_batches, quotation_rows,
+                         insert_quotation_days),
+}
 
-                total_quotes += 1
 
-        if current_date.day == 1:
-            print(f"  {current_date.strftime('%Y-%m')}: generating...")
+def generate_orders(conn, start_date, end_date, customers, products, salespeople, engine="python",
+                    resume=False, workers=1, seed=0, sink=None, scale=1):
+    """Generate sales orders for date range, one committed month at a time"""
+    if engine == "numpy":
+        _require_numpy()
+    print(f"Generating orders from {start_date.date()} to {end_date.date()} ({engine})...")
+    total_orders = seed_by_month(conn, "sales_orders", start_date, end_date,
+                                 (customers, products, salespeople), engine=engine, seed=seed,
+                                 resume=resume, workers=workers, sink=sink, scale=scale)
+    print(f"Generated {total_orders} orders")
+    return total_orders
 
-        current_date += timedelta(days=1)
 
-    conn.commit()
+def generate_quotations(conn, start_date, end_date, customers, products, salespeople, engine="python",
+                        resume=False, workers=1, seed=0, sink=None, scale=1):
+    """Generate quotations for date range, one committed month at a time"""
+    if engine == "numpy":
+        _require_numpy()
+    print(f"Generating quotations from {start_date.date()} to {end_date.date()} ({engine})...")
+    total_quotes = seed_by_month(conn, "sales_quotations", start_date, end_date,
+                                 (customers, products, salespeople), engine=engine, seed=seed,
+                                 resume=resume, workers=workers, sink=sink, scale=scale)
     print(f"Generated {total_quotes} quotations")
-    cur.close()
     return total_quotes
 
 
-def generate_targets(conn, start_date, end_date, salespeople):
-    """Generate monthly sales targets"""
-    cur = conn.cursor()
-
-    print("Generating sales targets...")
-
-    # Clear existing targets in range
-    cur.execute("""
-        DELETE FROM sales_insights.sales_targets
-        WHERE target_date >= %s AND target_date <= %s
-    """, (start_date.date(), end_date.date()))
-
+def target_rows(start_date, end_date, salespeople, rng=random, scale=1):
+    """Yield monthly company, category and salesperson targets as TARGET_COLUMNS tuples"""
     # Base monthly company target
     BASE_MONTHLY_TARGET = 400000  # MYR
 
@@ -369,34 +908,22 @@ def generate_targets(conn, start_date, end_date, salespeople):
         seasonal = SEASONAL_MULTIPLIERS.get(current_date.month, 1.0)
         yoy = YOY_GROWTH.get(current_date.year, 1.0)
 
-        monthly_target = BASE_MONTHLY_TARGET * seasonal * yoy
+        monthly_target = BASE_MONTHLY_TARGET * seasonal * yoy * scale
 
         # Company-wide target
-        cur.execute("""
-            INSERT INTO sales_insights.sales_targets
-            (target_date, granularity, entity_id, target_amount)
-            VALUES (%s, 'company', 'ALL', %s)
-        """, (current_date.date(), monthly_target))
+        yield (current_date.date(), "company", "ALL", monthly_target)
 
         # Category targets (proportional)
         for category, weight in CATEGORIES:
             cat_target = monthly_target * (weight / sum(w for _, w in CATEGORIES))
-            cur.execute("""
-                INSERT INTO sales_insights.sales_targets
-                (target_date, granularity, entity_id, target_amount)
-                VALUES (%s, 'category', %s, %s)
-            """, (current_date.date(), category, cat_target))
+            yield (current_date.date(), "category", category, cat_target)
 
         # Salesperson targets
         sp_target = monthly_target / len(salespeople)
         for sp_id in salespeople:
             # Add some variation per salesperson
-            individual_target = sp_target * random.uniform(0.8, 1.2)
-            cur.execute("""
-                INSERT INTO sales_insights.sales_targets
-                (target_date, granularity, entity_id, target_amount)
-                VALUES (%s, 'salesperson', %s, %s)
-            """, (current_date.date(), sp_id, individual_target))
+            individual_target = sp_target * rng.uniform(0.8, 1.2)
+            yield (current_date.date(), "salesperson", sp_id, individual_target)
 
         # Move to next month
         if current_date.month == 12:
@@ -404,21 +931,28 @@ def generate_targets(conn, start_date, end_date, salespeople):
         else:
             current_date = current_date.replace(month=current_date.month + 1)
 
-    conn.commit()
-    print("Generated sales targets")
-    cur.close()
-
 
-def generate_inventory_snapshots(conn, products):
-    """Generate weekly inventory snapshots"""
-    cur = conn.cursor()
-
-    print("Generating inventory snapshots...")
+def generate_targets(conn, start_date, end_date, salespeople, sink=None, seed=0, scale=1):
+    """Generate monthly sales targets, replacing those in range (or writing them to ``sink``)"""
+    print("Generating sales targets...")
+    rows = target_rows(start_date, end_date, salespeople, random.Random(f"{seed}:sales_targets"), scale)
+    if sink is not None:
+        count = sink.write("sales_targets", TARGET_COLUMNS, rows, partition="all")
+    else:
+        with conn.cursor() as cur:
+            # Clear existing targets in range
+            cur.execute("""
+                DELETE FROM sales_insights.sales_targets
+                WHERE target_date >= %s AND target_date <= %s
+            """, (start_date.date(), end_date.date()))
+            count = copy_rows(cur, "sales_insights.sales_targets", TARGET_COLUMNS, rows)
+        conn.commit()
+    print(f"Generated {count} sales targets")
+    return count
 
-    # Clear existing snapshots
-    cur.execute("DELETE FROM sales_insights.inventory_snapshots")
 
-    # Generate weekly snapshots for last 12 weeks
+def inventory_rows(products, rng=random):
+    """Yield weekly inventory snapshots for the last 12 weeks as INVENTORY_COLUMNS tuples"""
     for weeks_ago in range(12, -1, -1):
         snapshot_date = datetime.now() - timedelta(weeks=weeks_ago)
         snapshot_date = snapshot_date.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -427,97 +961,187 @@ def generate_inventory_snapshots(conn, products):
             product_id = product[0]
 
             # Random stock levels
-            stock_on_hand = random.randint(50, 500)
-            reserved_units = random.randint(0, min(50, stock_on_hand))
-            inbound_units = random.randint(0, 100) if random.random() > 0.7 else 0
+            stock_on_hand = rng.randint(50, 500)
+            reserved_units = rng.randint(0, min(50, stock_on_hand))
+            inbound_units = rng.randint(0, 100) if rng.random() > 0.7 else 0
 
-            cur.execute("""
-                INSERT INTO sales_insights.inventory_snapshots
-                (snapshot_date, product_id, stock_on_hand, reserved_units, inbound_units)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (snapshot_date, product_id) DO UPDATE
-                SET stock_on_hand = EXCLUDED.stock_on_hand,
-                    reserved_units = EXCLUDED.reserved_units,
-                    inbound_units = EXCLUDED.inbound_units
-            """, (snapshot_date.date(), product_id, stock_on_hand, reserved_units, inbound_units))
+            yield (snapshot_date.date(), product_id, stock_on_hand, reserved_units, inbound_units)
 
-    conn.commit()
-    print("Generated inventory snapshots")
-    cur.close()
-
-
-def generate_forecasts(conn):
-    """Generate sales forecasts"""
-    cur = conn.cursor()
-
-    print("Generating sales forecasts...")
-
-    # Clear existing forecasts
-    cur.execute("DELETE FROM sales_insights.sales_forecasts")
 
+def generate_inventory_snapshots(conn, products, sink=None, seed=0):
+    """Generate weekly inventory snapshots, replacing all existing ones (or writing them to ``sink``)"""
+    print("Generating inventory snapshots...")
+    rows = inventory_rows(products, random.Random(f"{seed}:inventory_snapshots"))
+    if sink is not None:
+        count = sink.write("inventory_snapshots", INVENTORY_COLUMNS, rows, partition="all")
+    else:
+        with conn.cursor() as cur:
+            # Clear existing snapshots
+            cur.execute("DELETE FROM sales_insights.inventory_snapshots")
+            count = copy_rows(cur, "sales_insights.inventory_snapshots", INVENTORY_COLUMNS, rows)
+        conn.commit()
+    print(f"Generated {count} inventory snapshots")
+    return count
+
+
+def forecast_rows(rng=random, scale=1):
+    """Yield today's forecast per category and horizon as FORECAST_COLUMNS tuples"""
     horizons = ["Current Month", "Next Month", "60-90 Day Outlook"]
+    today = datetime.now().date()
 
     for category, weight in CATEGORIES:
-        base_revenue = 50000 * weight
+        base_revenue = 50000 * weight * scale
         base_margin = base_revenue * 0.35
 
         for i, horizon in enumerate(horizons):
             # Forecasts decrease in certainty with time
             multiplier = 1.0 + (i * 0.1)
-            variation = random.uniform(0.9, 1.1)
+            variation = rng.uniform(0.9, 1.1)
 
-            cur.execute("""
-                INSERT INTO sales_insights.sales_forecasts
-                (forecast_date, horizon, product_category, predicted_revenue, predicted_margin)
-                VALUES (CURRENT_DATE, %s, %s, %s, %s)
-            """, (
-                horizon, category,
-                base_revenue * multiplier * variation,
-                base_margin * multiplier * variation
-            ))
+            yield (today, horizon, category,
+                   base_revenue * multiplier * variation,
+                   base_margin * multiplier * variation)
 
-    conn.commit()
-    print("Generated sales forecasts")
-    cur.close()
+
+def generate_forecasts(conn, sink=None, seed=0, scale=1):
+    """Generate sales forecasts, replacing all existing ones (or writing them to ``sink``)"""
+    print("Generating sales forecasts...")
+    rows = forecast_rows(random.Random(f"{seed}:sales_forecasts"), scale)
+    if sink is not None:
+        count = sink.write("sales_forecasts", FORECAST_COLUMNS, rows, partition="all")
+    else:
+        with conn.cursor() as cur:
+            # Clear existing forecasts
+            cur.execute("DELETE FROM sales_insights.sales_forecasts")
+            count = copy_rows(cur, "sales_insights.sales_forecasts", FORECAST_COLUMNS, rows)
+        conn.commit()
+    print(f"Generated {count} sales forecasts")
+    return count
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Seed 2+ years of sales data into sales_insights")
+    parser.add_argument("--engine", choices=["python", "numpy"], default="python",
+                        help="Transaction generator: row-by-row Python or vectorized NumPy with COPY")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the last checkpoint instead of reseeding every month "
+                             "(needs the --seed of the interrupted run)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes generating and loading months in parallel")
+    parser.add_argument("--seed", type=int,
+                        help="RNG seed; the same seed reproduces identical data for any --workers")
+    parser.add_argument("--scale-factor", type=int, choices=SCALE_FACTORS, default=1,
+                        help="Multiply customers, products, salespeople and daily volume (benchmark datasets)")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write per-stage timings to a .json or .csv run report")
+    parser.add_argument("--progress", action="store_true",
+                        help="Show a live progress line with ETA for long stages")
+    parser.add_argument("--sink", choices=sinks.SINK_KINDS, default="postgres",
+                        help="Seed the database, or write Parquet / gzip CSV files under --output "
+                             "(master data is still read from the database)")
+    parser.add_argument("--output", metavar="DIR",
+                        help="Dataset directory for --sink parquet/csv (load it later with import_dataset.py)")
+    args = parser.parse_args()
+    if args.sink != "postgres" and not args.output:
+        parser.error(f"--sink {args.sink} needs --output DIR")
+    # A fresh seed would generate the remaining months from a different RNG stream
+    if args.resume and args.seed is None:
+        parser.error("--resume needs the --seed printed by the interrupted run")
+    # The database path keeps its own transactional month swaps; only files go through a sink
+    sink = sinks.open_sink(args.sink, args.output) if args.sink != "postgres" else None
+    metrics = etl_metrics.start_run("seed_extended_data", progress=args.progress)
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 31)
+
     print("="*60)
     print("EPB Extended Data Seeding")
     print(f"Date Range: {START_DATE.date()} to {END_DATE.date()}")
+    print(f"Seed: {seed} (pass --seed {seed} to reproduce)")
+    print(f"Scale factor: {args.scale_factor}")
     print("="*60)
 
     conn = get_connection()
 
     try:
         # Get existing master data
-        customers, products, salespeople = get_existing_data(conn)
+        with stage("extract_master_data"):
+            customers, products, salespeople = get_existing_data(conn)
         print(f"Found: {len(customers)} customers, {len(products)} products, {len(salespeople)} salespeople")
 
-        # Generate orders
-        order_count = generate_orders(conn, START_DATE, END_DATE, customers, products, salespeople)
-
-        # Generate quotations
-        quote_count = generate_quotations(conn, START_DATE, END_DATE, customers, products, salespeople)
-
-        # Generate targets
-        generate_targets(conn, START_DATE, END_DATE, salespeople)
-
-        # Generate inventory snapshots
-        generate_inventory_snapshots(conn, products)
-
-        # Generate forecasts
-        generate_forecasts(conn)
+        # Seed with primary keys only; secondary indexes are rebuilt at the end
+        if sink is None:
+            with stage("drop_indexes"):
+                maintenance.drop_secondary_indexes(conn)
+
+        try:
+            if args.scale_factor > 1:
+                with stage("scale_master_data"):
+                    print(f"Scaling master data x{args.scale_factor}...")
+                    customers, products, salespeople = scale_master_data(conn, args.scale_factor, sink=sink)
+
+            # Generate orders
+            with stage("generate_orders") as st:
+                order_count = generate_orders(conn, START_DATE, END_DATE, customers, products, salespeople,
+                                              engine=args.engine, resume=args.resume,
+                                              workers=args.workers, seed=seed, sink=sink,
+                                              scale=args.scale_factor)
+                st.add_rows(order_count)
+
+            # Generate quotations
+            with stage("generate_quotations") as st:
+                quote_count = generate_quotations(conn, START_DATE, END_DATE, customers, products, salespeople,
+                                                  engine=args.engine, resume=args.resume,
+                                                  workers=args.workers, seed=seed, sink=sink,
+                                                  scale=args.scale_factor)
+                st.add_rows(quote_count)
+
+            # Generate targets
+            with stage("generate_targets") as st:
+                st.add_rows(generate_targets(conn, START_DATE, END_DATE, salespeople, sink=sink, seed=seed,
+                                             scale=args.scale_factor))
+
+            # Generate inventory snapshots
+            with stage("generate_inventory_snapshots") as st:
+                st.add_rows(generate_inventory_snapshots(conn, products, sink=sink, seed=seed))
+
+            # Generate forecasts
+            with stage("generate_forecasts") as st:
+                st.add_rows(generate_forecasts(conn, sink=sink, seed=seed, scale=args.scale_factor))
+
+            # Every transaction now references the current replicas only
+            if sink is None:
+                with stage("drop_stale_replicas"):
+                    drop_stale_replicas(conn, args.scale_factor)
+        finally:
+            # Rebuilt even when seeding fails (a --resume run may never get this far),
+            # CONCURRENTLY so the dashboards keep answering meanwhile
+            if sink is None:
+                if not conn.closed:
+                    conn.rollback()  # an open transaction would stall CREATE INDEX CONCURRENTLY
+                with stage("build_indexes"):
+                    maintenance.build_secondary_indexes(db_pool.get_pool(DB_CONFIG))
+
+        if sink is None:
+            with stage("analyze"):
+                maintenance.analyze_tables(conn, tables=SEEDED_TABLES + list(SCALED_TABLES))
+            with stage("refresh_views"):
+                materialized_views.refresh(conn)
 
         print("\n" + "="*60)
         print("Summary:")
         print(f"  Orders generated: {order_count:,}")
         print(f"  Quotations generated: {quote_count:,}")
         print(f"  Date range: {START_DATE.date()} to {END_DATE.date()}")
+        print(f"  Scale factor: {args.scale_factor} (seed {seed})")
+        if sink is not None:
+            print(f"  Written to: {args.output} ({args.sink})")
         print("="*60)
 
     finally:
         conn.close()
+        db_pool.close_all()
+        metrics.print_summary()
+        if args.report:
+            metrics.write_report(args.report)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,264 @@
+"""
+Output sinks for generated datasets: Postgres, partitioned Parquet or gzip CSV.
+
+Usage:
+    sink = sinks.open_sink("parquet", "out/run1")     # or "csv", or PostgresSink(pool)
+    sink.write("sales_orders", ORDER_COLUMNS, rows, partition="2025-06")
+    sink.write_columns("sales_orders", ORDER_COLUMNS, batches, partition="2025-06")
+
+    # Later, into any database:
+    sinks.import_dataset(pool, "out/run1", schema="sales_insights")
+
+File sinks lay a dataset out as ``<root>/<table>/<partition>.parquet`` (or
+``.csv.gz``). Writing a partition again replaces it. Without a partition,
+each call writes a new numbered part file. The layout reads directly in
+DuckDB, e.g. ``SELECT * FROM 'out/run1/sales_orders/*.parquet'``.
+
+Generation can therefore be timed without any database writes. The same
+dataset can then be bulk-imported with COPY into as many databases as
+needed.
+"""
+
+import csv
+import gzip
+import itertools
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for the parquet sink
+    pa = pc = pq = None
+
+import db_pool
+from bulk_load import copy_rows
+from etl_metrics import stage
+
+SCHEMA = "sales_insights"
+
+SINK_KINDS = ("postgres", "parquet", "csv")
+PARQUET_COMPRESSION = "zstd"
+IMPORT_WORKERS = 4
+
+# Import order: master data before the transactions that reference it
+IMPORT_ORDER = [
+    "salespeople", "customers", "product_catalog",
+    "sales_orders", "sales_quotations", "sales_targets", "inventory_snapshots", "sales_forecasts",
+]
+
+# Monthly range-partitioned tables and their partition key
+PARTITION_KEYS = {"sales_orders": "order_date", "sales_quotations": "quotation_date"}
+
+
+class PostgresSink:
+    """COPY rows straight into ``schema``, each chunk committed on its own pooled connection"""
+
+    kind = "postgres"
+
+    def __init__(self, pool, schema=SCHEMA, chunk_size=db_pool.CHUNK_SIZE):
+        self.pool = pool
+        self.schema = schema
+        self.chunk_size = chunk_size
+
+    def write(self, table, columns, rows, partition=None):
+        def copy(conn, chunk):
+            with conn.cursor() as cur:
+                return copy_rows(cur, f"{self.schema}.{table}", columns, chunk)
+
+        return db_pool.write_chunks(self.pool, db_pool.chunked(rows, self.chunk_size), copy)
+
+    def write_columns(self, table, columns, batches, partition=None):
+        return sum(self.write(table, columns, zip(*(batch[col] for col in columns))) for batch in batches)
+
+
+class _FileSink:
+    """Shared layout and part numbering of the file sinks; safe to use from threads"""
+
+    extension = None
+
+    def __init__(self, root):
+        self.root = root
+        self._parts = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def path(self, table, partition=None):
+        if partition is None:
+            with self._lock:
+                partition = f"part-{os.getpid()}-{next(self._parts):05d}"
+        directory = os.path.join(self.root, table)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{partition}{self.extension}")
+
+    def _replace(self, path, write):
+        """Write to a temporary file and rename it, so readers never see a partial partition"""
+        tmp = f"{path}.tmp"
+        count = write(tmp)
+        os.replace(tmp, path)
+        return count
+
+    def write_columns(self, table, columns, batches, partition=None):
+        rows = (row for batch in batches for row in zip(*(batch[col] for col in columns)))
+        return self.write(table, columns, rows, partition)
+
+
+class CsvSink(_FileSink):
+    """gzip-compressed CSV with a header row; empty fields are NULL"""
+
+    kind = "csv"
+    extension = ".csv.gz"
+
+    def write(self, table, columns, rows, partition=None):
+        def write(path):
+            count = 0
+            with gzip.open(path, "wt", newline="", compresslevel=6) as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+            return count
+
+        return self._replace(self.path(table, partition), write)
+
+
+class ParquetSink(_FileSink):
+    """Parquet via pyarrow, one row group per chunk of rows"""
+
+    kind = "parquet"
+    extension = ".parquet"
+
+    def __init__(self, root, chunk_size=db_pool.CHUNK_SIZE * 10):
+        if pa is None:
+            raise RuntimeError("--sink parquet needs the pyarrow package (pip install pyarrow)")
+        super().__init__(root)
+        self.chunk_size = chunk_size
+
+    def _write_tables(self, path, tables):
+        count = 0
+        writer = None
+        try:
+            for table in tables:
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression=PARQUET_COMPRESSION)
+                writer.write_table(table.cast(writer.schema))
+                count += table.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return count
+
+    def write(self, table, columns, rows, partition=None):
+        tables = (pa.table({col: list(values) for col, values in zip(columns, zip(*chunk))})
+                  for chunk in db_pool.chunked(rows, self.chunk_size))
+        return self._replace(self.path(table, partition), partial(self._write_tables, tables=tables))
+
+    def write_columns(self, table, columns, batches, partition=None):
+        tables = (pa.table({col: batch[col] for col in columns}) for batch in batches)
+        return self._replace(self.path(table, partition), partial(self._write_tables, tables=tables))
+
+
+def open_sink(kind, root=None, pool=None, schema=SCHEMA):
+    """Sink of the given kind; ``root`` is the output directory of the file sinks"""
+    if kind == "postgres":
+        return PostgresSink(pool, schema)
+    if not root:
+        raise ValueError(f"--sink {kind} needs --output DIR")
+    return {"parquet": ParquetSink, "csv": CsvSink}[kind](root)
+
+
+def written_partitions(root, table):
+    """Names of the partitions of ``table`` already written under ``root``"""
+    directory = os.path.join(root, table)
+    if not os.path.isdir(directory):
+        return set()
+    return {name.split(".", 1)[0] for name in os.listdir(directory)
+            if name.endswith((ParquetSink.extension, CsvSink.extension))}
+
+
+def clear(root, table):
+    """Remove every file written for ``table`` under ``root``"""
+    shutil.rmtree(os.path.join(root, table), ignore_errors=True)
+
+
+def dataset_files(root):
+    """(table, [files]) of a dataset directory, in IMPORT_ORDER"""
+    found = []
+    for table in IMPORT_ORDER:
+        directory = os.path.join(root, table)
+        if os.path.isdir(directory):
+            files = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                           if name.endswith((ParquetSink.extension, CsvSink.extension)))
+            if files:
+                found.append((table, files))
+    return found
+
+
+def _date_range(path, column):
+    """(min, max) of a date column in one dataset file"""
+    if path.endswith(ParquetSink.extension):
+        values = pq.read_table(path, columns=[column]).column(column)
+        bounds = pc.min_max(values)
+        return bounds["min"].as_py(), bounds["max"].as_py()
+    with gzip.open(path, "rt", newline="") as f:
+        reader = csv.reader(f)
+        index = next(reader).index(column)
+        dates = [row[index] for row in reader]
+    return (min(dates), max(dates)) if dates else (None, None)
+
+
+def _import_file(conn, table, path, schema):
+    """COPY one dataset file into ``schema``.``table`` on ``conn``; returns the row count"""
+    with conn.cursor() as cur:
+        if path.endswith(ParquetSink.extension):
+            count = 0
+            parquet = pq.ParquetFile(path)
+            for batch in parquet.iter_batches(batch_size=db_pool.CHUNK_SIZE * 10):
+                count += copy_rows(cur, f"{schema}.{table}", batch.schema.names,
+                                   zip(*(column.to_pylist() for column in batch.columns)))
+            return count
+        with gzip.open(path, "rt", newline="") as f:
+            columns = next(csv.reader([f.readline()]))
+            cur.copy_expert(f"COPY {schema}.{table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", f)
+            return cur.rowcount
+
+
+def import_dataset(pool, root, schema=SCHEMA, append=False, workers=IMPORT_WORKERS):
+    """Bulk load a dataset directory written by a file sink; returns rows per table.
+
+    Unless ``append`` is set, the imported tables are truncated first.
+    Monthly partitions are created for the dates in the files. Each file
+    is then loaded with COPY and committed on its own, with files of the
+    same table loaded in parallel.
+    """
+    found = dataset_files(root)
+    if not found:
+        raise ValueError(f"No dataset files under {root}")
+
+    with db_pool.pooled(pool) as conn:
+        with conn.cursor() as cur:
+            if not append:
+                cur.execute(f"TRUNCATE {', '.join(f'{schema}.{table}' for table, _ in found)}")
+            for table, files in found:
+                if table in PARTITION_KEYS:
+                    for low, high in (_date_range(path, PARTITION_KEYS[table]) for path in files):
+                        if low is not None:
+                            cur.execute(f"SELECT {schema}.ensure_month_partitions(%s::regclass, %s, %s)",
+                                        (f"{schema}.{table}", low, high))
+        conn.commit()
+
+    totals = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for table, files in found:
+            with stage(f"import_{table}") as st:
+                futures = [executor.submit(db_pool.write_chunks, pool, [path],
+                                           lambda conn, path, table=table: _import_file(conn, table, path, schema))
+                           for path in files]
+                totals[table] = sum(future.result() for future in as_completed(futures))
+                st.add_rows(totals[table])
+            print(f"Imported {totals[table]:,} {table} rows from {len(files)} files")
+    return totals
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Sync a declarative dashboard definition (metabase/dashboards/<name>/) to Metabase.
+
+Usage:
+    python sync_metabase_dashboards.py --email admin@example.com --plan   # show what would change
+    python sync_metabase_dashboards.py --email admin@example.com          # apply it
+    python sync_metabase_dashboards.py --email admin@example.com --dashboard ../metabase/dashboards/sales-insights
+    python sync_metabase_dashboards.py --email admin@example.com --warm   # also warm caches when unchanged
+    python sync_metabase_dashboards.py --email admin@example.com --skip-views   # no database access
+
+dashboard.json declares the dashboard, its parameters and tabs. Each card
+in a tab is a ``ref`` ("file.json#slug") into a card file in the same
+directory, plus its layout. The live dashboard is fetched in one call,
+because it embeds every card it shows. A content hash of each card (name,
+description, display, SQL, visualization settings) is then compared with
+its declaration. Only cards that differ are created, updated or archived,
+and the dashboard is PUT only when its parameters, tabs or layout changed.
+With nothing to change, a deploy costs two reads after login.
+
+Cards are matched by name, so renaming a card in its file replaces it.
+A card with a ``materialize`` block reads from a sales_insights.mv_* view.
+That view is created, or rebuilt when its definition changed, before any
+card is touched (see materialized_views.py). Checking the views needs the
+database. When it cannot be reached, --plan still runs and reports the views
+as unknown. --skip-views leaves them out of a deploy altogether.
+After a deploy, or with --warm, every card is run once to warm the caches.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from create_metabase_dashboard import CARD_WORKERS, METABASE_URL, MetabaseAPI, ensure_card_views
+
+DEFINITIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "..", "metabase", "dashboards", "sales-insights")
+
+# Card fields compared by the content hash
+CARD_FIELDS = ("name", "description", "display", "query", "visualization_settings")
+
+
+def content_hash(value):
+    """Short stable hash of a JSON-serializable value"""
+    return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def visualization(card):
+    """(display, visualization_settings) for a card file entry.
+
+    The card files use a small ``display`` vocabulary of their own; known
+    keys are translated and anything else is passed through as a
+    Metabase setting.
+    """
+    display = card["visualization"]
+    settings = {}
+    for key, value in (card.get("display") or {}).items():
+        if key == "orientation":
+            if value == "horizontal" and display == "bar":
+                display = "row"
+        elif key == "color":
+            settings["graph.colors"] = [value]
+        elif key == "series_colors":
+            settings["series_settings"] = {series: {"color": color} for series, color in value.items()}
+        else:
+            settings[key] = value
+    return display, settings
+
+
+def load_definition(directory):
+    """(dashboard.json, declared cards in layout order, unresolved refs) of a definition directory"""
+    with open(os.path.join(directory, "dashboard.json")) as f:
+        dashboard = json.load(f)
+
+    files = {}
+    cards, unresolved = [], []
+    for tab in dashboard.get("tabs", []):
+        for entry in tab["cards"]:
+            filename, _, slug = entry["ref"].partition("#")
+            if filename not in files:
+                path = os.path.join(directory, filename)
+                if os.path.exists(path):
+                    with open(path) as f:
+                        files[filename] = {card["slug"]: card for card in json.load(f)["cards"]}
+                else:
+                    files[filename] = {}
+            card = files[filename].get(slug)
+            if card is None:
+                unresolved.append(entry["ref"])
+                continue
+            display, settings = visualization(card)
+            cards.append({
+                "key": entry["ref"],
+                "name": card["name"],
+                "description": card.get("description") or None,
+                "display": display,
+                "query": card["dataset_query"]["native"]["query"],
+                "visualization_settings": settings,
+                "materialize": card.get("materialize"),
+                "tab": tab["name"],
+                "layout": entry["layout"],
+            })
+    return dashboard, cards, unresolved
+
+
+def card_state(card):
+    """The CARD_FIELDS of a declared card or of a card returned by the API"""
+    if "dataset_query" in card:
+        query = (card["dataset_query"].get("native") or {}).get("query")
+        card = {**card, "query": query, "description": card.get("description") or None}
+    return {field: card.get(field) for field in CARD_FIELDS}
+
+
+def dashboard_state(name, description, parameters, tabs, layout):
+    """Hashable shape of a dashboard: everything the definition controls besides card content"""
+    return {
+        "name": name,
+        "description": description or None,
+        "parameters": [{key: p.get(key) for key in ("name", "slug", "type", "default")} for p in parameters],
+        "tabs": list(tabs),
+        "layout": sorted(layout),
+    }
+
+
+def declared_state(dashboard, cards):
+    layout = [(card["name"], card["tab"], card["layout"]["row"], card["layout"]["col"],
+               card["layout"]["size_x"], card["layout"]["size_y"]) for card in cards]
+    return dashboard_state(dashboard["name"], dashboard.get("description"), dashboard.get("parameters", []),
+                           [tab["name"] for tab in dashboard.get("tabs", [])], layout)
+
+
+def live_state(live):
+    tab_names = {tab["id"]: tab["name"] for tab in live.get("tabs", [])}
+    layout = [(dc["card"]["name"], tab_names.get(dc.get("dashboard_tab_id")), dc["row"], dc["col"],
+               dc["size_x"], dc["size_y"]) for dc in live.get("dashcards", []) if dc.get("card_id")]
+    return dashboard_state(live["name"], live.get("description"), live.get("parameters", []),
+                           [tab["name"] for tab in sorted(live.get("tabs", []), key=lambda t: t["position"])],
+                           layout)
+
+
+def plan(dashboard, cards, unresolved, live):
+    """Changes needed to make ``live`` (None if it does not exist yet) match the definition"""
+    current = {}
+    if live is not None:
+        for dc in live.get("dashcards", []):
+            if dc.get("card_id"):
+                current[dc["card"]["name"]] = dc["card"]
+
+    changes = {"create": [], "update": [], "unchanged": [], "archive": [], "kept": []}
+    for card in cards:
+        existing = current.get(card["name"])
+        if existing is None:
+            changes["create"].append(card)
+        elif content_hash(card_state(card)) != content_hash(card_state(existing)):
+            changed = [f for f in CARD_FIELDS if card_state(card)[f] != card_state(existing)[f]]
+            changes["update"].append((card, existing, changed))
+        else:
+            changes["unchanged"].append((card, existing))
+
+    declared = {card["name"] for card in cards}
+    for name, card in current.items():
+        if name not in declared:
+            # A card from an unreadable ref cannot be told apart from a removed one
+            changes["kept" if unresolved else "archive"].append(card)
+
+    changes["dashboard"] = live is None or (
+        content_hash(declared_state(dashboard, cards)) != content_hash(live_state(live)))
+    return changes
+
+
+def check_views(cards, dsn=None, plan_only=False, skip=False):
+    """{view: action} of the cards' materialized views, without changing them.
+
+    With ``skip`` the database is not contacted and no views are reported.
+    A database that cannot be reached is only tolerated for a plan, whose
+    views are then reported as "unknown".
+    """
+    if skip:
+        return {}
+    try:
+        return ensure_card_views(cards, dsn=dsn, dry_run=True)
+    except Exception as e:  # psycopg2 is imported lazily, so its errors cannot be named here
+        if not plan_only:
+            raise
+        print(f"  ! Could not check the card views: {str(e).strip()}")
+        return {card["materialize"]["view"]: "unknown" for card in cards if card.get("materialize")}
+
+
+def print_plan(dashboard, changes, unresolved, live, views):
+    target = f"dashboard {live['id']}" if live else "new dashboard"
+    print(f"\nPlan for \"{dashboard['name']}\" ({target}):")
+    for ref in unresolved:
+        print(f"  ! unresolved ref {ref} (skipped)")
+    for view, action in views.items():
+        if action == "unknown":
+            print(f"  ? view  {view} (not checked: database unreachable)")
+        elif action != "unchanged":
+            print(f"  {'+' if action == 'create' else '~'} view  {view}")
+    for card in changes["create"]:
+        print(f"  + card  {card['name']}")
+    for card, existing, changed in changes["update"]:
+        print(f"  ~ card  {card['name']} (ID: {existing['id']}; {', '.join(changed)})")
+    for card in changes["archive"]:
+        print(f"  - card  {card['name']} (ID: {card['id']})")
+    for card in changes["kept"]:
+        print(f"  ? card  {card['name']} (ID: {card['id']}) is no longer declared; "
+              f"kept while refs are unresolved")
+    if changes["dashboard"]:
+        print(f"  {'+' if live is None else '~'} dashboard layout, tabs and parameters")
+    print(f"  = {len(changes['unchanged'])} cards unchanged")
+
+
+def dashboard_payload(dashboard, cards, card_ids, live, keep):
+    """PUT body setting tabs, parameters and every dashcard; existing tab and dashcard IDs are reused"""
+    live = live or {}
+    live_tabs = {tab["name"]: tab["id"] for tab in live.get("tabs", [])}
+    tabs = [{"id": live_tabs.get(tab["name"], -(i + 1)), "name": tab["name"]}
+            for i, tab in enumerate(dashboard.get("tabs", []))]
+    tab_ids = {tab["name"]: tab["id"] for tab in tabs}
+
+    live_params = {p["slug"]: p["id"] for p in live.get("parameters", [])}
+    parameters = [{**p, "id": live_params.get(p["slug"], p["slug"])} for p in dashboard.get("parameters", [])]
+
+    live_dashcards = {dc["card_id"]: dc for dc in live.get("dashcards", []) if dc.get("card_id")}
+    dashcards = [dc for dc in live.get("dashcards", []) if not dc.get("card_id") or dc["card_id"] in keep]
+    new_id = -1
+    for card in cards:
+        card_id = card_ids.get(card["name"])
+        if not card_id:
+            continue
+        existing = live_dashcards.get(card_id)
+        if existing is None:
+            dashcard_id, new_id = new_id, new_id - 1
+        else:
+            dashcard_id = existing["id"]
+        dashcards.append({"id": dashcard_id, "card_id": card_id, "dashboard_tab_id": tab_ids.get(card["tab"]),
+                          **card["layout"]})
+    return {"name": dashboard["name"], "description": dashboard.get("description", ""),
+            "parameters": parameters, "tabs": tabs, "dashcards": dashcards}
+
+
+def apply(api, dashboard, cards, changes, live, workers=CARD_WORKERS, database="epb"):
+    """Issue the calls in ``changes``; returns the dashboard ID"""
+    if live is None:
+        collection_name = dashboard.get("collection", dashboard["name"])
+        collection_id = api.find_collection(collection_name) or api.create_collection(collection_name)
+        dashboard_id = api.create_dashboard(dashboard["name"], dashboard.get("description", ""), collection_id)
+        if not dashboard_id:
+            raise Exception("Failed to create dashboard")
+    else:
+        collection_id, dashboard_id = live.get("collection_id"), live["id"]
+
+    card_ids = {card["name"]: existing["id"] for card, existing in changes["unchanged"]}
+    card_ids.update({card["name"]: existing["id"] for card, existing, _ in changes["update"]})
+
+    if changes["create"]:
+        api.find_database(database)
+        created = api.create_cards([{**card, "key": card["name"]} for card in changes["create"]],
+                                   workers=workers, collection_id=collection_id)
+        card_ids.update(created)
+
+    def update(item):
+        card, existing, _ = item
+        return api.update_card(existing["id"], {
+            "name": card["name"],
+            "description": card["description"],
+            "display": card["display"],
+            "dataset_query": {**existing["dataset_query"], "type": "native",
+                              "native": {**(existing["dataset_query"].get("native") or {}),
+                                         "query": card["query"]}},
+            "visualization_settings": card["visualization_settings"],
+        })
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for card, _, changed in changes["update"]:
+            print(f"  ~ Updating card: {card['name']} ({', '.join(changed)})")
+        list(executor.map(update, changes["update"]))
+        for card in changes["archive"]:
+            print(f"  - Archiving card: {card['name']} (ID: {card['id']})")
+        list(executor.map(lambda card: api.update_card(card["id"], {"archived": True}), changes["archive"]))
+
+    if changes["dashboard"] or changes["create"] or changes["archive"]:
+        keep = {card["id"] for card in changes["kept"]}
+        if api.update_dashboard(dashboard_id, dashboard_payload(dashboard, cards, card_ids, live, keep)):
+            print(f"  ✓ Updated dashboard layout ({len(card_ids)} cards)")
+    return dashboard_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync a declarative dashboard definition to Metabase")
+    parser.add_argument("--email", required=True, help="Metabase admin email")
+    parser.add_argument("--password", help="Metabase admin password (or METABASE_PASSWORD env var)")
+    parser.add_argument("--url", default=METABASE_URL, help="Metabase base URL")
+    parser.add_argument("--dashboard", default=DEFINITIONS_DIR, help="Definition directory with dashboard.json")
+    parser.add_argument("--database", default="epb", help="Database (partial name) for newly created cards")
+    parser.add_argument("--dsn", help="libpq connection string for the card views "
+                                      "(default: DB_CONFIG of seed_extended_data.py)")
+    parser.add_argument("--plan", action="store_true", help="Show the changes without applying them")
+    parser.add_argument("--workers", type=int, default=CARD_WORKERS, help="Card calls issued concurrently")
+    parser.add_argument("--skip-views", action="store_true",
+                        help="Do not check or deploy the cards' materialized views (no database access)")
+    parser.add_argument("--warm", action="store_true",
+                        help="Run every card to warm the caches even when nothing changed (e.g. after an ETL load)")
+    args = parser.parse_args()
+
+    password = args.password or os.environ.get("METABASE_PASSWORD")
+    if not password:
+        print("Error: Password required. Provide via --password or METABASE_PASSWORD env var")
+        sys.exit(1)
+
+    dashboard, cards, unresolved = load_definition(args.dashboard)
+    api = MetabaseAPI(args.url, pool_size=args.workers)
+    try:
+        api.authenticate(args.email, password)
+        login_calls = api.calls
+        dashboard_id = api.find_dashboard(dashboard["name"])
+        live = api.get_dashboard(dashboard_id) if dashboard_id else None
+
+        changes = plan(dashboard, cards, unresolved, live)
+        views = check_views(cards, dsn=args.dsn, plan_only=args.plan, skip=args.skip_views)
+        print_plan(dashboard, changes, unresolved, live, views)
+        views_pending = any(action in ("create", "rebuild") for action in views.values())
+        pending = (changes["create"] or changes["update"] or changes["archive"] or changes["dashboard"]
+                   or views_pending)
+        if args.plan or not pending:
+            print(f"\n{'Nothing to do' if not pending else 'Plan only, nothing applied'} "
+                  f"({api.calls - login_calls} API calls)")
+            if args.warm and not args.plan and dashboard_id:
+                api.warm_dashboard(dashboard_id, workers=args.workers)
+            return
+
+        if views_pending:
+            ensure_card_views(cards, dsn=args.dsn)
+        dashboard_id = apply(api, dashboard, cards, changes, live, workers=args.workers, database=args.database)
+        print(f"\n✓ Synced in {api.calls - login_calls} API calls: {args.url}/dashboard/{dashboard_id}")
+        api.warm_dashboard(dashboard_id, workers=args.workers)
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
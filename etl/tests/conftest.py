@@ -0,0 +1,106 @@
+"""
+Shared fixtures for the ETL tests.
+
+The scripts import their siblings by bare name, so the etl directory is put
+on sys.path here. No database is needed: tests either work on pure
+functions or talk to ``fake_postgres``, a minimal server speaking enough of
+the Postgres wire protocol for psycopg2 to connect and run COPY TO STDOUT.
+"""
+
+import os
+import socket
+import struct
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+class FakePostgres:
+    """Answers every simple query with an empty result, and COPY ... TO STDOUT with ``copy_data``"""
+
+    PARAMETERS = {
+        "server_version": "16.0",
+        "client_encoding": "UTF8",
+        "DateStyle": "ISO, MDY",
+        "integer_datetimes": "on",
+        "standard_conforming_strings": "on",
+    }
+
+    def __init__(self):
+        self.copy_data = b""
+        self.queries = []
+        self._socket = socket.create_server(("127.0.0.1", 0))
+        self.port = self._socket.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def dsn(self):
+        return f"host=127.0.0.1 port={self.port} user=test dbname=test sslmode=disable gssencmode=disable"
+
+    def close(self):
+        self._socket.close()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self._socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    @staticmethod
+    def _message(kind, payload=b""):
+        return kind + struct.pack("!i", len(payload) + 4) + payload
+
+    @staticmethod
+    def _read(client, size):
+        data = b""
+        while len(data) < size:
+            chunk = client.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError
+            data += chunk
+        return data
+
+    def _serve(self, client):
+        with client:
+            try:
+                length, = struct.unpack("!i", self._read(client, 4))
+                self._read(client, length - 4)  # protocol version and startup parameters
+                reply = self._message(b"R", struct.pack("!i", 0))
+                for name, value in self.PARAMETERS.items():
+                    reply += self._message(b"S", f"{name}\0{value}\0".encode())
+                reply += self._message(b"K", struct.pack("!ii", 1, 1)) + self._message(b"Z", b"I")
+                client.sendall(reply)
+
+                status = b"I"
+                while True:
+                    kind = self._read(client, 1)
+                    length, = struct.unpack("!i", self._read(client, 4))
+                    payload = self._read(client, length - 4)
+                    if kind == b"X":
+                        return
+                    query = payload.rstrip(b"\0").decode()
+                    self.queries.append(query)
+                    if query.upper().startswith("BEGIN"):
+                        status, reply = b"T", self._message(b"C", b"BEGIN\0")
+                    elif query.upper().startswith("COPY") and "TO STDOUT" in query.upper():
+                        reply = self._message(b"H", struct.pack("!bh", 0, 0))
+                        for line in self.copy_data.splitlines(keepends=True):
+                            reply += self._message(b"d", line)
+                        rows = max(0, len(self.copy_data.splitlines()) - 1)
+                        reply += self._message(b"c") + self._message(b"C", f"COPY {rows}\0".encode())
+                    else:
+                        reply = self._message(b"C", b"SELECT 0\0")
+                    client.sendall(reply + self._message(b"Z", status))
+            except ConnectionError:
+                return
+
+
+@pytest.fixture
+def fake_postgres():
+    server = FakePostgres()
+    yield server
+    server.close()
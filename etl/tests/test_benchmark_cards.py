@@ -0,0 +1,39 @@
+import benchmark_cards
+
+
+def test_percentile_uses_nearest_rank():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+    assert benchmark_cards.percentile(values, 50) == 3.0
+    assert benchmark_cards.percentile(values, 95) == 5.0
+    assert benchmark_cards.percentile(values, 0) == 1.0
+    assert benchmark_cards.percentile([7.5], 95) == 7.5
+    assert benchmark_cards.percentile(list(range(1, 101)), 95) == 95
+
+
+PLAN = {
+    "Node Type": "Limit", "Actual Rows": 10, "Actual Loops": 1, "Actual Total Time": 4.2,
+    "Plans": [{
+        "Node Type": "Sort", "Actual Rows": 10, "Actual Loops": 1,
+        "Plans": [{"Node Type": "Seq Scan", "Relation Name": "mv_top_customers_revenue",
+                   "Actual Rows": 250, "Actual Loops": 1, "Shared Hit Blocks": 3, "Shared Read Blocks": 1}],
+    }],
+}
+
+
+def test_plan_nodes_flatten_depth_first():
+    nodes = benchmark_cards.plan_nodes(PLAN)
+    assert [(n["depth"], n["node"], n["relation"]) for n in nodes] == [
+        (0, "Limit", None), (1, "Sort", None), (2, "Seq Scan", "mv_top_customers_revenue")]
+    assert nodes[2]["shared_hit"] == 3 and nodes[2]["shared_read"] == 1
+
+
+def test_plan_shape_ignores_row_counts_and_timings():
+    nodes = benchmark_cards.plan_nodes(PLAN)
+    assert benchmark_cards.plan_shape(nodes) == "Limit > Sort > Seq Scan(mv_top_customers_revenue)"
+
+    for node in nodes:
+        node.update(actual_rows=node["actual_rows"] * 100, actual_ms=123.0)
+    assert benchmark_cards.plan_shape(nodes) == "Limit > Sort > Seq Scan(mv_top_customers_revenue)"
+
+    nodes[2].update(node="Index Scan", index="mv_top_customers_revenue_key", relation=None)
+    assert benchmark_cards.plan_shape(nodes) == "Limit > Sort > Index Scan(mv_top_customers_revenue_key)"
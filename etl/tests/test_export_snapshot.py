@@ -0,0 +1,68 @@
+import psycopg2
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import etl_metrics
+import export_snapshot
+
+
+def test_export_relation_through_instrumented_cursor(fake_postgres, tmp_path):
+    fake_postgres.copy_data = (b"order_id,order_date,revenue_amount,is_quoted,note\n"
+                               b"SO-1,2025-06-01,10.50,t,\"comma, inside\"\n"
+                               b"SO-2,2025-06-02,,f,\n")
+    columns = [("order_id", pa.string()), ("order_date", pa.date32()),
+               ("revenue_amount", pa.decimal128(14, 2)), ("is_quoted", pa.bool_()), ("note", pa.string())]
+    path = tmp_path / "sales_orders" / "month=2025-06" / "data.parquet"
+
+    run = etl_metrics.start_run("test")
+    conn = psycopg2.connect(fake_postgres.dsn(), connection_factory=etl_metrics.InstrumentedConnection)
+    try:
+        with conn.cursor() as cur, etl_metrics.stage("export"):
+            assert isinstance(cur, etl_metrics.InstrumentedCursor)
+            count = export_snapshot.export_relation(cur, "sales_insights.sales_orders", "", columns, str(path))
+    finally:
+        conn.close()
+
+    assert count == 2
+    table = pq.read_table(path)
+    assert table.schema == pa.schema(columns)
+    assert table.column("note").to_pylist() == ["comma, inside", None]
+    assert table.column("is_quoted").to_pylist() == [True, False]
+    assert table.column("revenue_amount").to_pylist()[1] is None
+    assert any("TO STDOUT" in query for query in fake_postgres.queries)
+    assert run.get_stage("export").round_trips == 1
+
+
+class FingerprintCursor:
+    """Serves a partitioned table whose monthly partitions hash to ``digests``"""
+
+    def __init__(self, digests):
+        self.digests = digests
+        self.queries = []
+
+    def execute(self, sql, params=None):
+        self.queries.append(sql)
+        self._last = sql
+
+    def fetchone(self):
+        if "relkind" in self._last:
+            return ("p",)
+        relname = self._last.split("FROM ")[1].split(".")[1].split()[0]
+        return self.digests[relname]
+
+    def fetchall(self):
+        return [(relname,) for relname in self.digests] + [("sales_orders_default",)]
+
+
+def test_partition_fingerprints_hash_rows_instead_of_stats():
+    cur = FingerprintCursor({"sales_orders_202506": (3, 42), "sales_orders_202507": (1, -7)})
+    months = export_snapshot.month_fingerprints(cur, "sales_insights", "sales_orders", "order_date")
+    assert months == {
+        "2025-06": ("3:42", "sales_insights.sales_orders_202506", ""),
+        "2025-07": ("1:-7", "sales_insights.sales_orders_202507", ""),
+    }
+    assert not any("pg_stat" in sql for sql in cur.queries)
+
+    cur.digests["sales_orders_202506"] = (3, 43)  # same row count, one row edited
+    changed = export_snapshot.month_fingerprints(cur, "sales_insights", "sales_orders", "order_date")
+    assert changed["2025-06"][0] != months["2025-06"][0]
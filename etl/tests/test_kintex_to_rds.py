@@ -0,0 +1,92 @@
+from datetime import date
+from decimal import Decimal
+
+import kintex_to_rds
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.queries = []
+
+    def cursor(self, name=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, query, params=None):
+        self.conn.queries.append((query, params))
+
+    def fetchmany(self, size):
+        rows, self.conn.rows = self.conn.rows[:size], self.conn.rows[size:]
+        return rows
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def getconn(self):
+        return self.conn
+
+    def putconn(self, conn, close=False):
+        pass
+
+
+def customer(cust_id, credit_limit=1000, create_date=date(2025, 6, 1)):
+    return (cust_id, f"Customer {cust_id}", "RETAIL", "General", Decimal(credit_limit), create_date)
+
+
+def test_changed_rows_returns_new_and_edited_rows_with_every_hash():
+    known = {"C1": kintex_to_rds.row_hash(customer("C1")), "C2": kintex_to_rds.row_hash(customer("C2"))}
+    rows = [customer("C1"), customer("C2", credit_limit=5000), customer("C3")]
+
+    changed, hashes = kintex_to_rds.changed_rows(rows, known)
+
+    assert [row[0] for row in changed] == ["C2", "C3"]
+    assert set(hashes) == {"C1", "C2", "C3"}
+    assert hashes["C1"] == known["C1"] and hashes["C2"] != known["C2"]
+
+
+def test_incremental_customers_pick_up_edits_and_same_day_creations():
+    watermark = "2025-06-01"
+    known = {"C1": kintex_to_rds.row_hash(customer("C1")), "C2": kintex_to_rds.row_hash(customer("C2"))}
+    source = FakeConnection([
+        customer("C1"),                                   # unchanged
+        customer("C2", credit_limit=9000),                # credit limit edited in KINTEX
+        customer("C3", create_date=date(2025, 6, 1)),     # created on the watermark date after the last run
+    ])
+    loaded = []
+
+    def load_customers(conn, rows, update_existing=False, schema=None):
+        loaded.extend(rows)
+
+    summary = kintex_to_rds.stream_table(
+        FakePool(source), FakePool(FakeConnection()),
+        lambda conn: kintex_to_rds.extract_customers(conn, limit=None, since=watermark, ids=["C1", "C2"]),
+        lambda rows: rows, load_customers, known_hashes=known,
+        watermark_of=kintex_to_rds.latest_create_date)
+
+    query, params = source.queries[0]
+    assert "create_date >= %s OR cust_id = ANY(%s)" in query
+    assert params == (watermark, ["C1", "C2"], None)
+    assert [row[0] for row in loaded] == ["C2", "C3"]
+    assert set(summary["hashes"]) == {"C1", "C2", "C3"}
+    assert summary["watermark"] == "2025-06-01"
@@ -0,0 +1,22 @@
+import pytest
+
+import pipeline
+
+
+def test_run_loads_every_batch():
+    loaded = []
+
+    def load(table, rows):
+        loaded.append(len(rows))
+        return len(rows)
+
+    totals = pipeline.run({"sales_orders": lambda: range(4500)}, load, batch_size=2000)
+    assert totals == {"sales_orders": 4500}
+    assert sorted(loaded) == [500, 2000, 2000]
+
+
+@pytest.mark.parametrize("workers, loaders", [(1, 0), (0, 1)])
+def test_run_rejects_a_pipeline_without_producers_or_loaders(workers, loaders):
+    with pytest.raises(ValueError):
+        pipeline.run({"sales_orders": lambda: range(10)}, lambda table, rows: None,
+                     workers=workers, loaders=loaders)
@@ -0,0 +1,151 @@
+import re
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pytest
+
+import seed_extended_data as seed
+
+
+def test_np_daily_counts_is_a_seeded_nonnegative_matrix():
+    multipliers = np.array([1.0, 0.3, 1.2])
+    base_counts = np.array([10.0, 0.0, 4.0, 25.0])
+
+    counts = seed._np_daily_counts(np.random.default_rng(7), multipliers, base_counts)
+
+    assert counts.shape == (3, 4)
+    assert counts.dtype == np.int64
+    assert (counts >= 0).all()
+    assert (counts[:, 1] == 0).all()  # a category with no base volume never gets rows
+    assert (counts <= np.ceil(np.outer(multipliers, base_counts) * 1.3)).all()
+    assert (counts == seed._np_daily_counts(np.random.default_rng(7), multipliers, base_counts)).all()
+
+
+def test_np_expand_numbers_rows_within_each_day():
+    counts = np.array([[2, 0, 1],
+                       [0, 0, 0],
+                       [1, 3, 0]])
+
+    row_day, row_cat, seq = seed._np_expand(counts)
+
+    assert row_day.tolist() == [0, 0, 0, 2, 2, 2, 2]
+    assert row_cat.tolist() == [0, 0, 2, 0, 1, 1, 1]
+    assert seq.tolist() == [1, 2, 3, 1, 2, 3, 4]
+
+
+def test_np_round_cents_matches_numeric_rounding():
+    numerators = np.array([250, 249, 150, -250, -249, 0, 12345678, 99])
+    rounded = seed._np_round_cents(numerators, 100)
+    assert rounded.tolist() == [3, 2, 2, -3, -2, 0, 123457, 1]
+
+    rng = np.random.default_rng(3)
+    # price (cents) * quantity * (100 - discount %), as in generate_order_batches
+    numerators = rng.integers(100, 50_000, 1000) * rng.integers(1, 200, 1000) * rng.integers(80, 101, 1000)
+    expected = [int((Decimal(int(n)) / 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP)) for n in numerators]
+    assert seed._np_round_cents(numerators, 100).tolist() == expected
+
+
+class MasterTables:
+    """In-memory customers, product_catalog and salespeople answering the master data SQL"""
+
+    COLUMNS = {
+        "customers": ["customer_id", "customer_name"],
+        "product_catalog": ["product_id", "product_name", "product_category", "unit_cost", "unit_price"],
+        "salespeople": ["salesperson_id", "salesperson_name"],
+    }
+
+    def __init__(self, customers=3, products=2, salespeople=2):
+        self.rows = {
+            "customers": [(f"C{i}", f"Customer {i}") for i in range(customers)],
+            "product_catalog": [(f"P{i}", f"Product {i}", "FAB", Decimal("10.00"), Decimal("25.00"))
+                                for i in range(products)],
+            "salespeople": [(f"S{i}", f"Rep {i}") for i in range(salespeople)],
+        }
+
+    def cursor(self):
+        return MasterCursor(self)
+
+    def commit(self):
+        pass
+
+    def counts(self):
+        return {table: len(rows) for table, rows in self.rows.items()}
+
+
+class MasterCursor:
+    def __init__(self, db):
+        self.db = db
+        self.description = None
+        self.rowcount = 0
+        self._result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def close(self):
+        pass
+
+    def execute(self, sql, params=()):
+        sql = " ".join(sql.split())
+        table = re.search(r"sales_insights\.(\w+)", sql)[1]
+        rows = self.db.rows[table]
+        if sql.startswith("DELETE"):
+            pattern, scale = params
+            keep = [row for row in rows if not (re.search(pattern, row[0]) and int(row[0][-4:]) >= scale)]
+            self.rowcount = len(rows) - len(keep)
+            self.db.rows[table] = keep
+            return
+        columns = self.db.COLUMNS[table]
+        selected = columns if sql.startswith("SELECT *") else re.match(r"SELECT (.*?) FROM", sql)[1].split(", ")
+        self.description = [(column,) for column in selected]
+        self._result = sorted(tuple(row[columns.index(c)] for c in selected)
+                              for row in rows if not re.search(params[0], row[0]))
+
+    def fetchall(self):
+        return self._result
+
+
+@pytest.fixture
+def master_tables(monkeypatch):
+    db = MasterTables()
+
+    def upsert_rows(cur, table, columns, rows, conflict_columns):
+        existing = {row[0] for row in db.rows[table.split(".")[1]]}
+        db.rows[table.split(".")[1]] += [row for row in rows if row[0] not in existing]
+
+    monkeypatch.setattr(seed, "upsert_rows", upsert_rows)
+    return db
+
+
+def seed_master_data(conn, scale):
+    """The master data steps of main() in database mode: originals, replicas, then stale replicas dropped"""
+    master = seed.get_existing_data(conn)
+    if scale > 1:
+        master = seed.scale_master_data(conn, scale)
+    seed.drop_stale_replicas(conn, scale)
+    return master
+
+
+def test_a_smaller_scale_factor_removes_the_replicas_of_a_larger_one(master_tables):
+    originals = master_tables.counts()
+
+    customers, products, salespeople = seed_master_data(master_tables, 10)
+    assert master_tables.counts() == {table: count * 10 for table, count in originals.items()}
+    assert (len(customers), len(products), len(salespeople)) == (30, 20, 20)
+
+    customers, products, salespeople = seed_master_data(master_tables, 1)
+    assert master_tables.counts() == originals
+    assert customers == ["C0", "C1", "C2"] and salespeople == ["S0", "S1"]
+    assert [product[0] for product in products] == ["P0", "P1"]
+
+
+def test_scaling_down_keeps_the_replicas_still_in_use(master_tables):
+    seed_master_data(master_tables, 100)
+    customers, _, _ = seed_master_data(master_tables, 10)
+
+    ids = sorted(row[0] for row in master_tables.rows["customers"])
+    assert ids == sorted(customers)
+    assert "C0-SF0009" in ids and "C0-SF0010" not in ids
@@ -0,0 +1,108 @@
+import csv
+import io
+import re
+import threading
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+import sinks
+
+COLUMNS = ["order_id", "order_date", "customer_id", "revenue_amount", "delivery_status", "notes"]
+ROWS = [
+    ("SO-1", date(2025, 6, 1), "C1", Decimal("1250.50"), "Delivered", "plain"),
+    ("SO-2", date(2025, 6, 15), "C2", Decimal("-3.10"), "Pending", "tab\there, newline\nthere"),
+    ("SO-3", date(2025, 7, 2), "C1", Decimal("0.00"), "In Transit", "back\\slash, \"quoted\", comma"),
+    ("SO-4", date(2025, 7, 31), "C3", None, "Cancelled", None),
+]
+
+
+class CopyCapture:
+    """Pool whose connections record every statement and the data sent with COPY"""
+
+    closed = False
+
+    def __init__(self):
+        self.statements = []
+        self.copied = {}
+        self._lock = threading.Lock()
+
+    def getconn(self):
+        return self
+
+    def putconn(self, conn, close=False):
+        pass
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql, params))
+
+    def copy_expert(self, sql, file, size=8192):
+        data = file.read()
+        table = re.match(r"COPY (\S+)", sql)[1]
+        with self._lock:
+            self.copied.setdefault(table, []).append((sql, data))
+        self.rowcount = len(list(csv.reader(io.StringIO(data))))
+
+
+def parse_copy_text(data):
+    """Rows of COPY text format, as written by bulk_load.copy_rows"""
+    escapes = {"\\\\": "\\", "\\t": "\t", "\\n": "\n", "\\r": "\r"}
+    return [tuple(None if field == "\\N" else re.sub(r"\\[\\tnr]", lambda m: escapes[m[0]], field)
+                  for field in line.split("\t"))
+            for line in data.splitlines()]
+
+
+def parse_copy_csv(data):
+    return [tuple(field or None for field in row) for row in csv.reader(io.StringIO(data))]
+
+
+def as_text(rows):
+    return sorted(tuple(None if value is None else str(value) for value in row) for row in rows)
+
+
+@pytest.mark.parametrize("kind, parse", [("parquet", parse_copy_text), ("csv", parse_copy_csv)])
+def test_file_sink_round_trips_through_import_dataset(tmp_path, kind, parse):
+    sink = sinks.open_sink(kind, str(tmp_path))
+    assert sink.write("sales_orders", COLUMNS, ROWS[:2], partition="2025-06") == 2
+    assert sink.write("sales_orders", COLUMNS, ROWS[2:], partition="2025-07") == 2
+    assert sinks.written_partitions(str(tmp_path), "sales_orders") == {"2025-06", "2025-07"}
+
+    pool = CopyCapture()
+    totals = sinks.import_dataset(pool, str(tmp_path), schema="test_schema", workers=2)
+
+    assert totals == {"sales_orders": 4}
+    copies = pool.copied["test_schema.sales_orders"]
+    assert all(f"({', '.join(COLUMNS)})" in sql for sql, _ in copies)
+    assert as_text(row for _, data in copies for row in parse(data)) == as_text(ROWS)
+
+    statements = [sql for sql, _ in pool.statements]
+    assert statements[0] == "TRUNCATE test_schema.sales_orders"
+    partition_ranges = sorted(params[1:] for sql, params in pool.statements if "ensure_month_partitions" in sql)
+    assert [tuple(str(d) for d in bounds) for bounds in partition_ranges] == [
+        ("2025-06-01", "2025-06-15"), ("2025-07-02", "2025-07-31")]
+
+
+def test_rewriting_a_partition_replaces_it(tmp_path):
+    sink = sinks.open_sink("parquet", str(tmp_path))
+    sink.write("sales_orders", COLUMNS, ROWS, partition="2025-06")
+    sink.write("sales_orders", COLUMNS, ROWS[:1], partition="2025-06")
+
+    pool = CopyCapture()
+    assert sinks.import_dataset(pool, str(tmp_path), append=True) == {"sales_orders": 1}
+    assert not any(sql.startswith("TRUNCATE") for sql, _ in pool.statements)
@@ -0,0 +1,211 @@
+import copy
+import json
+import re
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+import sync_metabase_dashboards as sync
+from create_metabase_dashboard import MetabaseAPI
+
+URL = "http://metabase.test"
+
+
+class FakeMetabase(BaseAdapter):
+    """In-memory Metabase serving the endpoints the sync uses"""
+
+    def __init__(self):
+        super().__init__()
+        self.cards, self.dashboards, self.collections = {}, {}, []
+        self.next_id = 100
+
+    def _id(self):
+        self.next_id += 1
+        return self.next_id
+
+    def send(self, request, **kwargs):
+        path = request.path_url.split("?")[0]
+        body = json.loads(request.body) if request.body else None
+        status, payload = self.route(request.method, path, body)
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps(payload).encode()
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+    def route(self, method, path, body):
+        if (method, path) == ("POST", "/api/session"):
+            return 200, {"id": "token"}
+        if (method, path) == ("GET", "/api/database"):
+            return 200, {"data": [{"id": 1, "name": "epb"}]}
+        if path == "/api/collection":
+            if method == "POST":
+                self.collections.append({"id": self._id(), **body})
+                return 200, self.collections[-1]
+            return 200, self.collections
+        if (method, path) == ("GET", "/api/search"):
+            return 200, {"data": [{"id": d["id"], "name": d["name"]} for d in self.dashboards.values()]}
+        if (method, path) == ("POST", "/api/card"):
+            card = {"id": self._id(), "description": None, **body}
+            self.cards[card["id"]] = card
+            return 200, card
+        if (method, path) == ("POST", "/api/dashboard"):
+            dashboard = {"id": self._id(), "parameters": [], "tabs": [], "dashcards": [], **body}
+            self.dashboards[dashboard["id"]] = dashboard
+            return 200, dashboard
+        match = re.fullmatch(r"/api/(card|dashboard)/(\d+)", path)
+        if match and method == "PUT" and match[1] == "card":
+            self.cards[int(match[2])].update(body)
+            return 200, self.cards[int(match[2])]
+        if match and method == "PUT":
+            return 200, self.put_dashboard(self.dashboards[int(match[2])], body)
+        if match and method == "GET":
+            dashboard = copy.deepcopy(self.dashboards[int(match[2])])
+            for dc in dashboard["dashcards"]:
+                dc["card"] = copy.deepcopy(self.cards[dc["card_id"]])
+            return 200, dashboard
+        return 404, {"message": f"{method} {path}"}
+
+    def put_dashboard(self, dashboard, body):
+        tab_ids = {}
+        for position, tab in enumerate(body.get("tabs", [])):
+            tab_ids[tab["id"]] = tab["id"] if tab["id"] > 0 else self._id()
+            tab.update(id=tab_ids[tab["id"]], position=position)
+        for dc in body.get("dashcards", []):
+            dc["id"] = dc["id"] if dc["id"] > 0 else self._id()
+            dc["dashboard_tab_id"] = tab_ids.get(dc.get("dashboard_tab_id"), dc.get("dashboard_tab_id"))
+        dashboard.update(body)
+        return dashboard
+
+
+def definition():
+    dashboard = {
+        "name": "Sales Insights",
+        "description": "Test dashboard",
+        "parameters": [{"name": "Date", "slug": "date", "type": "date/range"}],
+        "tabs": [{"name": "Overview", "cards": [
+            {"ref": "cards.json#revenue", "layout": {"row": 0, "col": 0, "size_x": 6, "size_y": 4}},
+            {"ref": "cards.json#orders", "layout": {"row": 0, "col": 6, "size_x": 6, "size_y": 4}},
+        ]}],
+    }
+    cards = [
+        {"name": "Revenue", "query": "SELECT 1", "display": "bar", "description": "Revenue by day",
+         "visualization_settings": {"graph.colors": ["#005F73"]}, "tab": "Overview",
+         "key": "cards.json#revenue", "layout": dashboard["tabs"][0]["cards"][0]["layout"]},
+        {"name": "Orders", "query": "SELECT 2", "display": "scalar", "description": None,
+         "visualization_settings": {}, "tab": "Overview",
+         "key": "cards.json#orders", "layout": dashboard["tabs"][0]["cards"][1]["layout"]},
+    ]
+    return dashboard, cards
+
+
+def connect():
+    metabase = FakeMetabase()
+    api = MetabaseAPI(URL)
+    api.session.mount(URL, metabase)
+    api.authenticate("admin@example.com", "secret")
+    return metabase, api
+
+
+def deploy(api, dashboard, cards, unresolved=()):
+    """The read, plan and apply steps of sync_metabase_dashboards.main; returns (changes, API calls)"""
+    before = api.calls
+    dashboard_id = api.find_dashboard(dashboard["name"])
+    live = api.get_dashboard(dashboard_id) if dashboard_id else None
+    changes = sync.plan(dashboard, cards, list(unresolved), live)
+    if changes["create"] or changes["update"] or changes["archive"] or changes["dashboard"]:
+        sync.apply(api, dashboard, cards, changes, live, workers=2)
+    return changes, api.calls - before
+
+
+def test_first_deploy_creates_everything_and_a_redeploy_is_two_reads():
+    metabase, api = connect()
+    dashboard, cards = definition()
+
+    changes, _ = deploy(api, dashboard, cards)
+    assert [card["name"] for card in changes["create"]] == ["Revenue", "Orders"]
+    assert changes["dashboard"]
+    live = next(iter(metabase.dashboards.values()))
+    assert [dc["card_id"] for dc in live["dashcards"]] == sorted(metabase.cards)
+    assert all(dc["dashboard_tab_id"] == live["tabs"][0]["id"] for dc in live["dashcards"])
+
+    changes, calls = deploy(api, dashboard, cards)
+    assert calls == 2  # search + GET dashboard, nothing written
+    assert len(changes["unchanged"]) == 2
+    assert not (changes["create"] or changes["update"] or changes["archive"] or changes["dashboard"])
+
+
+def test_changed_and_removed_cards_are_updated_and_archived():
+    metabase, api = connect()
+    dashboard, cards = definition()
+    deploy(api, dashboard, cards)
+    ids = {card["name"]: card["id"] for card in metabase.cards.values()}
+    revenue_id, orders_id = ids["Revenue"], ids["Orders"]
+
+    cards[0]["query"] = "SELECT 3"
+    dashboard["tabs"][0]["cards"].pop()
+    changes, calls = deploy(api, dashboard, cards[:1])
+
+    assert [(card["name"], changed) for card, _, changed in changes["update"]] == [("Revenue", ["query"])]
+    assert [card["name"] for card in changes["archive"]] == ["Orders"]
+    assert calls == 2 + 1 + 1 + 1  # reads, card update, archive, dashboard PUT
+    assert metabase.cards[orders_id]["archived"] is True
+    live = next(iter(metabase.dashboards.values()))
+    assert [dc["card_id"] for dc in live["dashcards"]] == [revenue_id]
+    assert metabase.cards[revenue_id]["dataset_query"]["native"]["query"] == "SELECT 3"
+
+
+def test_removed_cards_are_kept_while_refs_are_unresolved():
+    _, api = connect()
+    dashboard, cards = definition()
+    deploy(api, dashboard, cards)
+
+    changes, _ = deploy(api, dashboard, cards[:1], unresolved=["missing.json#orders"])
+
+    assert not changes["archive"]
+    assert [card["name"] for card in changes["kept"]] == ["Orders"]
+
+
+def test_dashboard_payload_reuses_live_ids_and_numbers_new_ones_negative():
+    dashboard, cards = definition()
+    dashboard["tabs"].append({"name": "Detail", "cards": []})
+    cards[1]["tab"] = "Detail"
+    live = {
+        "tabs": [{"id": 7, "name": "Overview", "position": 0}],
+        "parameters": [{"id": "abc123", "slug": "date"}],
+        "dashcards": [{"id": 55, "card_id": 11, "dashboard_tab_id": 7},
+                      {"id": 56, "card_id": 99, "dashboard_tab_id": 7},   # a card no longer declared
+                      {"id": 57, "card_id": None, "dashboard_tab_id": 7}],  # a text box
+    }
+
+    payload = sync.dashboard_payload(dashboard, cards, {"Revenue": 11, "Orders": 12}, live, keep=set())
+
+    assert payload["tabs"] == [{"id": 7, "name": "Overview"}, {"id": -2, "name": "Detail"}]
+    assert payload["parameters"][0]["id"] == "abc123"
+    assert [(dc["id"], dc["card_id"], dc["dashboard_tab_id"]) for dc in payload["dashcards"]] == [
+        (57, None, 7), (55, 11, 7), (-1, 12, -2)]
+
+
+def test_plan_reports_views_as_unknown_when_the_database_is_unreachable(monkeypatch, capsys):
+    _, cards = definition()
+    cards[0]["materialize"] = {"view": "mv_revenue", "unique_key": ["day"], "query": "SELECT 1"}
+
+    def unreachable(cards, dsn=None, dry_run=False):
+        raise ConnectionError("could not connect to server")
+
+    monkeypatch.setattr(sync, "ensure_card_views", unreachable)
+    views = sync.check_views(cards, plan_only=True)
+    assert views == {"mv_revenue": "unknown"}
+
+    dashboard, _ = definition()
+    sync.print_plan(dashboard, sync.plan(dashboard, cards, [], None), [], None, views)
+    assert "? view  mv_revenue (not checked: database unreachable)" in capsys.readouterr().out
+
+    with pytest.raises(ConnectionError):
+        sync.check_views(cards)  # a deploy must not go ahead without its views
+    assert sync.check_views(cards, skip=True) == {}